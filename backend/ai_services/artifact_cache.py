@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional, Any, Tuple
+from datetime import datetime
+
+# Generated PDFs live next to the backend package unless a directory is given
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generated_artifacts")
+
+ARTIFACT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def content_hash(value: Any) -> str:
+    """Return a stable SHA-256 hex digest for text, bytes or JSON-serializable data"""
+    if isinstance(value, bytes):
+        data = value
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+    else:
+        data = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+def parse_range_header(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range `bytes=` header into inclusive (start, end) offsets"""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header or "")
+    if not match or size <= 0:
+        return None
+
+    start_text, end_text = match.groups()
+    if not start_text and not end_text:
+        return None
+
+    if not start_text:
+        # Suffix range: last N bytes
+        length = int(end_text)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk cache for generated documents
+    - Artifacts are keyed by (resume hash, job hash, template/style)
+    - Each artifact is a PDF file plus a small JSON metadata sidecar
+    - The SHA-256 of the stored bytes is used as the download ETag
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, resume_hash: str, job_hash: str, variant: str) -> str:
+        """Build the artifact id for a (resume, job, template/style) combination"""
+        return content_hash(f"{resume_hash}:{job_hash}:{variant}")
+
+    def is_valid_id(self, artifact_id: str) -> bool:
+        """Artifact ids are SHA-256 hex digests; anything else is rejected"""
+        return bool(ARTIFACT_ID_PATTERN.match(artifact_id or ""))
+
+    def _paths(self, artifact_id: str) -> Tuple[str, str]:
+        shard_dir = os.path.join(self.cache_dir, artifact_id[:2])
+        return os.path.join(shard_dir, f"{artifact_id}.pdf"), os.path.join(shard_dir, f"{artifact_id}.json")
+
+    def exists(self, artifact_id: str) -> bool:
+        """Check whether an artifact has been stored"""
+        if not self.is_valid_id(artifact_id):
+            return False
+        pdf_path, meta_path = self._paths(artifact_id)
+        return os.path.exists(pdf_path) and os.path.exists(meta_path)
+
+    def put(self, artifact_id: str, pdf_bytes: bytes, metadata: Optional[Dict] = None) -> Optional[Dict]:
+        """Store PDF bytes under an artifact id and return its metadata"""
+        try:
+            if not self.is_valid_id(artifact_id) or not pdf_bytes:
+                return None
+
+            pdf_path, meta_path = self._paths(artifact_id)
+            os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+
+            meta = dict(metadata or {})
+            meta.update({
+                "artifact_id": artifact_id,
+                "size": len(pdf_bytes),
+                "sha256": content_hash(pdf_bytes),
+                "content_type": "application/pdf",
+                "created_at": datetime.now().isoformat()
+            })
+
+            # Write to temp files and rename so readers never see partial artifacts
+            self._atomic_write(pdf_path, pdf_bytes)
+            self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+            return meta
+
+        except Exception as e:
+            self.logger.error(f"Error storing artifact {artifact_id}: {e}")
+            return None
+
+    def put_base64(self, artifact_id: str, pdf_content: str, metadata: Optional[Dict] = None) -> Optional[Dict]:
+        """Store a base64-encoded PDF as produced by CustomAIEngine"""
+        if not pdf_content:
+            return None
+        try:
+            return self.put(artifact_id, base64.b64decode(pdf_content), metadata)
+        except Exception as e:
+            self.logger.error(f"Error decoding artifact {artifact_id}: {e}")
+            return None
+
+    def get_metadata(self, artifact_id: str) -> Optional[Dict]:
+        """Return stored metadata for an artifact, or None if it is not cached"""
+        if not self.exists(artifact_id):
+            return None
+        try:
+            with open(self._paths(artifact_id)[1], 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Error reading artifact metadata {artifact_id}: {e}")
+            return None
+
+    def get_path(self, artifact_id: str) -> Optional[str]:
+        """Return the on-disk PDF path for an artifact"""
+        if not self.exists(artifact_id):
+            return None
+        return self._paths(artifact_id)[0]
+
+    def read_range(self, artifact_id: str, start: int, end: int) -> bytes:
+        """Read the inclusive byte range [start, end] of an artifact"""
+        path = self.get_path(artifact_id)
+        if not path:
+            return b""
+        with open(path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -1,6 +1,112 @@
+import io
+import json
+import base64
 import logging
-from typing import Dict, List
-from ai_services.custom_ai_engine import CustomAIEngine
+import zipfile
+from string import Formatter
+from typing import Dict, List, Iterator, Iterable, Optional
+from ai_services.custom_ai_engine import CustomAIEngine, personalization_score
+
+class CompiledTemplate:
+    """A str.format-style template parsed once into literal chunks and field names"""
+    
+    def __init__(self, template: str):
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+    
+    def render(self, values: Dict[str, str]) -> str:
+        chunks = []
+        for literal, field in self.parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(values[field])
+        return ''.join(chunks)
+
+# Style templates are compiled once at import instead of rebuilding f-strings per letter
+COVER_LETTER_STYLES = {
+    "professional": CompiledTemplate("""Dear Hiring Manager,
+
+I am writing to formally express my interest in the {job_title} position at {company_name}. With my extensive background in software development and proven track record of delivering high-quality solutions, I am well-positioned to contribute to your team's continued success.
+
+My professional experience has equipped me with the technical skills and business acumen necessary to excel in this role. I am particularly drawn to {company_name}'s commitment to innovation and would welcome the opportunity to contribute to your ongoing projects.
+
+I would appreciate the opportunity to discuss how my qualifications align with your needs. Thank you for your consideration.
+
+Respectfully,
+{user_name}"""),
+    "enthusiastic": CompiledTemplate("""Dear Hiring Team,
+
+I am thrilled to apply for the {job_title} position at {company_name}! Your company's reputation for innovation and excellence has long impressed me, and I am excited about the possibility of contributing to your dynamic team.
+
+My passion for technology and problem-solving, combined with my hands-on experience, makes me an ideal candidate for this role. I am particularly excited about the opportunity to work on challenging projects and collaborate with talented professionals at {company_name}.
+
+I would love to discuss how my enthusiasm and skills can benefit your team. Thank you for considering my application!
+
+Best regards,
+{user_name}"""),
+    "concise": CompiledTemplate("""Dear Hiring Manager,
+
+I am applying for the {job_title} position at {company_name}. My background in software development and proven ability to deliver results make me a strong candidate for this role.
+
+Key qualifications:
+• Extensive experience in software development
+• Strong problem-solving and analytical skills
+• Proven track record of successful project delivery
+
+I am interested in discussing how I can contribute to {company_name}'s success. Thank you for your consideration.
+
+Sincerely,
+{user_name}""")
+}
+
+ATS_ACTION_VERBS = ['developed', 'managed', 'led', 'created', 'implemented', 'achieved', 'improved']
+
+def ats_score(cover_letter: str, letter_lower: Optional[str] = None) -> float:
+    """Score a letter on structure and wording an applicant tracking system looks for"""
+    letter_lower = cover_letter.lower() if letter_lower is None else letter_lower
+    score = 0.0
+    
+    # Check for proper structure
+    if 'dear' in letter_lower:
+        score += 0.2
+    
+    if any(closing in letter_lower for closing in ['sincerely', 'best regards', 'respectfully']):
+        score += 0.2
+    
+    # Check for keywords density
+    if len(cover_letter.split()) > 100:
+        score += 0.2
+    
+    # Check for action verbs
+    if sum(1 for verb in ATS_ACTION_VERBS if verb in letter_lower) >= 2:
+        score += 0.2
+    
+    # Check for formatting
+    if '\n' in cover_letter:
+        score += 0.1
+    
+    # Check for specific details
+    if any(detail in letter_lower for detail in ['experience', 'skills', 'background']):
+        score += 0.1
+    
+    return min(1.0, score)
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink for zipfile that hands written bytes back in chunks"""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
 
 class CoverLetterGenerator:
     def __init__(self):
@@ -108,29 +214,15 @@ Sincerely,
     def generate_multiple_versions(self, job_data: Dict, user_profile: Dict, enhanced_resume: Dict, count: int = 3) -> List[Dict]:
         """Generate multiple versions of cover letters"""
         try:
-            versions = []
-            
-            for i in range(count):
-                # Generate different styles
-                if i == 0:
-                    # Professional and formal
-                    style = "professional"
-                elif i == 1:
-                    # Enthusiastic and energetic
-                    style = "enthusiastic"
-                else:
-                    # Concise and direct
-                    style = "concise"
-                
-                cover_letter_data = self.generate_cover_letter_with_style(job_data, user_profile, enhanced_resume, style)
-                cover_letter_data['style'] = style
-                versions.append(cover_letter_data)
-            
-            return versions
+            # Professional and formal, enthusiastic and energetic, then concise and direct
+            styles = [["professional", "enthusiastic"][i] if i < 2 else "concise" for i in range(count)]
+            versions = list(self.generate_cover_letters_batch([job_data], user_profile, styles))
+            if versions:
+                return versions
             
         except Exception as e:
             self.logger.error(f"Error generating multiple versions: {e}")
-            return [self.generate_cover_letter(job_data, user_profile, enhanced_resume)]
+        return [self.generate_cover_letter(job_data, user_profile, enhanced_resume)]
     
     def generate_cover_letter_with_style(self, job_data: Dict, user_profile: Dict, enhanced_resume: Dict, style: str) -> Dict:
         """Generate cover letter with specific style"""
@@ -139,44 +231,12 @@ Sincerely,
             job_title = job_data.get('title', 'the position')
             user_name = user_profile.get('full_name', 'John Doe')
             
-            if style == "professional":
-                cover_letter = f"""Dear Hiring Manager,
-
-I am writing to formally express my interest in the {job_title} position at {company_name}. With my extensive background in software development and proven track record of delivering high-quality solutions, I am well-positioned to contribute to your team's continued success.
-
-My professional experience has equipped me with the technical skills and business acumen necessary to excel in this role. I am particularly drawn to {company_name}'s commitment to innovation and would welcome the opportunity to contribute to your ongoing projects.
-
-I would appreciate the opportunity to discuss how my qualifications align with your needs. Thank you for your consideration.
-
-Respectfully,
-{user_name}"""
-            
-            elif style == "enthusiastic":
-                cover_letter = f"""Dear Hiring Team,
-
-I am thrilled to apply for the {job_title} position at {company_name}! Your company's reputation for innovation and excellence has long impressed me, and I am excited about the possibility of contributing to your dynamic team.
-
-My passion for technology and problem-solving, combined with my hands-on experience, makes me an ideal candidate for this role. I am particularly excited about the opportunity to work on challenging projects and collaborate with talented professionals at {company_name}.
-
-I would love to discuss how my enthusiasm and skills can benefit your team. Thank you for considering my application!
-
-Best regards,
-{user_name}"""
-            
-            else:  # concise
-                cover_letter = f"""Dear Hiring Manager,
-
-I am applying for the {job_title} position at {company_name}. My background in software development and proven ability to deliver results make me a strong candidate for this role.
-
-Key qualifications:
-• Extensive experience in software development
-• Strong problem-solving and analytical skills
-• Proven track record of successful project delivery
-
-I am interested in discussing how I can contribute to {company_name}'s success. Thank you for your consideration.
-
-Sincerely,
-{user_name}"""
+            template = COVER_LETTER_STYLES.get(style, COVER_LETTER_STYLES["concise"])
+            cover_letter = template.render({
+                "job_title": job_title,
+                "company_name": company_name,
+                "user_name": user_name
+            })
             
             return {
                 'cover_letter': cover_letter,
@@ -239,36 +299,80 @@ Sincerely,
     def calculate_ats_score(self, cover_letter: str) -> float:
         """Calculate ATS compatibility score"""
         try:
-            score = 0.0
-            
-            # Check for proper structure
-            if 'dear' in cover_letter.lower():
-                score += 0.2
-            
-            if any(closing in cover_letter.lower() for closing in ['sincerely', 'best regards', 'respectfully']):
-                score += 0.2
-            
-            # Check for keywords density
-            words = cover_letter.split()
-            if len(words) > 100:
-                score += 0.2
-            
-            # Check for action verbs
-            action_verbs = ['developed', 'managed', 'led', 'created', 'implemented', 'achieved', 'improved']
-            action_count = sum(1 for verb in action_verbs if verb in cover_letter.lower())
-            if action_count >= 2:
-                score += 0.2
-            
-            # Check for formatting
-            if '\n' in cover_letter:
-                score += 0.1
-            
-            # Check for specific details
-            if any(detail in cover_letter.lower() for detail in ['experience', 'skills', 'background']):
-                score += 0.1
-            
-            return min(1.0, score)
+            return ats_score(cover_letter)
             
         except Exception as e:
             self.logger.error(f"Error calculating ATS score: {e}")
-            return 0.5 
\ No newline at end of file
+            return 0.5
+    
+    def generate_cover_letters_batch(self, jobs: List[Dict], user_profile: Dict, styles: Optional[List[str]] = None,
+                                     render_pdf: bool = True) -> Iterator[Dict]:
+        """Generate letters for every job × style, yielding one scored letter at a time"""
+        styles = styles or list(COVER_LETTER_STYLES.keys())
+        user_name = user_profile.get('full_name', 'John Doe')
+        
+        for job_index, job_data in enumerate(jobs):
+            try:
+                values = {
+                    "job_title": job_data.get('title', 'the position'),
+                    "company_name": job_data.get('company', 'the company'),
+                    "user_name": user_name
+                }
+                # Skills named in the job description are found once per job, not once per style
+                job_skills = self.custom_ai.skills_in_description(job_data.get('description', ''))
+                
+                for style in styles:
+                    template = COVER_LETTER_STYLES.get(style, COVER_LETTER_STYLES["concise"])
+                    cover_letter = template.render(values)
+                    letter = {
+                        'job_index': job_index,
+                        'job_id': job_data.get('id'),
+                        'style': style,
+                        'cover_letter': cover_letter,
+                        **self.score_cover_letter(cover_letter, job_data, job_skills)
+                    }
+                    if render_pdf:
+                        letter['pdf_content'] = self.custom_ai.generate_cover_letter_pdf(cover_letter, user_profile)
+                    yield letter
+                    
+            except Exception as e:
+                self.logger.error(f"Error generating batch cover letters for job {job_index}: {e}")
+    
+    def score_cover_letter(self, cover_letter: str, job_data: Dict, job_skills: List[str]) -> Dict:
+        """Compute personalization and ATS scores from a single lowercase pass over the letter"""
+        try:
+            letter_lower = cover_letter.lower()
+            return {
+                'personalization_score': personalization_score(letter_lower, job_data, job_skills),
+                'ats_score': ats_score(cover_letter, letter_lower)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error scoring cover letter: {e}")
+            return {'personalization_score': 0.5, 'ats_score': 0.5}
+    
+    def stream_cover_letters_zip(self, letters: Iterable[Dict]) -> Iterator[bytes]:
+        """Stream a ZIP of cover letter PDFs, holding at most one PDF in memory at a time"""
+        buffer = _ZipStreamBuffer()
+        manifest = []
+        
+        with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archive:
+            for letter in letters:
+                if not letter.get('pdf_content'):
+                    continue
+                filename = f"{letter['job_index']:04d}_{letter['style']}.pdf"
+                archive.writestr(filename, base64.b64decode(letter['pdf_content']))
+                manifest.append({
+                    'file': filename,
+                    'job_index': letter['job_index'],
+                    'job_id': letter.get('job_id'),
+                    'style': letter['style'],
+                    'personalization_score': letter.get('personalization_score'),
+                    'ats_score': letter.get('ats_score')
+                })
+                yield buffer.drain()
+            
+            archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+        
+        # Closing the archive writes the central directory
+        yield buffer.drain()
@@ -1,8 +1,11 @@
+import os
 import re
 import json
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Iterator, Iterable, Set
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
 import base64
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
@@ -11,6 +14,10 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
+from ai_services.job_stream_aggregator import JobStreamAggregator
+
+# Resume PDFs render in one process pool, sized once and shared by every request
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
 
 class CustomAIEngine:
     """
@@ -71,6 +78,9 @@ class CustomAIEngine:
                 'emphasis': 'education_projects'
             }
         }
+        
+        # Windowed job statistics fed incrementally by learn_from_newspaper_jobs
+        self.job_stream = JobStreamAggregator(self.skill_keywords)
 
     def analyze_job_description(self, job_description: str) -> Dict[str, Any]:
         """Analyze job description to extract key requirements and skills"""
@@ -128,8 +138,99 @@ class CustomAIEngine:
             self.logger.error(f"Error analyzing job description: {e}")
             return {'required_skills': [], 'job_type': 'general', 'industry': 'general', 'match_score': 0.5}
 
-    def enhance_resume_for_job(self, resume_text: str, job_description: str) -> Dict[str, Any]:
-        """Enhance resume based on job description analysis"""
+    def analyze_job_descriptions(self, job_descriptions: List[str]) -> List[Dict[str, Any]]:
+        """Analyze many job descriptions at once, analyzing each distinct description only once"""
+        analyses = {}
+        for description in job_descriptions:
+            if description not in analyses:
+                analyses[description] = self.analyze_job_description(description or '')
+        return [analyses[description] for description in job_descriptions]
+
+    def enhance_resume_for_jobs(self, resume_text: str, job_descriptions: List[str], render_pdf: bool = False,
+                                pdf_workers: int = 0, skip_pdf: Optional[Set[int]] = None) -> Iterator[Dict[str, Any]]:
+        """Enhance one resume against many job descriptions, yielding each result as it completes
+
+        The resume is parsed once and each distinct description is analyzed and optimized once.
+        PDFs are rendered only when render_pdf is set, skipping indices in skip_pdf. With
+        pdf_workers > 1 they go to the shared process pool, at most pdf_workers at a time,
+        and optimizing continues while they render.
+        """
+        resume_data = self.parse_resume(resume_text)
+        analyses = self.analyze_job_descriptions(job_descriptions)
+        skip_pdf = skip_pdf or set()
+        executor = get_pdf_executor() if render_pdf and pdf_workers > 1 and PDF_RENDER_WORKERS > 1 else None
+        
+        # Identical descriptions share one optimized resume and one rendered PDF
+        optimized_by_description = {}
+        pdf_by_description = {}  # description -> PDF, or its pending render with a pool
+        waiting: Dict[Future, List[Dict[str, Any]]] = {}  # pending render -> results waiting on it
+        for index, (description, job_analysis) in enumerate(zip(job_descriptions, analyses)):
+            try:
+                if description not in optimized_by_description:
+                    optimized_by_description[description] = {
+                        'enhanced_resume': self.optimize_resume_content(resume_data, job_analysis),
+                        'improvements': self.suggest_improvements(resume_data, job_analysis),
+                        'missing_skills': self.identify_missing_skills(resume_data, job_analysis)
+                    }
+                shared = optimized_by_description[description]
+                result = {
+                    'index': index,
+                    'enhanced_resume': shared['enhanced_resume'],
+                    'match_score': job_analysis['match_score'],
+                    'improvements': shared['improvements'],
+                    'missing_skills': shared['missing_skills']
+                }
+            except Exception as e:
+                self.logger.error(f"Error enhancing resume for job {index}: {e}")
+                result = {'index': index, 'enhanced_resume': resume_text, 'match_score': 0.5, 'improvements': []}
+            
+            if not render_pdf or index in skip_pdf:
+                yield result
+            elif executor is None:
+                if description not in pdf_by_description:
+                    pdf_by_description[description] = self.generate_resume_pdf(result['enhanced_resume'])
+                result['pdf_content'] = pdf_by_description[description]
+                yield result
+            else:
+                render = pdf_by_description.get(description)
+                if render is None:
+                    while len(waiting) >= pdf_workers:
+                        yield from self._rendered_results(waiting, block=True)
+                    render = pdf_by_description[description] = executor.submit(_render_resume_pdf,
+                                                                               result['enhanced_resume'])
+                    waiting[render] = []
+                if render in waiting:
+                    waiting[render].append(result)
+                else:
+                    result['pdf_content'] = self._render_result(render)
+                    yield result
+                yield from self._rendered_results(waiting, block=False)
+        
+        while waiting:
+            yield from self._rendered_results(waiting, block=True)
+
+    def _render_result(self, render: Future) -> str:
+        try:
+            return render.result()
+        except Exception as e:
+            self.logger.error(f"Error rendering resume PDF: {e}")
+            return ""
+
+    def _rendered_results(self, waiting: Dict[Future, List[Dict[str, Any]]], block: bool) -> Iterator[Dict[str, Any]]:
+        """Results whose PDFs have rendered; with block, waits for at least one render first"""
+        if block and waiting:
+            wait(waiting, return_when=FIRST_COMPLETED)
+        for render in [render for render in waiting if render.done()]:
+            pdf_content = self._render_result(render)
+            for result in waiting.pop(render):
+                result['pdf_content'] = pdf_content
+                yield result
+
+    def enhance_resume_for_job(self, resume_text: str, job_description: str, render_pdf: bool = True) -> Dict[str, Any]:
+        """Enhance resume based on job description analysis
+
+        Pass render_pdf=False when the PDF is already cached to skip rendering.
+        """
         try:
             job_analysis = self.analyze_job_description(job_description)
             
@@ -139,17 +240,19 @@ class CustomAIEngine:
             # Enhance resume based on job requirements
             enhanced_resume = self.optimize_resume_content(resume_data, job_analysis)
             
-            # Generate PDF
-            pdf_content = self.generate_resume_pdf(enhanced_resume)
-            
-            return {
+            result = {
                 'enhanced_resume': enhanced_resume,
-                'pdf_content': pdf_content,
                 'match_score': job_analysis['match_score'],
                 'improvements': self.suggest_improvements(resume_data, job_analysis),
                 'missing_skills': self.identify_missing_skills(resume_data, job_analysis)
             }
             
+            # Generate PDF
+            if render_pdf:
+                result['pdf_content'] = self.generate_resume_pdf(enhanced_resume)
+            
+            return result
+            
         except Exception as e:
             self.logger.error(f"Error enhancing resume: {e}")
             return {'enhanced_resume': resume_text, 'match_score': 0.5, 'improvements': []}
@@ -258,8 +361,13 @@ class CustomAIEngine:
             self.logger.error(f"Error optimizing resume: {e}")
             return resume_data
 
-    def generate_cover_letter(self, job_data: Dict, user_profile: Dict, enhanced_resume: Dict) -> Dict[str, Any]:
-        """Generate personalized cover letter"""
+    def generate_cover_letter(self, job_data: Dict, user_profile: Dict, enhanced_resume: Dict,
+                              render_pdf: bool = True, letter_date: Optional[str] = None) -> Dict[str, Any]:
+        """Generate personalized cover letter
+
+        Pass render_pdf=False when the PDF is already cached to skip rendering, and
+        letter_date when the PDF is cached under a key that includes its date.
+        """
         try:
             company_name = job_data.get('company', 'the company')
             job_title = job_data.get('title', 'the position')
@@ -270,15 +378,17 @@ class CustomAIEngine:
                 user_name, company_name, job_title, job_data, enhanced_resume
             )
             
-            # Generate PDF
-            pdf_content = self.generate_cover_letter_pdf(cover_letter_content, user_profile)
-            
-            return {
+            result = {
                 'cover_letter': cover_letter_content,
-                'pdf_content': pdf_content,
                 'personalization_score': self.calculate_personalization_score(cover_letter_content, job_data)
             }
             
+            # Generate PDF
+            if render_pdf:
+                result['pdf_content'] = self.generate_cover_letter_pdf(cover_letter_content, user_profile, letter_date)
+            
+            return result
+            
         except Exception as e:
             self.logger.error(f"Error generating cover letter: {e}")
             return {'cover_letter': 'Generic cover letter', 'personalization_score': 0.5}
@@ -395,8 +505,9 @@ Sincerely,
             self.logger.error(f"Error generating resume PDF: {e}")
             return ""
 
-    def generate_cover_letter_pdf(self, cover_letter_content: str, user_profile: Dict) -> str:
-        """Generate PDF cover letter and return as base64 string"""
+    def generate_cover_letter_pdf(self, cover_letter_content: str, user_profile: Dict,
+                                  letter_date: Optional[str] = None) -> str:
+        """Generate PDF cover letter and return as base64 string; letter_date defaults to today"""
         try:
             buffer = BytesIO()
             doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
@@ -417,7 +528,7 @@ Sincerely,
             story.append(Spacer(1, 24))
             
             # Date
-            current_date = datetime.now().strftime("%B %d, %Y")
+            current_date = letter_date or cover_letter_date()
             story.append(Paragraph(current_date, styles['Normal']))
             story.append(Spacer(1, 24))
             
@@ -441,42 +552,29 @@ Sincerely,
             self.logger.error(f"Error generating cover letter PDF: {e}")
             return ""
 
-    def learn_from_newspaper_jobs(self, newspaper_jobs: List[Dict]) -> Dict[str, Any]:
-        """Learn patterns from newspaper job postings to improve AI"""
+    def learn_from_newspaper_jobs(self, newspaper_jobs: Iterable[Dict]) -> Dict[str, Any]:
+        """Learn patterns from newspaper job postings to improve AI
+
+        Jobs are streamed into the windowed aggregator, so each call costs O(new jobs).
+        """
         try:
             if not newspaper_jobs:
                 return {'learned_patterns': [], 'skill_frequency': {}}
             
-            # Analyze job patterns
-            skill_frequency = {}
-            industry_patterns = {}
-            salary_patterns = {}
-            
-            for job in newspaper_jobs:
-                # Extract skills from job descriptions
-                description = job.get('description', '').lower()
-                for category, skills in self.skill_keywords.items():
-                    for skill in skills:
-                        if skill in description:
-                            skill_frequency[skill] = skill_frequency.get(skill, 0) + 1
-                
-                # Track industry patterns
-                industry = job.get('industry', 'general')
-                industry_patterns[industry] = industry_patterns.get(industry, 0) + 1
-                
-                # Track salary patterns
-                salary = job.get('salary', '')
-                if salary:
-                    salary_patterns[salary] = salary_patterns.get(salary, 0) + 1
+            batch = self.job_stream.ingest_many(newspaper_jobs)
+            skill_frequency = batch['skill_frequency']
+            industry_patterns = batch['industry_patterns']
             
-            # Update knowledge base with learned patterns
-            self.update_knowledge_base(skill_frequency, industry_patterns)
+            # Knowledge base thresholds apply to windowed totals, checked only for skills these jobs mention
+            windowed_frequency = {skill: self.job_stream.count('skills', skill) for skill in skill_frequency}
+            self.update_knowledge_base(windowed_frequency, industry_patterns)
             
             return {
                 'learned_patterns': list(skill_frequency.keys()),
                 'skill_frequency': skill_frequency,
                 'industry_trends': industry_patterns,
-                'total_jobs_analyzed': len(newspaper_jobs)
+                'total_jobs_analyzed': batch['jobs_ingested'],
+                'window_skill_frequency': windowed_frequency
             }
             
         except Exception as e:
@@ -489,14 +587,12 @@ Sincerely,
             # Update skill keywords with frequently mentioned skills
             for skill, frequency in skill_frequency.items():
                 if frequency > 5:  # Threshold for adding to knowledge base
-                    # Find appropriate category
-                    for category, skills in self.skill_keywords.items():
-                        if skill in skills:
-                            continue
-                        # Add to most relevant category (simplified logic)
-                        if any(related in skill for related in ['python', 'java', 'javascript']):
-                            self.skill_keywords['programming'].append(skill)
-                            break
+                    # Skills already in any category are known; re-adding them would only grow duplicates
+                    if any(skill in skills for skills in self.skill_keywords.values()):
+                        continue
+                    # Add to most relevant category (simplified logic)
+                    if any(related in skill for related in ['python', 'java', 'javascript']):
+                        self.skill_keywords['programming'].append(skill)
             
             self.logger.info(f"Updated knowledge base with {len(skill_frequency)} skills")
             
@@ -553,34 +649,55 @@ Sincerely,
             self.logger.error(f"Error identifying missing skills: {e}")
             return []
 
+    def skills_in_description(self, job_description: str) -> List[str]:
+        """Known skills named in a job description"""
+        job_description = (job_description or '').lower()
+        return [skill for skills in self.skill_keywords.values() for skill in skills if skill in job_description]
+
     def calculate_personalization_score(self, cover_letter: str, job_data: Dict) -> float:
         """Calculate how personalized the cover letter is"""
         try:
-            score = 0.0
-            
-            # Check for company name
-            if job_data.get('company', '').lower() in cover_letter.lower():
-                score += 0.3
-            
-            # Check for job title
-            if job_data.get('title', '').lower() in cover_letter.lower():
-                score += 0.3
-            
-            # Check for specific skills mentioned
-            job_description = job_data.get('description', '').lower()
-            cover_letter_lower = cover_letter.lower()
-            
-            skill_matches = 0
-            for category, skills in self.skill_keywords.items():
-                for skill in skills:
-                    if skill in job_description and skill in cover_letter_lower:
-                        skill_matches += 1
-            
-            if skill_matches > 0:
-                score += min(0.4, skill_matches * 0.1)
-            
-            return min(1.0, score)
+            job_skills = self.skills_in_description(job_data.get('description', ''))
+            return personalization_score(cover_letter.lower(), job_data, job_skills)
             
         except Exception as e:
             self.logger.error(f"Error calculating personalization score: {e}")
-            return 0.5 
\ No newline at end of file
+            return 0.5
+
+def personalization_score(letter_lower: str, job_data: Dict, job_skills: List[str]) -> float:
+    """Score a lowercased letter on naming the company, the job title and the job's skills"""
+    score = 0.0
+    
+    # Check for company name
+    if job_data.get('company', '').lower() in letter_lower:
+        score += 0.3
+    
+    # Check for job title
+    if job_data.get('title', '').lower() in letter_lower:
+        score += 0.3
+    
+    # Check for specific skills mentioned
+    skill_matches = sum(1 for skill in job_skills if skill in letter_lower)
+    if skill_matches > 0:
+        score += min(0.4, skill_matches * 0.1)
+    
+    return min(1.0, score)
+
+def cover_letter_date() -> str:
+    """The date printed on cover letters issued today"""
+    return datetime.now().strftime("%B %d, %Y")
+
+def _render_resume_pdf(resume_data: Dict) -> str:
+    """Render a resume PDF in a worker process"""
+    return CustomAIEngine().generate_resume_pdf(resume_data)
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Process-wide PDF rendering pool"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS)
+        return _pdf_executor
@@ -0,0 +1,268 @@
+import re
+import math
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+import numpy as np
+from scipy import sparse
+
+# Share of the match score each feature group contributes
+DEFAULT_GROUP_WEIGHTS = {
+    "skill": 0.35,
+    "title": 0.25,
+    "text": 0.10,
+    "seniority": 0.10,
+    "salary": 0.10,
+    "remote": 0.10
+}
+
+SALARY_BAND_WIDTH = 20000
+MAX_SALARY_BAND = 25  # bands above $500k are folded into the last one
+HOURS_PER_YEAR = 2080
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "in", "on", "at", "to", "with", "or", "by", "from", "is", "are",
+    "be", "we", "you", "our", "your", "will", "as", "this", "that", "job", "jobs", "position", "role",
+    "click", "view", "full", "details", "posting", "i", "ii", "iii", "sr", "jr"
+}
+
+# Seniority ladder; jobs and profiles are placed on it and adjacent rungs partially match
+SENIORITY_KEYWORDS = [
+    (5, ["director", "vp", "vice president", "head of", "chief", "c_suite", "ceo", "cto", "cfo", "coo", "president"]),
+    (4, ["lead", "principal", "staff", "manager", "architect"]),
+    (3, ["senior", "sr", "expert"]),
+    (0, ["intern", "internship"]),
+    (1, ["entry", "junior", "jr", "graduate", "associate"]),
+    (2, ["mid", "intermediate"])
+]
+
+# Whole words only, so "Instructor" is not a CTO and "Internal Auditor" not an intern
+SENIORITY_PATTERNS = [
+    (rung, re.compile(r"(?<![a-z0-9])(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")s?(?![a-z0-9])"))
+    for rung, keywords in SENIORITY_KEYWORDS
+]
+
+# Numbers in benefit names such as "401k match" or "403(b)" are not pay
+NON_SALARY_NUMBERS = re.compile(r"\b40[13]\s*\(?[kb]\)?")
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in re.findall(r"[a-z0-9+#.]+", (text or "").lower()):
+        token = token.strip(".")
+        if token in STOPWORDS or (len(token) < 2 and token not in ("c", "r")):
+            continue
+        tokens.append(token)
+    return tokens
+
+def seniority_rung(text: str) -> Optional[int]:
+    text_lower = (text or "").lower()
+    for rung, pattern in SENIORITY_PATTERNS:
+        if pattern.search(text_lower):
+            return rung
+    return None
+
+def parse_salary_range(text: str) -> Optional[Tuple[float, float]]:
+    """Annual (min, max) from texts like "$120,000 - $150,000", "$90K-$110K" or "$45/hr" """
+    text_lower = NON_SALARY_NUMBERS.sub(" ", (text or "").lower().replace(",", ""))
+    amounts = re.findall(r"(\$?)\s*(\d+(?:\.\d+)?)\s*(k?)", text_lower)
+    # Where some figures are marked as dollars, the unmarked ones (percentages, counts) are not pay
+    if any(dollar for dollar, _, _ in amounts):
+        amounts = [amount for amount in amounts if amount[0]]
+    values = []
+    for _, number, suffix in amounts:
+        value = float(number) * (1000 if suffix == "k" else 1)
+        if value > 0:
+            values.append(value)
+    if not values:
+        return None
+    low, high = min(values[:2]), max(values[:2])
+    if high < 1000 or any(unit in text_lower for unit in ["hour", "/hr", "hourly"]):
+        low, high = low * HOURS_PER_YEAR, high * HOURS_PER_YEAR
+    return low, high
+
+def salary_bands(low: float, high: float) -> List[int]:
+    first = min(int(low // SALARY_BAND_WIDTH), MAX_SALARY_BAND)
+    last = min(int(high // SALARY_BAND_WIDTH), MAX_SALARY_BAND)
+    return list(range(first, max(first, last) + 1))
+
+def _field(job: Any, *names: str, default: Any = None) -> Any:
+    """Read a field from a job dict or a JobListing-like object"""
+    for name in names:
+        value = job.get(name) if isinstance(job, dict) else getattr(job, name, None)
+        if value not in (None, ""):
+            return value
+    return default
+
+def job_features(job: Any) -> Dict[str, Dict[str, float]]:
+    """Sparse features of a job by group; each group's values sum (or square-sum) to one"""
+    groups: Dict[str, Dict[str, float]] = {}
+
+    skills = {str(skill).lower().strip() for skill in _field(job, "skills", "requirements", default=[]) or []}
+    skills.discard("professional skills")
+    if skills:
+        # Coverage: the share of the job's skills the user has
+        groups["skill"] = {skill: 1.0 / len(skills) for skill in skills}
+
+    title = _field(job, "title", default="")
+    title_tokens = set(tokenize(title))
+    if title_tokens:
+        norm = 1.0 / math.sqrt(len(title_tokens))
+        groups["title"] = {token: norm for token in title_tokens}
+
+    text_tokens = set(tokenize(_field(job, "description", default=""))) - title_tokens
+    if text_tokens:
+        norm = 1.0 / math.sqrt(len(text_tokens))
+        groups["text"] = {token: norm for token in text_tokens}
+
+    rung = seniority_rung(_field(job, "experience_level", default=""))
+    if rung is None:
+        rung = seniority_rung(title)
+    groups["seniority"] = {str(rung) if rung is not None else "unknown": 1.0}
+
+    salary = parse_salary_range(_field(job, "salary", "salary_range", default=""))
+    if salary:
+        bands = salary_bands(*salary)
+        groups["salary"] = {str(band): 1.0 / len(bands) for band in bands}
+    else:
+        groups["salary"] = {"unknown": 1.0}
+
+    remote = _field(job, "remote_work", "remote", default=False)
+    groups["remote"] = {"yes" if remote else "no": 1.0}
+    return groups
+
+def profile_features(profile: Dict, preferences: Optional[Dict] = None) -> Dict[str, Dict[str, float]]:
+    """What a user is looking for, in the same groups as job_features"""
+    preferences = preferences or {}
+    groups: Dict[str, Dict[str, float]] = {}
+
+    skills = {str(skill).lower().strip() for skill in profile.get("skills", []) or []}
+    groups["skill"] = {skill: 1.0 for skill in skills}
+
+    titles = list(preferences.get("job_titles") or []) + [profile.get("current_position", "")]
+    title_tokens = set(token for title in titles for token in tokenize(title))
+    if title_tokens:
+        norm = 1.0 / math.sqrt(len(title_tokens))
+        groups["title"] = {token: norm for token in title_tokens}
+
+    text_tokens = set(token for skill in skills for token in tokenize(skill)) | title_tokens
+    if text_tokens:
+        norm = 1.0 / math.sqrt(len(text_tokens))
+        groups["text"] = {token: norm for token in text_tokens}
+
+    rung = seniority_rung(profile.get("experience_level_detailed", ""))
+    if rung is None:
+        years = profile.get("experience_years", 0) or 0
+        rung = 1 if years < 2 else 2 if years < 5 else 3 if years < 9 else 4
+    groups["seniority"] = {str(rung): 1.0, "unknown": 0.5}
+    for neighbor in (rung - 1, rung + 1):
+        if 0 <= neighbor <= 5:
+            groups["seniority"][str(neighbor)] = 0.5
+
+    low = profile.get("salary_expectation_min", 0) or 0
+    high = profile.get("salary_expectation_max", 0) or 0
+    if high <= 0:
+        high = MAX_SALARY_BAND * SALARY_BAND_WIDTH
+    groups["salary"] = {str(band): 1.0 for band in salary_bands(low, max(low, high))}
+    groups["salary"]["unknown"] = 0.5
+
+    remote_pref = profile.get("remote_work_preference", "hybrid")
+    groups["remote"] = {
+        "remote": {"yes": 1.0, "no": 0.2},
+        "onsite": {"yes": 0.5, "no": 1.0}
+    }.get(remote_pref, {"yes": 1.0, "no": 1.0})
+    return groups
+
+class JobMatcher:
+    """
+    Scores a user against a whole job corpus with one sparse matrix product
+    - Jobs are encoded once as rows of a CSR matrix over a shared feature
+      vocabulary (skills, title tokens, description tokens, seniority rung,
+      salary band, remote)
+    - A profile becomes a dense weight vector over the same vocabulary; the
+      scores of every job are matrix @ vector
+    - top_k() picks the best jobs with argpartition, so ranking stays linear
+      in the corpus size
+    """
+
+    def __init__(self, group_weights: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.group_weights = group_weights or DEFAULT_GROUP_WEIGHTS
+        self.vocabulary: Dict[str, int] = {}
+        self.jobs: List[Any] = []
+        self._data: List[np.ndarray] = []
+        self._indices: List[np.ndarray] = []
+        self._row_lengths: List[int] = []
+        self._matrix: Optional[sparse.csr_matrix] = None
+
+    def _column(self, feature: str) -> int:
+        column = self.vocabulary.get(feature)
+        if column is None:
+            column = self.vocabulary[feature] = len(self.vocabulary)
+        return column
+
+    def add_jobs(self, jobs: List[Any]) -> range:
+        """Encode and append jobs; returns their row numbers"""
+        first_row = len(self.jobs)
+        columns, values = [], []
+        for job in jobs:
+            row_length = 0
+            for group, features in job_features(job).items():
+                for feature, value in features.items():
+                    columns.append(self._column(f"{group}:{feature}"))
+                    values.append(value)
+                    row_length += 1
+            self._row_lengths.append(row_length)
+            self.jobs.append(job)
+        # One array pair per batch keeps memory flat for large corpora
+        self._indices.append(np.asarray(columns, dtype=np.int32))
+        self._data.append(np.asarray(values, dtype=np.float32))
+        self._matrix = None
+        return range(first_row, len(self.jobs))
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        if self._matrix is None:
+            indptr = np.zeros(len(self._row_lengths) + 1, dtype=np.int64)
+            np.cumsum(self._row_lengths, out=indptr[1:])
+            data = np.concatenate(self._data) if self._data else np.zeros(0, dtype=np.float32)
+            indices = np.concatenate(self._indices) if self._indices else np.zeros(0, dtype=np.int32)
+            self._matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(self.jobs), len(self.vocabulary)))
+        return self._matrix
+
+    def profile_vector(self, profile: Dict, preferences: Optional[Dict] = None) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for group, features in profile_features(profile, preferences).items():
+            weight = self.group_weights.get(group, 0.0)
+            for feature, value in features.items():
+                column = self.vocabulary.get(f"{group}:{feature}")
+                if column is not None:  # features no job has cannot change any score
+                    vector[column] = weight * value
+        return vector
+
+    def score(self, profile: Dict, preferences: Optional[Dict] = None) -> np.ndarray:
+        """Match score in [0, 1] for every job, in row order"""
+        if not self.jobs:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.profile_vector(profile, preferences)
+
+    def top_k(self, profile: Dict, k: int = 50, preferences: Optional[Dict] = None) -> List[Tuple[int, float]]:
+        """(row, score) of the k best jobs, best first"""
+        scores = self.score(profile, preferences)
+        return top_k_rows(scores, k)
+
+    def rank(self, profile: Dict, k: int = 50, preferences: Optional[Dict] = None) -> List[Tuple[Any, int]]:
+        """The k best jobs with their match score on the 0-100 scale used by listings"""
+        return [(self.jobs[row], to_match_score(score)) for row, score in self.top_k(profile, k, preferences)]
+
+def top_k_rows(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Indices and values of the k largest scores, best first, without a full sort"""
+    if k <= 0 or len(scores) == 0:
+        return []
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(row), float(scores[row])) for row in ordered]
+
+def to_match_score(score: float) -> int:
+    return int(round(min(1.0, max(0.0, score)) * 100))
@@ -0,0 +1,171 @@
+import time
+import hashlib
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Any, Callable, Iterable
+
+class CountMinSketch:
+    """Fixed-size frequency sketch; estimates never undercount"""
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _columns(self, key: str) -> List[int]:
+        # One digest split into per-row columns keeps hashing to a single call per key
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=self.depth * 4).digest()
+        return [int.from_bytes(digest[i * 4:(i + 1) * 4], 'little') % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1):
+        for row, column in zip(self.rows, self._columns(key)):
+            row[column] += count
+
+    def estimate(self, key: str) -> int:
+        return min(row[column] for row, column in zip(self.rows, self._columns(key)))
+
+class SlidingWindowCounter:
+    """
+    Counts keys over a sliding time window split into fixed-width buckets
+    - Each bucket keeps exact counts for up to exact_capacity distinct keys
+    - Keys beyond that capacity go to the bucket's Count-Min sketch
+    - Buckets older than the window are dropped, so memory stays bounded
+    """
+
+    def __init__(self, window_seconds: int = 7 * 24 * 3600, bucket_seconds: int = 3600,
+                 exact_capacity: int = 256, sketch_width: int = 1024, sketch_depth: int = 4):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.exact_capacity = exact_capacity
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.buckets: Dict[int, Dict[str, Any]] = {}  # bucket start -> {"exact", "sketch", "overflow"}
+
+    def _bucket(self, timestamp: float) -> Dict[str, Any]:
+        start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = {"exact": Counter(), "sketch": None, "overflow": 0}
+            self.buckets[start] = bucket
+        return bucket
+
+    def expire(self, now: Optional[float] = None):
+        """Drop buckets that have slid out of the window"""
+        cutoff = (now or time.time()) - self.window_seconds
+        for start in [s for s in self.buckets if s + self.bucket_seconds <= cutoff]:
+            del self.buckets[start]
+
+    def add(self, key: str, count: int = 1, timestamp: Optional[float] = None):
+        bucket = self._bucket(timestamp or time.time())
+        exact = bucket["exact"]
+        if key in exact or len(exact) < self.exact_capacity:
+            exact[key] += count
+            return
+        if bucket["sketch"] is None:
+            bucket["sketch"] = CountMinSketch(self.sketch_width, self.sketch_depth)
+        bucket["sketch"].add(key, count)
+        bucket["overflow"] += count
+
+    def count(self, key: str, now: Optional[float] = None) -> int:
+        """Exact count for heavy keys, sketch estimate added for long-tail occurrences"""
+        self.expire(now)
+        total = 0
+        for bucket in self.buckets.values():
+            total += bucket["exact"].get(key, 0)
+            if bucket["sketch"] is not None and key not in bucket["exact"]:
+                total += bucket["sketch"].estimate(key)
+        return total
+
+    def top(self, n: Optional[int] = None, now: Optional[float] = None) -> Dict[str, int]:
+        """Most frequent exactly-tracked keys in the window"""
+        self.expire(now)
+        totals = Counter()
+        for bucket in self.buckets.values():
+            totals.update(bucket["exact"])
+        return dict(totals.most_common(n))
+
+    def tail_total(self, now: Optional[float] = None) -> int:
+        """Occurrences that only the sketches saw"""
+        self.expire(now)
+        return sum(bucket["overflow"] for bucket in self.buckets.values())
+
+class JobStreamAggregator:
+    """
+    Incremental job statistics fed one job at a time as jobs are ingested
+    - Skill matches are computed once per job at ingest, never rescanned
+    - Industry, salary, source, location, job type and company counts
+      are kept in sliding windows with Count-Min sketches for the long tail
+    """
+
+    def __init__(self, skill_keywords: Optional[Dict[str, List[str]]] = None, window_seconds: int = 7 * 24 * 3600,
+                 bucket_seconds: int = 3600, exact_capacity: int = 256):
+        self.logger = logging.getLogger(__name__)
+        self.skill_keywords = skill_keywords if skill_keywords is not None else {}
+        self.window_seconds = window_seconds
+        self.dimensions: Dict[str, Callable[[Dict], Optional[str]]] = {
+            'industries': lambda job: job.get('industry', 'general'),
+            'salaries': lambda job: job.get('salary') or None,
+            'sources': lambda job: job.get('source', 'Unknown'),
+            'locations': lambda job: job.get('location', 'Unknown'),
+            'job_types': lambda job: job.get('job_type', 'Unknown'),
+            'companies': lambda job: job.get('company', 'Unknown')
+        }
+        counter_args = dict(window_seconds=window_seconds, bucket_seconds=bucket_seconds, exact_capacity=exact_capacity)
+        self.counters = {name: SlidingWindowCounter(**counter_args) for name in ['skills', *self.dimensions]}
+        self.jobs = SlidingWindowCounter(**counter_args)
+        self.total_jobs_ingested = 0
+
+    def match_skills(self, description: str) -> List[str]:
+        """Skills from the knowledge base mentioned in a description"""
+        description = description.lower()
+        return [skill for skills in self.skill_keywords.values() for skill in skills if skill in description]
+
+    def ingest(self, job: Dict, timestamp: Optional[float] = None) -> Dict[str, int]:
+        """Add one job to the window and return its skill counts"""
+        timestamp = timestamp or time.time()
+        skill_counts = Counter(self.match_skills(job.get('description', '')))
+        for skill, count in skill_counts.items():
+            self.counters['skills'].add(skill, count, timestamp)
+
+        for name, extract in self.dimensions.items():
+            value = extract(job)
+            if value:
+                self.counters[name].add(str(value), 1, timestamp)
+
+        self.jobs.add('jobs', 1, timestamp)
+        self.total_jobs_ingested += 1
+        return dict(skill_counts)
+
+    def ingest_many(self, jobs: Iterable[Dict], timestamp: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Ingest a batch and return the batch's own skill and industry counts"""
+        skill_frequency = Counter()
+        industry_patterns = Counter()
+        jobs_ingested = 0
+        for job in jobs:
+            skill_frequency.update(self.ingest(job, timestamp))
+            industry_patterns[job.get('industry', 'general')] += 1
+            jobs_ingested += 1
+        return {
+            'skill_frequency': dict(skill_frequency),
+            'industry_patterns': dict(industry_patterns),
+            'jobs_ingested': jobs_ingested
+        }
+
+    def count(self, dimension: str, key: str) -> int:
+        """Windowed count (estimate for long-tail keys) of one value"""
+        return self.counters[dimension].count(key)
+
+    def window_jobs(self) -> int:
+        return self.jobs.count('jobs')
+
+    def snapshot(self, top_n: Optional[int] = 50) -> Dict[str, Any]:
+        """Current windowed statistics; cost depends on tracked keys, not on jobs seen"""
+        stats = {
+            'total_jobs': self.window_jobs(),
+            'total_jobs_ingested': self.total_jobs_ingested,
+            'window_seconds': self.window_seconds
+        }
+        for name, counter in self.counters.items():
+            stats[name] = counter.top(top_n)
+            stats[f"{name}_long_tail"] = counter.tail_total()
+        return stats
@@ -0,0 +1,149 @@
+import time
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+import numpy as np
+from scipy import sparse
+from ai_services.job_matcher import JobMatcher, profile_features, top_k_rows, to_match_score
+from ai_services.artifact_cache import content_hash
+
+class RecommendationMaterializer:
+    """
+    Ranked top-N job list per user, kept current as jobs and profiles change
+    - ingest() encodes only the new jobs and scores them against every active
+      user in one sparse product, merging winners into each user's list
+    - update_user() rescores the whole corpus for that one user when their
+      profile or preferences change
+    - get() is a dictionary lookup of the materialized list
+    - The corpus holds at most max_jobs; beyond that the oldest half is dropped
+      and every user is rescored once
+    - Public methods hold one lock and may run in worker threads; callers on
+      the event loop go through asyncio.to_thread, since ingest() and a
+      compaction are sparse products over the corpus
+    """
+
+    def __init__(self, top_n: int = 500, max_jobs: int = 200000):
+        self.logger = logging.getLogger(__name__)
+        self.top_n = top_n
+        self.max_jobs = max_jobs
+        self.matcher = JobMatcher()
+        self.job_keys: Dict[str, int] = {}  # dedup key -> row
+        self.users: Dict[str, Dict[str, Any]] = {}  # user_id -> profile, preferences, features
+        self.recommendations: Dict[str, List[Tuple[float, int]]] = {}  # user_id -> (score, row), best first
+        self.updated_at: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def job_key(job: Dict) -> str:
+        url = job.get("job_url") or job.get("apply_url") or job.get("url")
+        if url:
+            return url
+        return f"{job.get('title', '')}|{job.get('company', '')}|{job.get('location', '')}".lower()
+
+    def _user_matrix(self, user_ids: List[str]) -> sparse.csr_matrix:
+        """Profile vectors of the given users as rows over the current vocabulary"""
+        vocabulary = self.matcher.vocabulary
+        weights = self.matcher.group_weights
+        rows, columns, values = [], [], []
+        for row, user_id in enumerate(user_ids):
+            for group, features in self.users[user_id]["features"].items():
+                for feature, value in features.items():
+                    column = vocabulary.get(f"{group}:{feature}")
+                    if column is not None:
+                        rows.append(row)
+                        columns.append(column)
+                        values.append(weights.get(group, 0.0) * value)
+        return sparse.csr_matrix((np.asarray(values, dtype=np.float32), (rows, columns)),
+                                 shape=(len(user_ids), len(vocabulary)))
+
+    def ingest(self, jobs: List[Dict]) -> int:
+        """Add newly scraped jobs and merge them into every user's list; returns how many were new"""
+        with self.lock:
+            return self._ingest(jobs)
+
+    def _ingest(self, jobs: List[Dict]) -> int:
+        new_jobs = []
+        for job in jobs:
+            key = self.job_key(job)
+            if key in self.job_keys:
+                continue
+            # Listing ids are only unique within one search; give corpus jobs stable ones
+            job = {**job, "id": f"job_{content_hash(key)[:12]}"}
+            self.job_keys[key] = len(self.matcher.jobs) + len(new_jobs)
+            new_jobs.append(job)
+        if not new_jobs:
+            return 0
+
+        rows = self.matcher.add_jobs(new_jobs)
+        if len(self.matcher.jobs) > self.max_jobs:
+            self._compact()
+            return len(new_jobs)
+
+        user_ids = list(self.users)
+        if user_ids:
+            new_rows = self.matcher.matrix[rows.start:rows.stop]
+            # (new jobs x users) scores in one product
+            scores = (new_rows @ self._user_matrix(user_ids).T).toarray()
+            now = time.time()
+            for column, user_id in enumerate(user_ids):
+                candidates = [(score, rows.start + row) for row, score in top_k_rows(scores[:, column], self.top_n)]
+                merged = heapq.nlargest(self.top_n, self.recommendations.get(user_id, []) + candidates)
+                self.recommendations[user_id] = merged
+                self.updated_at[user_id] = now
+        return len(new_jobs)
+
+    def update_user(self, user_id: str, profile: Optional[Dict], preferences: Optional[Dict]):
+        """(Re)materialize one user's list after a profile or preferences change"""
+        features = profile_features(profile or {}, preferences)
+        with self.lock:
+            self.users[user_id] = {
+                "profile": profile or {},
+                "preferences": preferences or {},
+                "features": features
+            }
+            self._rescore(user_id)
+
+    def remove_user(self, user_id: str):
+        with self.lock:
+            self.users.pop(user_id, None)
+            self.recommendations.pop(user_id, None)
+            self.updated_at.pop(user_id, None)
+
+    def _rescore(self, user_id: str):
+        if self.matcher.jobs:
+            scores = self.matcher.matrix @ self._user_matrix([user_id]).toarray()[0]
+            self.recommendations[user_id] = [(score, row) for row, score in top_k_rows(scores, self.top_n)]
+        else:
+            self.recommendations[user_id] = []
+        self.updated_at[user_id] = time.time()
+
+    def _compact(self):
+        """Keep the newest half of the corpus and rescore every user against it"""
+        keep = self.matcher.jobs[len(self.matcher.jobs) - self.max_jobs // 2:]
+        self.logger.info(f"Compacting recommendation corpus to {len(keep)} jobs")
+        self.matcher = JobMatcher(self.matcher.group_weights)
+        self.matcher.add_jobs(keep)
+        self.job_keys = {self.job_key(job): row for row, job in enumerate(keep)}
+        for user_id in self.users:
+            self._rescore(user_id)
+
+    def has(self, user_id: str) -> bool:
+        return bool(self.recommendations.get(user_id))
+
+    def get(self, user_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """The user's materialized recommendations, best first, with match scores"""
+        with self.lock:
+            ranked = self.recommendations.get(user_id, [])
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [{**self.matcher.jobs[row], "match_score": to_match_score(score)} for score, row in ranked]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "jobs": len(self.matcher.jobs),
+                "users": len(self.users),
+                "features": len(self.matcher.vocabulary),
+                "top_n": self.top_n
+            }
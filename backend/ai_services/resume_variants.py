@@ -0,0 +1,185 @@
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Any, Set, Tuple
+from ai_services.custom_ai_engine import CustomAIEngine
+
+class ResumeVariantPlanner:
+    """
+    Groups a session's jobs by skill profile so one tailored resume serves many jobs
+    - Each job becomes a set of required skills plus its industry
+    - Jobs join the most similar cluster (Jaccard) above the similarity threshold
+    - One enhanced resume (and PDF) is produced per cluster instead of per job
+    """
+
+    def __init__(self, ai_engine: Optional[CustomAIEngine] = None, similarity_threshold: float = 0.6):
+        self.logger = logging.getLogger(__name__)
+        self.ai_engine = ai_engine or CustomAIEngine()
+        self.similarity_threshold = similarity_threshold
+
+    @staticmethod
+    def job_text(job: Dict) -> str:
+        """Text used to analyze a job: title plus description"""
+        return f"{job.get('title', '')}\n{job.get('description', '')}"
+
+    @staticmethod
+    def job_features(analysis: Dict) -> Set[str]:
+        """Required skills plus the industry, the vector jobs are clustered on"""
+        feature = set(analysis.get('required_skills', []))
+        if analysis.get('industry', 'general') != 'general':
+            feature.add(f"industry:{analysis['industry']}")
+        return feature
+
+    @staticmethod
+    def jaccard(a: Set[str], b: Set[str]) -> float:
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+    def cluster_jobs(self, jobs: List[Dict], analyses: Optional[List[Dict]] = None) -> List[Dict[str, Any]]:
+        """Cluster jobs by their analyze_job_description skill vectors"""
+        try:
+            if analyses is None:
+                analyses = self.ai_engine.analyze_job_descriptions([self.job_text(job) for job in jobs])
+
+            features = [self.job_features(analysis) for analysis in analyses]
+
+            # Seed clusters with the richest skill profiles first so small profiles join them
+            order = sorted(range(len(jobs)), key=lambda i: len(features[i]), reverse=True)
+
+            clusters = []
+            for index in order:
+                best_cluster = None
+                best_similarity = self.similarity_threshold
+                for cluster in clusters:
+                    similarity = self.jaccard(features[index], cluster['features'])
+                    if similarity >= best_similarity:
+                        best_cluster, best_similarity = cluster, similarity
+
+                if best_cluster is None:
+                    best_cluster = {'features': set(), 'job_indices': []}
+                    clusters.append(best_cluster)
+                best_cluster['features'] |= features[index]
+                best_cluster['job_indices'].append(index)
+
+            return [self._describe_cluster(cluster_id, cluster, analyses) for cluster_id, cluster in enumerate(clusters)]
+
+        except Exception as e:
+            self.logger.error(f"Error clustering jobs: {e}")
+            # One cluster per job keeps every job covered
+            analyses = analyses or [self.ai_engine.analyze_job_description(self.job_text(job)) for job in jobs]
+            return [{'cluster_id': i, 'job_indices': [i], 'skills': analyses[i].get('required_skills', []),
+                     'job_analysis': analyses[i]} for i in range(len(jobs))]
+
+    def _describe_cluster(self, cluster_id: int, cluster: Dict, analyses: List[Dict]) -> Dict[str, Any]:
+        """Merge member analyses into one job analysis for the cluster's resume variant"""
+        members = sorted(cluster['job_indices'])
+        skill_counts = Counter(skill for i in members for skill in dict.fromkeys(analyses[i].get('required_skills', [])))
+        industry_counts = Counter(analyses[i].get('industry', 'general') for i in members)
+        job_type_counts = Counter(analyses[i].get('job_type', 'general') for i in members)
+
+        # Skills shared by most members come first so they lead the tailored summary
+        skills = [skill for skill, _ in skill_counts.most_common()]
+        job_analysis = {
+            'required_skills': skills,
+            'job_type': job_type_counts.most_common(1)[0][0],
+            'industry': industry_counts.most_common(1)[0][0],
+            'required_experience': max(analyses[i].get('required_experience', 2) for i in members),
+            'requires_degree': any(analyses[i].get('requires_degree', False) for i in members),
+            'salary_range': None,
+            'match_score': len(skills) / 10
+        }
+        return {
+            'cluster_id': cluster_id,
+            'job_indices': members,
+            'skills': skills,
+            'job_analysis': job_analysis
+        }
+
+    def build_variants(self, resume_text: str, jobs: List[Dict], render_pdf: bool = True) -> Dict[str, Any]:
+        """Produce one enhanced resume per cluster and map every job to its cluster's variant"""
+        resume_data = self.ai_engine.parse_resume(resume_text)
+        analyses = self.ai_engine.analyze_job_descriptions([self.job_text(job) for job in jobs])
+        clusters = self.cluster_jobs(jobs, analyses)
+
+        variants = []
+        job_variants = [0] * len(jobs)
+        for cluster in clusters:
+            enhanced_resume = self.ai_engine.optimize_resume_content(resume_data, cluster['job_analysis'])
+            variant = {
+                'cluster_id': cluster['cluster_id'],
+                'skills': cluster['skills'],
+                'job_indices': cluster['job_indices'],
+                'enhanced_resume': enhanced_resume,
+                'missing_skills': self.ai_engine.identify_missing_skills(resume_data, cluster['job_analysis'])
+            }
+            if render_pdf:
+                variant['pdf_content'] = self.ai_engine.generate_resume_pdf(enhanced_resume)
+            variants.append(variant)
+
+            for index in cluster['job_indices']:
+                job_variants[index] = cluster['cluster_id']
+
+        self.logger.info(f"Built {len(variants)} resume variants for {len(jobs)} jobs")
+        return {
+            'variants': variants,
+            'job_variants': job_variants,
+            'match_scores': [analysis['match_score'] for analysis in analyses]
+        }
+
+class VariantAssigner:
+    """
+    Streaming counterpart of ResumeVariantPlanner for jobs that arrive one by one
+    - assign() places a job in the most similar cluster seen so far (same Jaccard
+      rule) or seeds a new one; a cluster keeps its seed's skill profile, which is
+      what its resume is tailored to
+    - variant() optimizes the resume once per cluster, so tailoring work in a
+      session scales with distinct skill profiles rather than with jobs
+    - Both are thread-safe for blocking pipeline stages
+    """
+
+    def __init__(self, resume_text: str, ai_engine: Optional[CustomAIEngine] = None,
+                 similarity_threshold: float = 0.6):
+        self.planner = ResumeVariantPlanner(ai_engine, similarity_threshold)
+        self.ai_engine = self.planner.ai_engine
+        self.resume_data = self.ai_engine.parse_resume(resume_text)
+        self.clusters: List[Dict[str, Any]] = []  # features, job_analysis, variant
+        self.lock = threading.Lock()
+        self.variant_locks: Dict[int, threading.Lock] = {}
+        self.jobs = 0
+
+    def assign(self, job: Dict) -> Tuple[int, float]:
+        """(cluster_id, match_score) for a job"""
+        analysis = self.ai_engine.analyze_job_description(self.planner.job_text(job))
+        features = self.planner.job_features(analysis)
+        with self.lock:
+            self.jobs += 1
+            best_id, best_similarity = None, self.planner.similarity_threshold
+            for cluster_id, cluster in enumerate(self.clusters):
+                similarity = self.planner.jaccard(features, cluster['features'])
+                if similarity >= best_similarity:
+                    best_id, best_similarity = cluster_id, similarity
+            if best_id is None:
+                best_id = len(self.clusters)
+                self.clusters.append({'features': features, 'job_analysis': analysis, 'variant': None})
+                self.variant_locks[best_id] = threading.Lock()
+        return best_id, analysis['match_score']
+
+    def variant(self, cluster_id: int) -> Dict[str, Any]:
+        """The cluster's enhanced resume and missing skills, built on first use"""
+        with self.variant_locks[cluster_id]:
+            cluster = self.clusters[cluster_id]
+            if cluster['variant'] is None:
+                cluster['variant'] = {
+                    'enhanced_resume': self.ai_engine.optimize_resume_content(self.resume_data, cluster['job_analysis']),
+                    'missing_skills': self.ai_engine.identify_missing_skills(self.resume_data, cluster['job_analysis'])
+                }
+            return cluster['variant']
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "jobs": self.jobs,
+                "variants": len(self.clusters),
+                "built": sum(1 for cluster in self.clusters if cluster['variant'] is not None)
+            }
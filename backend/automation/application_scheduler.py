@@ -0,0 +1,168 @@
+import math
+import time
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager, nullcontext
+from typing import Dict, List, Optional, Any, AsyncIterator, AsyncContextManager, Callable
+
+# Submission limits per platform, shared by every session and user
+# - rate_per_minute: sustained submissions, burst: submissions allowed back to back
+# - concurrency: applications in flight at once, avg_seconds: typical duration of one
+DEFAULT_PLATFORM_LIMITS = {
+    "linkedin": {"rate_per_minute": 6, "burst": 2, "concurrency": 2, "avg_seconds": 20},
+    "indeed": {"rate_per_minute": 10, "burst": 3, "concurrency": 3, "avg_seconds": 15},
+    "glassdoor": {"rate_per_minute": 4, "burst": 1, "concurrency": 1, "avg_seconds": 20},
+    "handshake": {"rate_per_minute": 4, "burst": 1, "concurrency": 1, "avg_seconds": 20},
+    "default": {"rate_per_minute": 4, "burst": 1, "concurrency": 1, "avg_seconds": 20}
+}
+
+class TokenBucket:
+    """
+    Token bucket checked at the moment of submission
+    - Tokens refill at rate per second up to burst
+    - try_take() takes a token only if one exists, so submissions can never run
+      ahead of the rate however long callers waited for other capacity
+    - wait_seconds() is how long until the next token exists
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> bool:
+        self._refill(time.monotonic())
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_seconds(self) -> float:
+        self._refill(time.monotonic())
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def available(self) -> float:
+        self._refill(time.monotonic())
+        return self.tokens
+
+class ApplicationScheduler:
+    """
+    Central pacing of application submissions per platform
+    - Every submission takes a token from its platform's bucket once it holds its
+      capacity, so a backlog released at once still submits at the platform's rate
+    - A per-platform semaphore caps applications in flight
+    - plan_platforms() orders a session's applications so platforms are used in
+      parallel, and projected_seconds() estimates when a session will finish
+    """
+
+    def __init__(self, platform_limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.platform_limits = platform_limits or DEFAULT_PLATFORM_LIMITS
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight: Counter = Counter()
+        self.submitted: Counter = Counter()
+        self.waiting: Counter = Counter()  # callers waiting for a token or a slot
+
+    def limits(self, platform: str) -> Dict[str, float]:
+        return self.platform_limits.get(platform) or self.platform_limits["default"]
+
+    def _bucket(self, platform: str) -> TokenBucket:
+        bucket = self.buckets.get(platform)
+        if bucket is None:
+            limits = self.limits(platform)
+            bucket = self.buckets[platform] = TokenBucket(limits["rate_per_minute"] / 60.0, limits["burst"])
+        return bucket
+
+    def _semaphore(self, platform: str) -> asyncio.Semaphore:
+        semaphore = self.semaphores.get(platform)
+        if semaphore is None:
+            semaphore = self.semaphores[platform] = asyncio.Semaphore(int(self.limits(platform)["concurrency"]))
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, platform: str,
+                   fair_slot: Optional[Callable[[], AsyncContextManager]] = None) -> AsyncIterator[None]:
+        """
+        Hold a submission slot: a fair_slot() context (a FairScheduler slot, if
+        given), the platform's concurrency limit and one of its tokens
+        - Callers sleep until a token should exist before entering fair_slot, so a
+          tenant throttled by a platform does not hold shared capacity while it sleeps
+        - The token is taken only once both slots are held; when another caller
+          got it first, both slots are released and the caller waits again
+        """
+        bucket = self._bucket(platform)
+        self.waiting[platform] += 1
+        waiting = True
+        try:
+            while True:
+                delay = bucket.wait_seconds()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                async with fair_slot() if fair_slot else nullcontext():
+                    async with self._semaphore(platform):
+                        if not bucket.try_take():
+                            continue
+                        self.waiting[platform] -= 1
+                        waiting = False
+                        self.in_flight[platform] += 1
+                        try:
+                            yield
+                        finally:
+                            self.in_flight[platform] -= 1
+                            self.submitted[platform] += 1
+                        return
+        finally:
+            if waiting:
+                self.waiting[platform] -= 1
+
+    def plan_platforms(self, platforms: List[str], count: int) -> List[str]:
+        """
+        Platform for each of the next count applications, ordered by when each
+        platform can next accept one, so faster platforms take a larger share and
+        every platform is kept busy
+        """
+        platforms = [p for p in dict.fromkeys(platforms)] or ["default"]
+        next_free = {}
+        for platform in platforms:
+            bucket = self._bucket(platform)
+            next_free[platform] = max(0.0, (1 + self.waiting[platform] - bucket.available()) / bucket.rate)
+
+        plan = []
+        for _ in range(count):
+            platform = min(platforms, key=lambda p: (next_free[p], platforms.index(p)))
+            plan.append(platform)
+            next_free[platform] += 1 / self._bucket(platform).rate
+        return plan
+
+    def projected_seconds(self, remaining: Dict[str, int]) -> float:
+        """Seconds until the given per-platform application counts are all submitted"""
+        projected = 0.0
+        for platform, count in remaining.items():
+            if count <= 0:
+                continue
+            limits = self.limits(platform)
+            bucket = self._bucket(platform)
+            # Bound by the token rate (including other sessions' waiting submissions) and by concurrency
+            rate_bound = max(0.0, (count + self.waiting[platform] - bucket.available()) / bucket.rate)
+            concurrency_bound = math.ceil(count / limits["concurrency"]) * limits["avg_seconds"]
+            projected = max(projected, rate_bound, concurrency_bound)
+        return projected
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            platform: {
+                "tokens": round(bucket.available(), 2),
+                "waiting": self.waiting[platform],
+                "backlog_seconds": round(max(0.0, (self.waiting[platform] - bucket.available()) / bucket.rate), 2),
+                "in_flight": self.in_flight[platform],
+                "submitted": self.submitted[platform]
+            }
+            for platform, bucket in self.buckets.items()
+        }
@@ -0,0 +1,100 @@
+import random
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Any, Callable
+from selenium import webdriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.support.select import Select
+
+async def human_pause(low: float, high: float):
+    """Randomized pause between browser actions that does not block the event loop"""
+    await asyncio.sleep(random.uniform(low, high))
+
+class AsyncDriver:
+    """
+    Async facade over one Selenium WebDriver
+    - Every command for this browser runs on its own single worker thread, so
+      commands stay ordered (WebDriver is not thread-safe) while other browsers
+      and the API keep running on the event loop
+    - run() executes a whole block of synchronous Selenium code on that thread,
+      for sequences where one hop per command would be wasteful
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webdriver")
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, WebElement):
+            return AsyncElement(value, self)
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        return value
+
+    async def get(self, url: str):
+        await self.run(self.driver.get, url)
+
+    async def current_url(self) -> str:
+        return await self.run(lambda: self.driver.current_url)
+
+    async def find_element(self, by: str, value: str) -> 'AsyncElement':
+        return AsyncElement(await self.run(self.driver.find_element, by, value), self)
+
+    async def find_elements(self, by: str, value: str) -> List['AsyncElement']:
+        return [AsyncElement(element, self) for element in await self.run(self.driver.find_elements, by, value)]
+
+    async def wait_for(self, condition: Callable, timeout: float = 10) -> Any:
+        """WebDriverWait(...).until(condition) on the browser thread"""
+        return self._wrap(await self.run(lambda: WebDriverWait(self.driver, timeout).until(condition)))
+
+    async def execute_script(self, script: str, *args) -> Any:
+        args = [arg.element if isinstance(arg, AsyncElement) else arg for arg in args]
+        return self._wrap(await self.run(self.driver.execute_script, script, *args))
+
+    def close(self):
+        """Stop the command thread; the driver itself belongs to its owner (e.g. the pool)"""
+        self.executor.shutdown(wait=False)
+
+class AsyncElement:
+    """Async facade over a WebElement, running on its driver's thread"""
+
+    def __init__(self, element: WebElement, driver: AsyncDriver):
+        self.element = element
+        self.driver = driver
+
+    async def click(self):
+        await self.driver.run(self.element.click)
+
+    async def clear(self):
+        await self.driver.run(self.element.clear)
+
+    async def send_keys(self, *values):
+        await self.driver.run(self.element.send_keys, *values)
+
+    async def fill(self, value: str):
+        """Clear the field and type a value in one hop"""
+        def fill_field():
+            self.element.clear()
+            self.element.send_keys(value)
+        await self.driver.run(fill_field)
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self.driver.run(self.element.get_attribute, name)
+
+    async def is_selected(self) -> bool:
+        return await self.driver.run(self.element.is_selected)
+
+    async def text(self) -> str:
+        return await self.driver.run(lambda: self.element.text)
+
+    async def find_element(self, by: str, value: str) -> 'AsyncElement':
+        return AsyncElement(await self.driver.run(self.element.find_element, by, value), self.driver)
+
+    async def select_by_visible_text(self, text: str):
+        await self.driver.run(lambda: Select(self.element).select_by_visible_text(text))
@@ -0,0 +1,359 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from automation.async_driver import AsyncDriver
+
+try:
+    import psutil
+except ImportError:
+    psutil = None  # memory-based recycling is skipped without psutil
+
+# Rough resident size of one headless Chrome with a job-site page open
+BROWSER_MEMORY_MB = 400
+
+# Analytics, ad and session-replay hosts job sites pull in; nothing we read or fill depends on them
+BLOCKED_TRACKER_URLS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.com*", "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*",
+    "*segment.com/analytics*", "*newrelic.com*", "*nr-data.net*", "*scorecardresearch.com*",
+    "*quantserve.com*", "*optimizely.com*", "*fullstory.com*", "*bing.com/bat*", "*ads.linkedin.com*",
+    "*px.ads.linkedin.com*", "*snap.licdn.com*"
+]
+BLOCKED_FONT_MEDIA_URLS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg"]
+
+# How pages are loaded
+# - page_load_strategy: "normal" waits for every subresource, "eager" returns at DOMContentLoaded
+# - block_images: disable image loading through Chrome content settings
+# - blocked_urls: request URL patterns dropped through the DevTools protocol
+# The scrapers read DOM text and the appliers fill forms, so pooled browsers default to
+# "lightweight"; "full" is for pages that need images (e.g. image CAPTCHA challenges)
+LOAD_PROFILES = {
+    "full": {"page_load_strategy": "normal", "block_images": False, "blocked_urls": []},
+    "lightweight": {
+        "page_load_strategy": "eager",
+        "block_images": True,
+        "blocked_urls": BLOCKED_FONT_MEDIA_URLS + BLOCKED_TRACKER_URLS
+    }
+}
+DEFAULT_LOAD_PROFILE = os.getenv("BROWSER_LOAD_PROFILE", "lightweight")
+
+@lru_cache(maxsize=1)
+def resolve_driver_path() -> str:
+    """Locate (and download if needed) chromedriver once per process"""
+    return ChromeDriverManager().install()
+
+def get_load_profile(name: str) -> Dict[str, Any]:
+    if name not in LOAD_PROFILES:
+        raise ValueError(f"Unknown browser load profile: {name}")
+    return LOAD_PROFILES[name]
+
+def build_chrome_options(headless: bool = True, load_profile: str = "full") -> Options:
+    profile = get_load_profile(load_profile)
+    chrome_options = Options()
+    chrome_options.page_load_strategy = profile["page_load_strategy"]
+    if profile["block_images"]:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
+    return chrome_options
+
+def launch_chrome(headless: bool = True, load_profile: str = "full") -> webdriver.Chrome:
+    driver = webdriver.Chrome(
+        service=webdriver.chrome.service.Service(resolve_driver_path()),
+        options=build_chrome_options(headless, load_profile)
+    )
+    blocked_urls = get_load_profile(load_profile)["blocked_urls"]
+    if blocked_urls:
+        # Blocking applies to the driver's tab, which is the only one pooled browsers use
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+    return driver
+
+def driver_memory_mb(driver: Any) -> float:
+    """Resident memory of a driver and its Chrome processes (0 without psutil)"""
+    if psutil is None:
+        return 0.0
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+def default_pool_size() -> int:
+    """Half the cores, limited by how many browsers fit in half of physical memory"""
+    by_cores = max(1, (os.cpu_count() or 2) // 2)
+    try:
+        total_mb = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+        by_memory = max(1, (total_mb // 2) // BROWSER_MEMORY_MB)
+    except (ValueError, OSError, AttributeError):
+        by_memory = by_cores
+    return min(by_cores, by_memory)
+
+class PooledBrowser:
+    """One pooled Chrome instance and its bookkeeping"""
+
+    def __init__(self, browser_id: int, driver: Any):
+        self.id = browser_id
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+        # (user_id, platform) whose logged-in session this browser holds; None for anonymous leases
+        self.session_key: Optional[Tuple[str, str]] = None
+        self.leased_at: Optional[float] = None
+        self.lease_valid = False
+        self.baseline_memory_mb = 0.0
+        self._async_driver: Optional[AsyncDriver] = None
+
+    @property
+    def async_driver(self) -> AsyncDriver:
+        """Async facade bound to this browser's command thread, created on first use"""
+        if self._async_driver is None:
+            self._async_driver = AsyncDriver(self.driver)
+        return self._async_driver
+
+class BrowserPool:
+    """
+    Warm pool of headless Chrome instances shared by scrapers and appliers
+    - Instances are launched up front, sized to cores and memory, with the
+      driver binary resolved once
+    - lease(platform, user_id) reuses an idle browser still logged in as that user
+      on that platform; every other lease gets a reset one (all cookies and the
+      page's storage cleared, blank page), so sessions never cross users and
+      anonymous leases (scrapers) never see a user's session
+    - Browsers are recycled after max_uses leases or when their memory grows by
+      more than max_memory_growth_mb
+    - A watchdog kills browsers held longer than lease_timeout and replaces them
+    - load_profile picks how pages load (see LOAD_PROFILES)
+    """
+
+    def __init__(self, size: Optional[int] = None, headless: bool = True, max_uses: int = 50,
+                 max_memory_growth_mb: int = 300, lease_timeout: int = 300, watchdog_interval: int = 15,
+                 driver_factory: Optional[Callable[[], Any]] = None, load_profile: str = DEFAULT_LOAD_PROFILE):
+        self.logger = logging.getLogger(__name__)
+        self.size = size or default_pool_size()
+        self.max_uses = max_uses
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.lease_timeout = lease_timeout
+        self.watchdog_interval = watchdog_interval
+        self.load_profile = load_profile
+        get_load_profile(load_profile)  # fail fast on an unknown profile name
+        self.driver_factory = driver_factory or (lambda: launch_chrome(headless, load_profile))
+        self.idle: List[PooledBrowser] = []
+        self.leased: Dict[int, PooledBrowser] = {}
+        self.condition = threading.Condition()
+        self.next_id = 0
+        self.launching = 0
+        self.closed = False
+        self.stats = {"launched": 0, "recycled": 0, "killed": 0, "leases": 0, "warm_session_hits": 0, "resets": 0}
+        self.watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        """Launch the pool's browsers in parallel and start the watchdog"""
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            browsers = [b for b in executor.map(lambda _: self._launch(), range(self.size)) if b is not None]
+        with self.condition:
+            self.idle.extend(browsers)
+            self.condition.notify_all()
+
+        self.watchdog = threading.Thread(target=self._watch, name="browser-pool-watchdog", daemon=True)
+        self.watchdog.start()
+        self.logger.info(f"Browser pool started with {len(browsers)} instances")
+
+    def _launch(self) -> Optional[PooledBrowser]:
+        try:
+            driver = self.driver_factory()
+            with self.condition:
+                self.next_id += 1
+                browser = PooledBrowser(self.next_id, driver)
+                self.stats["launched"] += 1
+            browser.baseline_memory_mb = self._memory_mb(browser)
+            return browser
+        except Exception as e:
+            self.logger.error(f"Failed to launch browser: {e}")
+            return None
+
+    def _memory_mb(self, browser: PooledBrowser) -> float:
+        return driver_memory_mb(browser.driver)
+
+    def acquire(self, platform: Optional[str] = None, timeout: Optional[float] = None,
+                user_id: Optional[str] = None) -> PooledBrowser:
+        """Lease a browser, blocking until one is free; pass user_id for a lease that logs in"""
+        session_key = (user_id, platform) if user_id and platform else None
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Browser pool is closed")
+                if self.idle:
+                    break
+                # Replace browsers lost to failed launches while everything else is busy
+                if len(self.leased) + self.launching < self.size:
+                    self.launching += 1
+                    self.condition.release()
+                    try:
+                        browser = self._launch()
+                    finally:
+                        self.condition.acquire()
+                        self.launching -= 1
+                    if browser is None:
+                        raise RuntimeError("Failed to launch browser")
+                    self.idle.append(browser)
+                    continue
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No browser available")
+                self.condition.wait(remaining)
+
+            warm = session_key is not None and next((b for b in self.idle if b.session_key == session_key), None)
+            if warm:
+                browser = warm
+                self.stats["warm_session_hits"] += 1
+            else:
+                # Prefer a browser without a logged-in session so warm ones stay available
+                browser = next((b for b in self.idle if b.session_key is None), self.idle[0])
+            self.idle.remove(browser)
+            browser.leased_at = time.monotonic()
+            browser.lease_valid = True
+            self.leased[browser.id] = browser
+            self.stats["leases"] += 1
+
+        if not warm:
+            if not self._reset(browser):
+                # Never hand out a context that may still hold someone's session
+                self.release(browser, healthy=False)
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                return self.acquire(platform, remaining, user_id)
+            browser.session_key = session_key
+        return browser
+
+    def _reset(self, browser: PooledBrowser) -> bool:
+        """Clear every site's cookies and the current page's storage, then park on a blank page"""
+        driver = browser.driver
+        try:
+            try:
+                driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            except Exception:
+                pass  # pages like about:blank have no storage
+            if hasattr(driver, "execute_cdp_cmd"):
+                # delete_all_cookies() only reaches the current domain
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            else:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            with self.condition:
+                self.stats["resets"] += 1
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to reset browser {browser.id}: {e}")
+            return False
+
+    def release(self, browser: PooledBrowser, healthy: bool = True):
+        """Return a browser; it is recycled when worn out, bloated or broken"""
+        with self.condition:
+            if not browser.lease_valid:
+                return  # the watchdog already killed it
+            browser.lease_valid = False
+            self.leased.pop(browser.id, None)
+            browser.uses += 1
+
+        growth = self._memory_mb(browser) - browser.baseline_memory_mb
+        if not healthy or browser.uses >= self.max_uses or growth > self.max_memory_growth_mb:
+            self._recycle(browser)
+            return
+
+        with self.condition:
+            if self.closed:
+                self._quit(browser)
+                return
+            self.idle.append(browser)
+            self.condition.notify()
+
+    @contextmanager
+    def lease(self, platform: Optional[str] = None, timeout: Optional[float] = None,
+              user_id: Optional[str] = None) -> Iterator[PooledBrowser]:
+        browser = self.acquire(platform, timeout, user_id)
+        healthy = True
+        try:
+            yield browser
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(browser, healthy)
+
+    def _recycle(self, browser: PooledBrowser):
+        self._quit(browser)
+        replacement = self._launch() if not self.closed else None
+        with self.condition:
+            self.stats["recycled"] += 1
+            if replacement is not None:
+                self.idle.append(replacement)
+            self.condition.notify()
+
+    def _quit(self, browser: PooledBrowser):
+        if browser._async_driver is not None:
+            browser._async_driver.close()
+        try:
+            browser.driver.quit()
+        except Exception:
+            # A hung driver may not answer quit; kill its process instead
+            try:
+                browser.driver.service.process.kill()
+            except Exception:
+                pass
+
+    def _watch(self):
+        while not self.closed:
+            time.sleep(self.watchdog_interval)
+            now = time.monotonic()
+            with self.condition:
+                hung = [b for b in self.leased.values() if now - b.leased_at > self.lease_timeout]
+                for browser in hung:
+                    browser.lease_valid = False
+                    del self.leased[browser.id]
+                    self.stats["killed"] += 1
+            for browser in hung:
+                self.logger.warning(f"Killing browser {browser.id} held for over {self.lease_timeout}s")
+                self._recycle(browser)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            browsers = self.idle + list(self.leased.values())
+            self.idle = []
+            self.leased = {}
+            self.condition.notify_all()
+        for browser in browsers:
+            self._quit(browser)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            return {**self.stats, "size": self.size, "idle": len(self.idle), "leased": len(self.leased),
+                    "load_profile": self.load_profile}
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide pool, started on first use"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+            _shared_pool.start()
+        return _shared_pool
@@ -0,0 +1,191 @@
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import numpy as np
+from ai_services.job_matcher import parse_salary_range, seniority_rung
+from automation.location_service import LocationService
+
+# Unknown values never reject a job: constraints only apply to what a posting states
+UNKNOWN = -1
+
+CLEARANCE_LEVELS = {"none": 0, "public_trust": 1, "secret": 2, "top_secret": 3, "ts_sci": 4}
+# Checked in order, most demanding first; a requirement naming no level counts as secret
+CLEARANCE_LEVEL_PATTERNS = [
+    (4, re.compile(r"\bts\s*[/-]?\s*sci\b|\bsci clearance\b")),
+    (3, re.compile(r"\btop secret\b")),
+    (2, re.compile(r"\bsecret\b")),
+    (1, re.compile(r"\bpublic trust\b"))
+]
+CLEARANCE_MENTION = re.compile(r"\bclearance\b|\bpublic trust\b|\bts\s*[/-]?\s*sci\b")
+# Only a sentence that demands a clearance rejects; "Secret clearance a plus" does not
+CLEARANCE_REQUIRED = re.compile(r"\b(?:required?|requires|must|mandatory|active|current)\b")
+CLEARANCE_OPTIONAL = re.compile(r"\b(?:a plus|preferred|nice to have|desired|desirable|bonus|"
+                                r"(?:ability|able|willing) to obtain|eligib\w*)\b")
+
+NO_SPONSORSHIP_PATTERNS = [
+    "no sponsorship", "not sponsor", "unable to sponsor", "cannot sponsor", "can't sponsor", "will not sponsor",
+    "won't sponsor", "not able to sponsor", "without sponsorship", "sponsorship is not available",
+    "sponsorship not available", "us citizens only", "u.s. citizens only", "must be a us citizen",
+    "must be a u.s. citizen", "citizenship required"
+]
+SPONSORSHIP_PATTERNS = ["sponsorship available", "will sponsor", "visa sponsorship provided", "h1b sponsorship",
+                        "h-1b sponsorship", "sponsorship offered"]
+
+REMOTE_PATTERNS = ["remote", "work from home", "wfh", "anywhere"]
+ONSITE_PATTERNS = ["on-site", "onsite", "in office", "in-office", "on site"]
+
+# Seniority rungs (see job_matcher.SENIORITY_KEYWORDS) a user can reach above and below their own
+SENIORITY_REACH_UP = 1
+SENIORITY_REACH_DOWN = 2
+
+STATE_CODES = {info["name"].lower(): code for code, info in LocationService().us_states.items()}
+
+def _text(job: Dict, *fields: str) -> str:
+    return " ".join(str(job.get(field) or "") for field in fields).lower()
+
+def required_clearance(text: str) -> int:
+    """Highest clearance level the posting requires; 0 when it only prefers one or says nothing"""
+    level = 0
+    for sentence in re.split(r"[.;\n]", text):
+        if not CLEARANCE_MENTION.search(sentence) or CLEARANCE_OPTIONAL.search(sentence):
+            continue
+        if CLEARANCE_REQUIRED.search(sentence):
+            level = max(level, next((lvl for lvl, pattern in CLEARANCE_LEVEL_PATTERNS if pattern.search(sentence)), 2))
+    return level
+
+def _state_code(location: str) -> Optional[str]:
+    """Two-letter US state from "City, ST" or a state name; None for anything else ("Toronto, ON", "Remote, US")"""
+    location = (location or "").strip()
+    match = re.search(r",\s*([A-Z]{2})\b", location)
+    if match and match.group(1) in STATE_CODES.values():
+        return match.group(1)
+    if location.upper() in STATE_CODES.values():
+        return location.upper()
+    lowered = location.lower()
+    # Longest names first so "West Virginia" is not read as "Virginia"
+    for name in sorted(STATE_CODES, key=len, reverse=True):
+        if re.search(rf"\b{name}\b", lowered):
+            return STATE_CODES[name]
+    return None
+
+class JobColumns:
+    """
+    A page of jobs normalized into parallel columns
+    - Numeric columns use UNKNOWN (-1) or NaN where the posting says nothing
+    - Only unambiguous signals are recorded: seniority comes from the posting's
+      experience_level field (titles like "Lead Generation Specialist" are not
+      a rung), clearance from sentences that require one
+    """
+
+    def __init__(self, jobs: List[Dict]):
+        count = len(jobs)
+        self.count = count
+        self.salary_min = np.full(count, np.nan)
+        self.salary_max = np.full(count, np.nan)
+        self.remote = np.full(count, UNKNOWN, dtype=np.int8)  # 1 remote, 0 on-site
+        self.sponsorship = np.full(count, UNKNOWN, dtype=np.int8)  # 1 offered, 0 ruled out
+        self.clearance = np.zeros(count, dtype=np.int8)
+        self.seniority = np.full(count, UNKNOWN, dtype=np.int8)
+        self.state = np.full(count, "", dtype=object)
+
+        for row, job in enumerate(jobs):
+            text = _text(job, "title", "description", "requirements_text")
+            location = str(job.get("location") or "")
+
+            salary = parse_salary_range(str(job.get("salary") or job.get("salary_range") or ""))
+            if salary:
+                self.salary_min[row], self.salary_max[row] = salary
+
+            remote_flag = job.get("remote_work", job.get("remote"))
+            location_lower = location.lower()
+            if remote_flag is True or any(p in location_lower for p in REMOTE_PATTERNS):
+                self.remote[row] = 1
+            elif any(p in text or p in location_lower for p in ONSITE_PATTERNS):
+                self.remote[row] = 0
+            elif any(p in text for p in REMOTE_PATTERNS):
+                self.remote[row] = 1
+
+            if any(p in text for p in NO_SPONSORSHIP_PATTERNS):
+                self.sponsorship[row] = 0
+            elif any(p in text for p in SPONSORSHIP_PATTERNS):
+                self.sponsorship[row] = 1
+
+            self.clearance[row] = required_clearance(text)
+
+            rung = seniority_rung(str(job.get("experience_level") or ""))
+            if rung is not None:
+                self.seniority[row] = rung
+
+            self.state[row] = _state_code(location) or ""
+
+class EligibilityFilter:
+    """
+    A user's hard constraints compiled once into vectorized predicates
+    - Each rule maps JobColumns to a boolean "rejected" array
+    - apply() keeps the jobs no rule rejects and counts rejections per rule,
+      so work the pipeline avoided is visible in session stats
+    """
+
+    def __init__(self, rules: List[Tuple[str, Callable[[JobColumns], np.ndarray]]]):
+        self.logger = logging.getLogger(__name__)
+        self.rules = rules
+        self.rejections: Counter = Counter()
+        self.checked = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_profile(cls, profile: Optional[Dict]) -> 'EligibilityFilter':
+        """Compile a UserProfile dict; an empty profile yields a filter that keeps everything"""
+        profile = profile or {}
+        rules = []
+
+        if profile.get("visa_sponsorship_required"):
+            rules.append(("visa_sponsorship", lambda jobs: jobs.sponsorship == 0))
+
+        clearance = CLEARANCE_LEVELS.get(str(profile.get("security_clearance") or "none").lower(), 0)
+        rules.append(("security_clearance", lambda jobs: jobs.clearance > clearance))
+
+        salary_floor = profile.get("salary_expectation_min") or 0
+        if salary_floor > 0:
+            # NaN (no salary posted) compares False, so those jobs pass
+            rules.append(("salary_below_minimum", lambda jobs: jobs.salary_max < salary_floor))
+
+        remote_pref = profile.get("remote_work_preference", "hybrid")
+        if remote_pref == "remote":
+            rules.append(("remote_only", lambda jobs: jobs.remote == 0))
+
+        home_state = _state_code(profile.get("state", ""))
+        if not profile.get("willing_to_relocate") and remote_pref != "remote" and home_state:
+            rules.append(("relocation", lambda jobs: (jobs.remote != 1) & (jobs.state != "") & (jobs.state != home_state)))
+
+        rung = seniority_rung(str(profile.get("experience_level_detailed") or ""))
+        if rung is not None:
+            rules.append(("seniority", lambda jobs: (jobs.seniority != UNKNOWN) & (
+                (jobs.seniority > rung + SENIORITY_REACH_UP) | (jobs.seniority < rung - SENIORITY_REACH_DOWN))))
+
+        return cls(rules)
+
+    def apply(self, jobs: List[Dict]) -> List[Dict]:
+        """The eligible jobs of a page, in order"""
+        if not jobs:
+            return []
+        columns = JobColumns(jobs)
+        rejected = np.zeros(columns.count, dtype=bool)
+        for name, predicate in self.rules:
+            rule_rejects = np.asarray(predicate(columns), dtype=bool)
+            # Each job is charged to the first rule that rejects it
+            self.rejections[name] += int(np.count_nonzero(rule_rejects & ~rejected))
+            rejected |= rule_rejects
+
+        self.checked += columns.count
+        self.rejected += int(np.count_nonzero(rejected))
+        return [job for job, drop in zip(jobs, rejected) if not drop]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rules": [name for name, _ in self.rules],
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "rejections_by_rule": {name: self.rejections[name] for name, _ in self.rules}
+        }
@@ -0,0 +1,132 @@
+import time
+import asyncio
+import logging
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Any, AsyncIterator
+
+class FairScheduler:
+    """
+    Deficit-round-robin scheduler for shared automation capacity
+    - Work units (one application, one render, ...) acquire a slot before running
+    - Tenants with waiting work are visited in turn; each visit adds quantum x weight
+      to the tenant's deficit and grants work while the deficit covers its cost
+    - per_tenant_limit caps how many slots one tenant holds at once, so a
+      100-application session cannot crowd out a 5-application one
+    """
+
+    def __init__(self, capacity: int = 4, per_tenant_limit: int = 2, quantum: float = 1.0,
+                 wait_samples: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.capacity = capacity
+        self.per_tenant_limit = per_tenant_limit
+        self.quantum = quantum
+        self.weights: Dict[str, float] = {}
+        self.waiters: Dict[str, deque] = {}  # tenant -> deque of (future, cost, enqueued_at)
+        self.active: deque = deque()  # round-robin order of tenants with waiting work
+        self.deficit: Dict[str, float] = {}
+        self.topped_up: Optional[str] = None  # tenant whose current visit already got its quantum
+        self.in_use = 0
+        self.running: Counter = Counter()
+        self.granted: Counter = Counter()
+        self.wait_samples: deque = deque(maxlen=wait_samples)
+
+    def set_weight(self, tenant: str, weight: float):
+        """Give a tenant a larger (or smaller) share; the default weight is 1"""
+        self.weights[tenant] = weight
+
+    async def acquire(self, tenant: str, cost: float = 1.0):
+        future = asyncio.get_running_loop().create_future()
+        if tenant not in self.waiters:
+            self.waiters[tenant] = deque()
+            self.deficit[tenant] = 0.0
+            self.active.append(tenant)
+        self.waiters[tenant].append((future, cost, time.monotonic()))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just as the waiter was cancelled: hand the slot back
+            if future.done() and not future.cancelled():
+                self.release(tenant)
+            else:
+                future.cancel()
+                self._dispatch()
+            raise
+
+    def release(self, tenant: str):
+        self.in_use -= 1
+        self.running[tenant] -= 1
+        if self.running[tenant] <= 0:
+            del self.running[tenant]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one unit of shared capacity for the duration of the block"""
+        await self.acquire(tenant, cost)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    def _dispatch(self):
+        blocked = 0  # tenants skipped in a row because they are at their cap
+        while self.in_use < self.capacity and self.active and blocked < len(self.active):
+            tenant = self.active[0]
+            queue = self.waiters[tenant]
+            while queue and queue[0][0].done():
+                queue.popleft()  # cancelled waiters
+            if not queue:
+                self.active.popleft()
+                del self.waiters[tenant]
+                del self.deficit[tenant]
+                self.topped_up = None
+                continue
+
+            if self.running[tenant] >= self.per_tenant_limit:
+                self._next_tenant()
+                blocked += 1
+                continue
+
+            if self.topped_up != tenant:
+                self.deficit[tenant] += self.quantum * self.weights.get(tenant, 1.0)
+                self.topped_up = tenant
+
+            future, cost, enqueued_at = queue[0]
+            if self.deficit[tenant] < cost:
+                self._next_tenant()
+                continue
+
+            queue.popleft()
+            self.deficit[tenant] -= cost
+            self.in_use += 1
+            self.running[tenant] += 1
+            self.granted[tenant] += 1
+            self.wait_samples.append(time.monotonic() - enqueued_at)
+            future.set_result(None)
+            blocked = 0
+
+    def _next_tenant(self):
+        self.active.rotate(-1)
+        self.topped_up = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, slot usage and recent wait times"""
+        waits = sorted(self.wait_samples)
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else 0.0
+
+        queue_depth = {tenant: sum(1 for future, _, _ in queue if not future.done())
+                       for tenant, queue in self.waiters.items()}
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "per_tenant_limit": self.per_tenant_limit,
+            "queued": sum(queue_depth.values()),
+            "queue_depth": {tenant: depth for tenant, depth in queue_depth.items() if depth},
+            "running": dict(self.running),
+            "granted": dict(self.granted),
+            "wait_seconds": {"p50": percentile(0.5), "p95": percentile(0.95), "max": round(waits[-1], 4) if waits else 0.0}
+        }
@@ -0,0 +1,265 @@
+from typing import Dict, List, Optional, Any
+
+# Marks every fillable field with its position so the apply script can find it again
+COLLECT_FIELDS_SCRIPT = """
+const fields = [];
+const elements = document.querySelectorAll("input[type='text'], select, input[type='checkbox']");
+elements.forEach((el, index) => {
+    el.setAttribute('data-autofill-index', String(index));
+    const field = {
+        index: index,
+        kind: el.tagName === 'SELECT' ? 'select' : (el.type === 'checkbox' ? 'checkbox' : 'text'),
+        name: el.getAttribute('name') || el.getAttribute('id') || ''
+    };
+    if (field.kind === 'select') {
+        field.options = Array.from(el.options).map(option => option.text);
+    } else if (field.kind === 'checkbox') {
+        field.checked = el.checked;
+        if (el.id) {
+            const label = document.querySelector("label[for='" + CSS.escape(el.id) + "']");
+            field.label = label ? label.innerText : '';
+        } else {
+            field.label = el.parentElement ? el.parentElement.innerText : '';
+        }
+    }
+    fields.push(field);
+});
+return {host: location.hostname, fields: fields};
+"""
+
+# Applies every action and returns the indexes whose value did not stick
+APPLY_ACTIONS_SCRIPT = """
+const actions = arguments[0];
+const failed = [];
+const nativeSetter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+for (const action of actions) {
+    const el = document.querySelector("[data-autofill-index='" + action.index + "']");
+    if (!el) { failed.push(action.index); continue; }
+    if (action.kind === 'text') {
+        el.focus();
+        // The prototype setter keeps framework-controlled inputs (React etc.) in sync
+        nativeSetter.call(el, action.value);
+        fire(el, 'input');
+        fire(el, 'change');
+        el.blur();
+        if (el.value !== action.value) failed.push(action.index);
+    } else if (action.kind === 'select') {
+        const option = Array.from(el.options).find(o => o.text === action.value);
+        if (!option) { failed.push(action.index); continue; }
+        el.value = option.value;
+        fire(el, 'input');
+        fire(el, 'change');
+    } else if (action.kind === 'checkbox') {
+        if (el.checked !== action.value) el.click();
+        if (el.checked !== action.value) failed.push(action.index);
+    }
+}
+return failed;
+"""
+
+def _matches(text: str, keywords: List[str]) -> bool:
+    return any(keyword in text for keyword in keywords)
+
+# Field-name keywords -> profile attribute, checked in order
+TEXT_FIELD_RULES = [
+    (["phone", "mobile"], "phone"),
+    (["website", "portfolio"], "portfolio_website"),
+    (["address", "street"], "address"),
+    (["city"], "city"),
+    (["state", "province"], "state"),
+    (["zip", "postal"], "zip_code"),
+    (["linkedin", "linkedinurl"], "linkedin_url"),
+    (["github", "githuburl"], "github_url"),
+    (["salary", "compensation"], "salary_expectation_min"),
+    (["university", "school", "college"], "university"),
+    (["major", "degree"], "major"),
+    (["gpa"], "gpa"),
+    (["start", "available", "availability"], "availability_date"),
+    (["notice", "period"], "notice_period")
+]
+TEXT_FIELD_DEFAULTS = {"availability_date": "Immediately", "notice_period": "2 weeks"}
+# Numeric attributes that are only filled in when set
+POSITIVE_ONLY_FIELDS = {"salary_expectation_min", "gpa"}
+
+# Field-name keywords -> dropdown category, checked in order
+DROPDOWN_RULES = [
+    (["experience", "level", "seniority"], "experience"),
+    (["education", "degree", "qualification"], "education"),
+    (["authorization", "work auth", "status", "visa"], "work_authorization"),
+    (["gender", "sex"], "gender"),
+    (["veteran", "military"], "veteran"),
+    (["disability", "disabled"], "disability"),
+    (["race", "ethnicity", "ethnic"], "race"),
+    (["remote", "work location", "location preference"], "remote"),
+    (["salary type", "compensation", "pay type"], "salary_type")
+]
+# Category -> answer -> option texts to look for; the None entry is the fallback
+DROPDOWN_CHOICES = {
+    "experience": {
+        "senior": ["5+", "Senior", "5-10", "Expert", "Lead"],
+        "mid": ["2-5", "Mid", "3-5", "Intermediate", "Mid-level"],
+        None: ["1-2", "Entry", "Junior", "0-2", "Entry-level"]
+    },
+    "education": {
+        "phd": ["PhD", "Doctorate", "Ph.D"],
+        "master": ["Master", "Masters", "MS", "MBA", "M.S."],
+        "bachelor": ["Bachelor", "Bachelors", "BS", "BA", "B.S.", "B.A."],
+        "associate": ["Associate", "Associates", "AS", "AA"],
+        None: ["High School", "Secondary", "Diploma"]
+    },
+    "work_authorization": {
+        "US Citizen": ["US Citizen", "Citizen", "U.S. Citizen"],
+        "Green Card": ["Green Card", "Permanent Resident", "LPR"],
+        "H1B": ["H1B", "H-1B", "H1-B"],
+        "F1 OPT": ["F1 OPT", "F-1 OPT", "OPT"],
+        "L1": ["L1", "L-1"],
+        None: ["Other", "Require Sponsorship"]
+    },
+    "gender": {
+        "male": ["Male", "M"],
+        "female": ["Female", "F"],
+        "non_binary": ["Non-binary", "Other", "Non binary"],
+        None: ["Prefer not to say", "Decline to answer", "Not specified"]
+    },
+    "veteran": {
+        "veteran": ["Yes", "Veteran", "Protected Veteran"],
+        "not_veteran": ["No", "Not a veteran", "Not veteran"],
+        None: ["Prefer not to say", "Decline to answer"]
+    },
+    "disability": {
+        "yes": ["Yes", "I have a disability"],
+        "no": ["No", "I do not have a disability"],
+        None: ["Prefer not to say", "Decline to answer"]
+    },
+    "race": {
+        None: ["Prefer not to say", "Decline to answer"]
+    },
+    "remote": {
+        "remote": ["Remote", "Fully Remote", "100% Remote"],
+        "hybrid": ["Hybrid", "Flexible", "Remote/Hybrid"],
+        None: ["On-site", "Office", "In-person"]
+    },
+    "salary_type": {
+        "hourly": ["Hourly", "Per Hour", "Hour"],
+        None: ["Annual", "Yearly", "Per Year", "Salary"]
+    }
+}
+
+# Checkbox-label keywords -> checkbox category, checked in order
+CHECKBOX_RULES = [
+    (["authorize", "authorized", "eligible to work"], "work_authorization"),
+    (["sponsorship", "visa sponsor", "require sponsor"], "sponsorship"),
+    (["veteran", "military"], "veteran"),
+    (["disability", "disabled"], "disability"),
+    (["remote", "work from home"], "remote"),
+    (["relocate", "relocation"], "relocation")
+]
+
+def _classify(text: str, rules: List) -> Optional[str]:
+    text_lower = (text or "").lower()
+    if not text_lower:
+        return None
+    for keywords, key in rules:
+        if _matches(text_lower, keywords):
+            return key
+    return None
+
+def classify_text_field(field_name: str) -> Optional[str]:
+    """Profile attribute a text input asks for, or None"""
+    return _classify(field_name, TEXT_FIELD_RULES)
+
+def classify_dropdown(field_name: str) -> Optional[str]:
+    """Dropdown category (experience, education, ...), or None"""
+    return _classify(field_name, DROPDOWN_RULES)
+
+def classify_checkbox(label_text: str) -> Optional[str]:
+    """Checkbox category (work authorization, sponsorship, ...), or None"""
+    return _classify(label_text, CHECKBOX_RULES)
+
+def text_answer(attribute: str, user_profile: Dict) -> Optional[str]:
+    """The user's value for a profile attribute, or None to leave the field alone"""
+    value = user_profile.get(attribute, TEXT_FIELD_DEFAULTS.get(attribute, ""))
+    if attribute in POSITIVE_ONLY_FIELDS:
+        return str(value) if value and value > 0 else None
+    return value
+
+def dropdown_answer(category: str, user_profile: Dict) -> Any:
+    """The user's answer for a dropdown category, as a key of DROPDOWN_CHOICES"""
+    if category == "experience":
+        experience_years = user_profile.get("experience_years", 0)
+        return "senior" if experience_years >= 5 else "mid" if experience_years >= 2 else None
+    if category == "race":
+        race = user_profile.get("race", "prefer_not_to_say")
+        if race == "prefer_not_to_say":
+            return None
+        # Free-form answers are looked for verbatim
+        return (race, user_profile.get("ethnicity", "prefer_not_to_say"))
+
+    attribute, default = {
+        "education": ("education_level", "bachelor"),
+        "work_authorization": ("work_authorization", "US Citizen"),
+        "gender": ("gender", "prefer_not_to_say"),
+        "veteran": ("veteran_status", "prefer_not_to_say"),
+        "disability": ("disability_status", "prefer_not_to_say"),
+        "remote": ("remote_work_preference", "hybrid"),
+        "salary_type": ("salary_type", "annual")
+    }[category]
+    answer = user_profile.get(attribute, default)
+    return answer if answer in DROPDOWN_CHOICES[category] else None
+
+def choices_for_answer(category: str, answer: Any) -> List[str]:
+    if isinstance(answer, tuple):
+        return list(answer)
+    return DROPDOWN_CHOICES[category].get(answer) or DROPDOWN_CHOICES[category][None]
+
+def checkbox_answer(category: str, user_profile: Dict) -> Optional[bool]:
+    """Desired checked state for a checkbox category, or None to leave it as it is"""
+    if category == "work_authorization":
+        work_auth = user_profile.get("work_authorization", "US Citizen")
+        return True if work_auth in ["US Citizen", "Green Card", "Permanent Resident"] else None
+    if category == "sponsorship":
+        return bool(user_profile.get("visa_sponsorship_required", False))
+    if category == "veteran":
+        return True if user_profile.get("veteran_status", "prefer_not_to_say") == "veteran" else None
+    if category == "disability":
+        return True if user_profile.get("disability_status", "prefer_not_to_say") == "yes" else None
+    if category == "remote":
+        return True if user_profile.get("remote_work_preference", "hybrid") in ["remote", "hybrid"] else None
+    if category == "relocation":
+        return bool(user_profile.get("willing_to_relocate", False))
+    return None
+
+def answer_map(user_profile: Dict) -> Dict[str, Any]:
+    """Every answer a form can ask of this user, keyed like FormPlan entries"""
+    answers = {}
+    for _, attribute in TEXT_FIELD_RULES:
+        answers[f"text:{attribute}"] = text_answer(attribute, user_profile)
+    for _, category in DROPDOWN_RULES:
+        answers[f"select:{category}"] = dropdown_answer(category, user_profile)
+    for _, category in CHECKBOX_RULES:
+        answers[f"checkbox:{category}"] = checkbox_answer(category, user_profile)
+    return answers
+
+def text_field_value(field_name: str, user_profile: Dict) -> Optional[str]:
+    """Value to type into a text input, or None to leave it alone"""
+    attribute = classify_text_field(field_name)
+    return text_answer(attribute, user_profile) if attribute else None
+
+def dropdown_choices(field_name: str, user_profile: Dict) -> Optional[List[str]]:
+    """Option texts to look for in a dropdown, in order of preference"""
+    category = classify_dropdown(field_name)
+    return choices_for_answer(category, dropdown_answer(category, user_profile)) if category else None
+
+def match_option(options: List[str], choices: List[str]) -> Optional[str]:
+    """First option (in page order) containing any of the choices"""
+    for option in options:
+        for text in choices:
+            if text.lower() in option.lower():
+                return option
+    return None
+
+def checkbox_target(label_text: str, user_profile: Dict) -> Optional[bool]:
+    """Desired checked state for a checkbox, or None to leave it as it is"""
+    category = classify_checkbox(label_text)
+    return checkbox_answer(category, user_profile) if category else None
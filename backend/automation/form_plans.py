@@ -0,0 +1,128 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
+from automation.form_fill import (classify_text_field, classify_dropdown, classify_checkbox,
+                                  choices_for_answer, match_option)
+
+def form_signature(platform: str, fields: List[Dict[str, Any]]) -> str:
+    """
+    Stable identity of a form: platform plus every field's kind, name, option
+    set and (for checkboxes) label, in page order. Field values and checked
+    state are left out so the same form matches for every user.
+    """
+    shape = [
+        (field.get("kind"), field.get("name", ""), field.get("options") or [], field.get("label", ""))
+        for field in fields
+    ]
+    data = json.dumps([platform or "", shape], separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class FormPlan:
+    """
+    User-independent fill plan for one form signature
+    - entries map field positions to an answer key (text:phone, select:education,
+      checkbox:sponsorship, ...); unclassified fields are left out
+    - Dropdown answers are resolved to option texts once per answer and remembered
+    """
+
+    def __init__(self, entries: List[Tuple[int, str, str]], options: Dict[int, List[str]]):
+        self.entries = entries  # (field position, kind, answer key)
+        self.options = options  # field position -> option texts, for dropdowns
+        self.option_memo: Dict[Tuple[int, Any], Optional[str]] = {}
+        self.uses = 0
+
+    @classmethod
+    def build(cls, fields: List[Dict[str, Any]]) -> 'FormPlan':
+        entries, options = [], {}
+        for position, field in enumerate(fields):
+            kind = field.get("kind")
+            if kind == "text":
+                key = classify_text_field(field.get("name", ""))
+            elif kind == "select":
+                key = classify_dropdown(field.get("name", ""))
+                options[position] = field.get("options") or []
+            elif kind == "checkbox":
+                key = classify_checkbox(field.get("label", ""))
+            else:
+                key = None
+            if key:
+                entries.append((position, kind, f"{kind}:{key}"))
+        return cls(entries, options)
+
+    def _option(self, position: int, key: str, answer: Any) -> Optional[str]:
+        memo_key = (position, answer)
+        if memo_key not in self.option_memo:
+            category = key.split(":", 1)[1]
+            self.option_memo[memo_key] = match_option(self.options[position], choices_for_answer(category, answer))
+        return self.option_memo[memo_key]
+
+    def actions(self, fields: List[Dict[str, Any]], answers: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fill actions for APPLY_ACTIONS_SCRIPT from this plan and a user's answer map"""
+        self.uses += 1
+        actions = []
+        for position, kind, key in self.entries:
+            field = fields[position]
+            if kind == "select":
+                value = self._option(position, key, answers.get(key))
+            else:
+                value = answers.get(key)
+                if kind == "checkbox" and value is not None and value == field.get("checked"):
+                    value = None  # already in the desired state
+            if value is not None:
+                actions.append({"index": field["index"], "kind": kind, "value": value})
+        return actions
+
+class FormPlanCache:
+    """
+    LRU cache of form plans shared by every applier in the process
+    - Keyed by form_signature(), so a recurring ATS form is classified once
+    - Holds at most max_plans plans; the least recently used is evicted
+    """
+
+    def __init__(self, max_plans: int = 2000):
+        self.max_plans = max_plans
+        self.plans: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_plan(self, platform: str, fields: List[Dict[str, Any]]) -> FormPlan:
+        signature = form_signature(platform, fields)
+        with self.lock:
+            plan = self.plans.get(signature)
+            if plan is not None:
+                self.plans.move_to_end(signature)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = FormPlan.build(fields)
+        with self.lock:
+            self.plans[signature] = plan
+            self.plans.move_to_end(signature)
+            while len(self.plans) > self.max_plans:
+                self.plans.popitem(last=False)
+        return plan
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "plans": len(self.plans),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+_shared_cache: Optional[FormPlanCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_form_plan_cache() -> FormPlanCache:
+    """Process-wide form plan cache"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = FormPlanCache()
+        return _shared_cache
@@ -5,28 +5,41 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.common.keys import Keys
 import time
+import asyncio
 import logging
 from typing import Dict, List, Optional
-import random
+from automation.async_driver import AsyncDriver, human_pause
+from automation.form_fill import (COLLECT_FIELDS_SCRIPT, APPLY_ACTIONS_SCRIPT, answer_map,
+                                  text_field_value, dropdown_choices, checkbox_target)
+from automation.form_plans import FormPlanCache, get_form_plan_cache
 
 class JobApplier:
-    def __init__(self, driver: webdriver.Chrome):
+    # Sites whose inputs ignore scripted values and only react to real key events
+    TYPED_INPUT_HOSTS: tuple = ()
+    
+    def __init__(self, driver: webdriver.Chrome, browser: Optional[AsyncDriver] = None,
+                 batched_form_fill: bool = True, plan_cache: Optional[FormPlanCache] = None):
         self.driver = driver
+        self.batched_form_fill = batched_form_fill
+        # Plans for recurring forms are shared across appliers and users
+        self.plan_cache = plan_cache or get_form_plan_cache()
+        # Selenium calls run on the browser's own thread so applications never block the event loop
+        self.browser = browser or AsyncDriver(driver)
         self.logger = logging.getLogger(__name__)
         
     async def apply_to_linkedin_job(self, job_data: Dict, user_profile: Dict) -> Dict:
         """Apply to a LinkedIn job automatically"""
         try:
             # Navigate to job URL
-            self.driver.get(job_data["apply_url"])
-            time.sleep(random.uniform(2, 4))
+            await self.browser.get(job_data["apply_url"])
+            await human_pause(2, 4)
             
             # Find and click apply button
-            apply_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".jobs-apply-button"))
+            apply_button = await self.browser.wait_for(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, ".jobs-apply-button")), 10
             )
-            apply_button.click()
-            time.sleep(random.uniform(1, 3))
+            await apply_button.click()
+            await human_pause(1, 3)
             
             # Handle LinkedIn Easy Apply flow
             return await self.handle_linkedin_easy_apply(job_data, user_profile)
@@ -48,7 +61,10 @@ class JobApplier:
             while current_step < max_steps:
                 try:
                     # Check if we're on the final submit page
-                    if self.driver.find_elements(By.CSS_SELECTOR, "[data-easy-apply-next-button]"):
+                    next_buttons = await self.browser.find_elements(By.CSS_SELECTOR, "[data-easy-apply-next-button]")
+                    submit_buttons = [] if next_buttons else await self.browser.find_elements(
+                        By.CSS_SELECTOR, "[data-easy-apply-submit-button]")
+                    if next_buttons:
                         # Fill out form fields
                         await self.fill_application_form(user_profile)
                         
@@ -56,18 +72,16 @@ class JobApplier:
                         captcha_solved = await self.solve_captcha_if_present()
                         
                         # Click next/submit button
-                        next_button = self.driver.find_element(By.CSS_SELECTOR, "[data-easy-apply-next-button]")
-                        next_button.click()
-                        time.sleep(random.uniform(1, 2))
+                        await next_buttons[0].click()
+                        await human_pause(1, 2)
                         
-                    elif self.driver.find_elements(By.CSS_SELECTOR, "[data-easy-apply-submit-button]"):
+                    elif submit_buttons:
                         # Final submit
-                        submit_button = self.driver.find_element(By.CSS_SELECTOR, "[data-easy-apply-submit-button]")
-                        submit_button.click()
-                        time.sleep(random.uniform(2, 4))
+                        await submit_buttons[0].click()
+                        await human_pause(2, 4)
                         
                         # Check for success message
-                        if self.driver.find_elements(By.CSS_SELECTOR, ".artdeco-inline-feedback--success"):
+                        if await self.browser.find_elements(By.CSS_SELECTOR, ".artdeco-inline-feedback--success"):
                             return {
                                 "success": True,
                                 "job_id": job_data["id"],
@@ -102,73 +116,69 @@ class JobApplier:
     
     async def fill_application_form(self, user_profile: Dict):
         """Fill out application form fields automatically"""
+        if self.batched_form_fill:
+            await self.fill_application_form_batched(user_profile)
+        else:
+            # The form is walked as one block on the browser thread rather than one hop per field
+            await self.browser.run(self._fill_application_form, user_profile)
+    
+    async def fill_application_form_batched(self, user_profile: Dict):
+        """
+        Fill the form in two script calls: collect every field's metadata, look up
+        (or build) the cached plan for the form's signature, combine it with the
+        user's answer map, then apply everything in the page. Fields whose
+        value does not stick, and every text field on sites that need real key
+        events, are typed per element instead.
+        """
+        try:
+            form = await self.browser.execute_script(COLLECT_FIELDS_SCRIPT)
+            host = form.get("host", "")
+            plan = self.plan_cache.get_plan(host, form["fields"])
+            actions = plan.actions(form["fields"], answer_map(user_profile))
+            if not actions:
+                return
+            
+            typed_hosts = self.TYPED_INPUT_HOSTS
+            needs_typing = [a for a in actions
+                            if a["kind"] == "text" and any(host.endswith(h) for h in typed_hosts)]
+            scripted = [a for a in actions if a not in needs_typing]
+            failed = set(await self.browser.execute_script(APPLY_ACTIONS_SCRIPT, scripted)) if scripted else set()
+            
+            fallback = needs_typing + [a for a in scripted if a["index"] in failed]
+            if fallback:
+                self.logger.info(f"Typing {len(fallback)} of {len(actions)} form fields per element")
+                await self.browser.run(self._apply_actions_per_element, fallback)
+                
+        except Exception as e:
+            self.logger.error(f"Error in batched form fill, falling back to per-field fill: {e}")
+            await self.browser.run(self._fill_application_form, user_profile)
+    
+    def _apply_actions_per_element(self, actions: List[Dict]):
+        """Apply planned actions with real WebDriver input; runs on the browser's thread"""
+        for action in actions:
+            try:
+                element = self.driver.find_element(By.CSS_SELECTOR, f"[data-autofill-index='{action['index']}']")
+                if action["kind"] == "text":
+                    element.clear()
+                    element.send_keys(action["value"])
+                elif action["kind"] == "select":
+                    Select(element).select_by_visible_text(action["value"])
+                elif action["kind"] == "checkbox" and element.is_selected() != action["value"]:
+                    element.click()
+            except Exception as e:
+                self.logger.error(f"Error filling form field {action['index']}: {e}")
+    
+    def _fill_application_form(self, user_profile: Dict):
+        """Per-element form fill; runs on the browser's thread"""
         try:
             # Fill text inputs with comprehensive profile data
             text_inputs = self.driver.find_elements(By.CSS_SELECTOR, "input[type='text']")
             for input_field in text_inputs:
                 field_name = input_field.get_attribute("name") or input_field.get_attribute("id")
-                placeholder = input_field.get_attribute("placeholder") or ""
-                
-                if field_name and any(keyword in field_name.lower() for keyword in ["phone", "mobile"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("phone", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["website", "portfolio"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("portfolio_website", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["address", "street"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("address", ""))
-                    
-                elif field_name and "city" in field_name.lower():
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("city", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["state", "province"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("state", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["zip", "postal"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("zip_code", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["linkedin", "linkedinurl"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("linkedin_url", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["github", "githuburl"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("github_url", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["salary", "compensation"]):
-                    salary_min = user_profile.get("salary_expectation_min", 0)
-                    salary_max = user_profile.get("salary_expectation_max", 0)
-                    if salary_min > 0:
-                        input_field.clear()
-                        input_field.send_keys(str(salary_min))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["university", "school", "college"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("university", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["major", "degree"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("major", ""))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["gpa"]):
-                    gpa = user_profile.get("gpa", 0.0)
-                    if gpa > 0:
-                        input_field.clear()
-                        input_field.send_keys(str(gpa))
-                        
-                elif field_name and any(keyword in field_name.lower() for keyword in ["start", "available", "availability"]):
+                value = text_field_value(field_name, user_profile)
+                if value is not None:
                     input_field.clear()
-                    input_field.send_keys(user_profile.get("availability_date", "Immediately"))
-                    
-                elif field_name and any(keyword in field_name.lower() for keyword in ["notice", "period"]):
-                    input_field.clear()
-                    input_field.send_keys(user_profile.get("notice_period", "2 weeks"))
+                    input_field.send_keys(value)
             
             # Handle dropdowns with comprehensive options
             dropdowns = self.driver.find_elements(By.CSS_SELECTOR, "select")
@@ -178,50 +188,9 @@ class JobApplier:
             # Handle checkboxes (authorization to work, sponsorship, etc.)
             checkboxes = self.driver.find_elements(By.CSS_SELECTOR, "input[type='checkbox']")
             for checkbox in checkboxes:
-                label_text = self.get_checkbox_label(checkbox)
-                if label_text:
-                    label_lower = label_text.lower()
-                    
-                    # Work authorization checkbox
-                    if any(keyword in label_lower for keyword in ["authorize", "authorized", "eligible to work"]):
-                        work_auth = user_profile.get("work_authorization", "US Citizen")
-                        if work_auth in ["US Citizen", "Green Card", "Permanent Resident"]:
-                            if not checkbox.is_selected():
-                                checkbox.click()
-                    
-                    # Visa sponsorship checkbox
-                    elif any(keyword in label_lower for keyword in ["sponsorship", "visa sponsor", "require sponsor"]):
-                        requires_sponsorship = user_profile.get("visa_sponsorship_required", False)
-                        if requires_sponsorship and not checkbox.is_selected():
-                            checkbox.click()
-                        elif not requires_sponsorship and checkbox.is_selected():
-                            checkbox.click()
-                    
-                    # Veteran status checkbox
-                    elif any(keyword in label_lower for keyword in ["veteran", "military"]):
-                        veteran_status = user_profile.get("veteran_status", "prefer_not_to_say")
-                        if veteran_status == "veteran" and not checkbox.is_selected():
-                            checkbox.click()
-                    
-                    # Disability status checkbox
-                    elif any(keyword in label_lower for keyword in ["disability", "disabled"]):
-                        disability_status = user_profile.get("disability_status", "prefer_not_to_say")
-                        if disability_status == "yes" and not checkbox.is_selected():
-                            checkbox.click()
-                    
-                    # Remote work checkbox
-                    elif any(keyword in label_lower for keyword in ["remote", "work from home"]):
-                        remote_pref = user_profile.get("remote_work_preference", "hybrid")
-                        if remote_pref in ["remote", "hybrid"] and not checkbox.is_selected():
-                            checkbox.click()
-                    
-                    # Relocation checkbox
-                    elif any(keyword in label_lower for keyword in ["relocate", "relocation"]):
-                        willing_relocate = user_profile.get("willing_to_relocate", False)
-                        if willing_relocate and not checkbox.is_selected():
-                            checkbox.click()
-                        elif not willing_relocate and checkbox.is_selected():
-                            checkbox.click()
+                target = checkbox_target(self.get_checkbox_label(checkbox), user_profile)
+                if target is not None and checkbox.is_selected() != target:
+                    checkbox.click()
                         
         except Exception as e:
             self.logger.error(f"Error filling application form: {e}")
@@ -231,7 +200,12 @@ class JobApplier:
         try:
             from automation.captcha_solver import CaptchaSolver
             captcha_solver = CaptchaSolver(self.driver)
-            success = await captcha_solver.solve_captcha()
+            # Detection runs on the browser thread; most steps have no CAPTCHA at all
+            if await self.browser.run(captcha_solver.detect_captcha_type) == 'none':
+                return True
+            # The solver mixes blocking Selenium calls with its own pauses; it gets a
+            # private loop on the browser thread so only this browser waits on it
+            success = await self.browser.run(lambda: asyncio.run(captcha_solver.solve_captcha()))
             
             if success:
                 self.logger.info("CAPTCHA solved successfully")
@@ -247,110 +221,11 @@ class JobApplier:
     def handle_dropdown_field(self, dropdown, user_profile: Dict):
         """Handle dropdown field selection with comprehensive options"""
         try:
-            select = Select(dropdown)
-            
             # Get field context
             field_name = dropdown.get_attribute("name") or dropdown.get_attribute("id") or ""
-            field_lower = field_name.lower()
-            
-            # Experience level dropdown
-            if any(keyword in field_lower for keyword in ["experience", "level", "seniority"]):
-                experience_years = user_profile.get("experience_years", 0)
-                if experience_years >= 5:
-                    self.select_option_by_text(select, ["5+", "Senior", "5-10", "Expert", "Lead"])
-                elif experience_years >= 2:
-                    self.select_option_by_text(select, ["2-5", "Mid", "3-5", "Intermediate", "Mid-level"])
-                else:
-                    self.select_option_by_text(select, ["1-2", "Entry", "Junior", "0-2", "Entry-level"])
-            
-            # Education level dropdown
-            elif any(keyword in field_lower for keyword in ["education", "degree", "qualification"]):
-                education_level = user_profile.get("education_level", "bachelor")
-                if education_level == "phd":
-                    self.select_option_by_text(select, ["PhD", "Doctorate", "Ph.D"])
-                elif education_level == "master":
-                    self.select_option_by_text(select, ["Master", "Masters", "MS", "MBA", "M.S."])
-                elif education_level == "bachelor":
-                    self.select_option_by_text(select, ["Bachelor", "Bachelors", "BS", "BA", "B.S.", "B.A."])
-                elif education_level == "associate":
-                    self.select_option_by_text(select, ["Associate", "Associates", "AS", "AA"])
-                else:
-                    self.select_option_by_text(select, ["High School", "Secondary", "Diploma"])
-            
-            # Work authorization dropdown
-            elif any(keyword in field_lower for keyword in ["authorization", "work auth", "status", "visa"]):
-                work_auth = user_profile.get("work_authorization", "US Citizen")
-                if work_auth == "US Citizen":
-                    self.select_option_by_text(select, ["US Citizen", "Citizen", "U.S. Citizen"])
-                elif work_auth == "Green Card":
-                    self.select_option_by_text(select, ["Green Card", "Permanent Resident", "LPR"])
-                elif work_auth == "H1B":
-                    self.select_option_by_text(select, ["H1B", "H-1B", "H1-B"])
-                elif work_auth == "F1 OPT":
-                    self.select_option_by_text(select, ["F1 OPT", "F-1 OPT", "OPT"])
-                elif work_auth == "L1":
-                    self.select_option_by_text(select, ["L1", "L-1"])
-                else:
-                    self.select_option_by_text(select, ["Other", "Require Sponsorship"])
-            
-            # Gender dropdown
-            elif any(keyword in field_lower for keyword in ["gender", "sex"]):
-                gender = user_profile.get("gender", "prefer_not_to_say")
-                if gender == "male":
-                    self.select_option_by_text(select, ["Male", "M"])
-                elif gender == "female":
-                    self.select_option_by_text(select, ["Female", "F"])
-                elif gender == "non_binary":
-                    self.select_option_by_text(select, ["Non-binary", "Other", "Non binary"])
-                else:
-                    self.select_option_by_text(select, ["Prefer not to say", "Decline to answer", "Not specified"])
-            
-            # Veteran status dropdown
-            elif any(keyword in field_lower for keyword in ["veteran", "military"]):
-                veteran_status = user_profile.get("veteran_status", "prefer_not_to_say")
-                if veteran_status == "veteran":
-                    self.select_option_by_text(select, ["Yes", "Veteran", "Protected Veteran"])
-                elif veteran_status == "not_veteran":
-                    self.select_option_by_text(select, ["No", "Not a veteran", "Not veteran"])
-                else:
-                    self.select_option_by_text(select, ["Prefer not to say", "Decline to answer"])
-            
-            # Disability status dropdown
-            elif any(keyword in field_lower for keyword in ["disability", "disabled"]):
-                disability_status = user_profile.get("disability_status", "prefer_not_to_say")
-                if disability_status == "yes":
-                    self.select_option_by_text(select, ["Yes", "I have a disability"])
-                elif disability_status == "no":
-                    self.select_option_by_text(select, ["No", "I do not have a disability"])
-                else:
-                    self.select_option_by_text(select, ["Prefer not to say", "Decline to answer"])
-            
-            # Race/Ethnicity dropdown
-            elif any(keyword in field_lower for keyword in ["race", "ethnicity", "ethnic"]):
-                race = user_profile.get("race", "prefer_not_to_say")
-                ethnicity = user_profile.get("ethnicity", "prefer_not_to_say")
-                if race != "prefer_not_to_say":
-                    self.select_option_by_text(select, [race, ethnicity])
-                else:
-                    self.select_option_by_text(select, ["Prefer not to say", "Decline to answer"])
-            
-            # Remote work preference dropdown
-            elif any(keyword in field_lower for keyword in ["remote", "work location", "location preference"]):
-                remote_pref = user_profile.get("remote_work_preference", "hybrid")
-                if remote_pref == "remote":
-                    self.select_option_by_text(select, ["Remote", "Fully Remote", "100% Remote"])
-                elif remote_pref == "hybrid":
-                    self.select_option_by_text(select, ["Hybrid", "Flexible", "Remote/Hybrid"])
-                else:
-                    self.select_option_by_text(select, ["On-site", "Office", "In-person"])
-            
-            # Salary type dropdown
-            elif any(keyword in field_lower for keyword in ["salary type", "compensation", "pay type"]):
-                salary_type = user_profile.get("salary_type", "annual")
-                if salary_type == "hourly":
-                    self.select_option_by_text(select, ["Hourly", "Per Hour", "Hour"])
-                else:
-                    self.select_option_by_text(select, ["Annual", "Yearly", "Per Year", "Salary"])
+            choices = dropdown_choices(field_name, user_profile)
+            if choices:
+                self.select_option_by_text(Select(dropdown), choices)
                     
         except Exception as e:
             self.logger.error(f"Error handling dropdown: {e}")
@@ -387,8 +262,8 @@ class JobApplier:
         """Apply to Indeed job automatically"""
         try:
             # Navigate to job URL
-            self.driver.get(job_data["apply_url"])
-            time.sleep(random.uniform(2, 4))
+            await self.browser.get(job_data["apply_url"])
+            await human_pause(2, 4)
             
             # Look for apply button
             apply_button = None
@@ -399,11 +274,10 @@ class JobApplier:
             ]
             
             for selector in apply_selectors:
-                try:
-                    apply_button = self.driver.find_element(By.CSS_SELECTOR, selector)
+                matches = await self.browser.find_elements(By.CSS_SELECTOR, selector)
+                if matches:
+                    apply_button = matches[0]
                     break
-                except:
-                    continue
                     
             if not apply_button:
                 return {
@@ -412,8 +286,8 @@ class JobApplier:
                     "job_id": job_data["id"]
                 }
             
-            apply_button.click()
-            time.sleep(random.uniform(2, 4))
+            await apply_button.click()
+            await human_pause(2, 4)
             
             # Handle Indeed application process
             return await self.handle_indeed_application(job_data, user_profile)
@@ -433,9 +307,9 @@ class JobApplier:
             await self.fill_indeed_form(user_profile)
             
             # Submit application
-            submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-            time.sleep(random.uniform(2, 4))
+            submit_button = await self.browser.find_element(By.CSS_SELECTOR, "button[type='submit']")
+            await submit_button.click()
+            await human_pause(2, 4)
             
             # Check for success indicators
             success_indicators = [
@@ -445,7 +319,7 @@ class JobApplier:
             ]
             
             for indicator in success_indicators:
-                if self.driver.find_elements(By.CSS_SELECTOR, indicator):
+                if await self.browser.find_elements(By.CSS_SELECTOR, indicator):
                     return {
                         "success": True,
                         "job_id": job_data["id"],
@@ -469,6 +343,17 @@ class JobApplier:
     
     async def fill_indeed_form(self, user_profile: Dict):
         """Fill Indeed application form with comprehensive profile data"""
+        try:
+            await self.browser.run(self._fill_indeed_contact_fields, user_profile)
+            
+            # Handle dropdowns and checkboxes using the comprehensive form filling logic
+            await self.fill_application_form(user_profile)
+                
+        except Exception as e:
+            self.logger.error(f"Error filling Indeed form: {e}")
+    
+    def _fill_indeed_contact_fields(self, user_profile: Dict):
+        """Synchronous contact/link field fill; runs on the browser's thread"""
         try:
             # Fill basic info
             name_field = self.driver.find_elements(By.CSS_SELECTOR, "input[name*='name']")
@@ -512,9 +397,6 @@ class JobApplier:
             if linkedin_fields:
                 linkedin_fields[0].clear()
                 linkedin_fields[0].send_keys(user_profile.get("linkedin_url", ""))
-            
-            # Handle dropdowns and checkboxes using the comprehensive form filling logic
-            await self.fill_application_form(user_profile)
                 
         except Exception as e:
             self.logger.error(f"Error filling Indeed form: {e}") 
\ No newline at end of file
@@ -1,20 +1,52 @@
 import asyncio
+import base64
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator
 from datetime import datetime
+from automation.task_queue import TaskQueue, TaskContext, TaskCancelled, LeaseLost
+from automation.pipeline import StagedPipeline, PipelineStage
+from automation.fair_scheduler import FairScheduler
+from automation.application_scheduler import ApplicationScheduler
+from automation.eligibility import EligibilityFilter
+
+# Task kind for sessions run through the durable queue
+ENGINE_SESSION_TASK = "engine_session"
 
 class JobAutomationEngine:
     """
     Simplified Job Automation Engine for basic functionality
     Advanced features like county scraping and CAPTCHA solving are available
     but require additional dependencies to be installed.
+    
+    Sessions run as a pipeline: search -> dedup -> resume variants -> resume
+    tailoring -> cover letter -> apply, so the first application starts as soon as the
+    first jobs are found. Each search page first goes through the user's
+    compiled hard constraints, so ineligible jobs never reach the later stages.
+    Jobs with similar skill profiles share one tailored resume variant, so
+    tailoring work grows with distinct profiles rather than with jobs.
     """
     
-    def __init__(self):
+    # Workers per pipeline stage; tailoring and cover letters run in threads
+    STAGE_CONCURRENCY = {"dedup": 1, "variants": 1, "tailoring": 2, "cover_letter": 2, "apply": 2}
+    # Items buffered between two stages before the upstream stage waits
+    PIPELINE_QUEUE_SIZE = 8
+    # Apply to max 5 jobs in demo
+    DEMO_APPLICATION_LIMIT = 5
+    
+    def __init__(self, task_queue: Optional[TaskQueue] = None, scheduler: Optional[FairScheduler] = None,
+                 application_scheduler: Optional[ApplicationScheduler] = None):
         self.is_running = False
         self.sessions = {}
+        # Sessions run on queue workers when a queue is given, otherwise as local tasks
+        self.task_queue = task_queue
+        # Applications share capacity with other users' sessions when a scheduler is given
+        self.scheduler = scheduler
+        # Paces submissions per platform across all sessions
+        self.application_scheduler = application_scheduler or ApplicationScheduler()
+        self.session_contexts: Dict[str, TaskContext] = {}
         self.county_scraper = None
         self.captcha_solver = None
+        self.ai_engine = None
         
         # Try to import advanced modules if available
         try:
@@ -28,15 +60,23 @@ class JobAutomationEngine:
             self.captcha_solver = CaptchaSolver()
         except ImportError:
             print("CAPTCHA solver not available - install opencv-python and other dependencies")
+            
+        try:
+            from ai_services.custom_ai_engine import CustomAIEngine
+            self.ai_engine = CustomAIEngine()
+        except ImportError:
+            print("AI engine not available - install reportlab and other dependencies")
     
-    async def start_automation(self, session_id: str, user_id: str, preferences: Dict, resume: Dict) -> Dict:
+    async def start_automation(self, session_id: str, user_id: str, preferences: Dict, resume: Dict,
+                               priority: int = 0, profile: Optional[Dict] = None) -> Dict:
         """Start job automation session"""
         try:
             self.sessions[session_id] = {
                 "user_id": user_id,
-                "status": "running",
+                "status": "queued" if self.task_queue else "running",
                 "preferences": preferences,
                 "resume": resume,
+                "profile": profile or {},
                 "applications_sent": 0,
                 "jobs_found": 0,
                 "start_time": datetime.now().isoformat(),
@@ -44,7 +84,16 @@ class JobAutomationEngine:
             }
             
             # Start automation in background
-            asyncio.create_task(self._run_automation_session(session_id))
+            if self.task_queue:
+                await self.task_queue.run(self.task_queue.enqueue, ENGINE_SESSION_TASK, {
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "preferences": preferences,
+                    "resume": resume,
+                    "profile": profile or {}
+                }, task_id=session_id, priority=priority)
+            else:
+                asyncio.create_task(self._run_automation_session(session_id))
             
             return {
                 "status": "success",
@@ -58,66 +107,210 @@ class JobAutomationEngine:
                 "message": f"Failed to start automation: {str(e)}"
             }
     
-    async def _run_automation_session(self, session_id: str):
+    def task_handlers(self) -> Dict:
+        """Queue handlers for WorkerPool"""
+        return {ENGINE_SESSION_TASK: self.run_queued_session}
+    
+    async def run_queued_session(self, task: Dict, context: TaskContext):
+        """Queue handler: run (or resume) a session leased from the task queue"""
+        payload = task["payload"]
+        session_id = payload["session_id"]
+        if session_id not in self.sessions:
+            # Recovered after a restart or leased by a separate worker process
+            self.sessions[session_id] = {
+                "user_id": payload["user_id"],
+                "preferences": payload["preferences"],
+                "resume": payload["resume"],
+                "profile": payload.get("profile") or {},
+                "applications_sent": 0,
+                "jobs_found": 0,
+                "start_time": datetime.now().isoformat()
+            }
+        session = self.sessions[session_id]
+        session.update(context.progress)
+        session["status"] = "running"
+        session["last_activity"] = datetime.now().isoformat()
+        
+        self.session_contexts[session_id] = context
+        try:
+            await self._run_automation_session(session_id, raise_errors=True)
+        finally:
+            self.session_contexts.pop(session_id, None)
+        return self._progress(session)
+    
+    def _progress(self, session: Dict) -> Dict:
+        return {
+            "status": session["status"],
+            "jobs_found": session["jobs_found"],
+            "applications_sent": session["applications_sent"]
+        }
+    
+    async def _checkpoint(self, session_id: str):
+        """Persist progress for queued sessions; raises TaskCancelled once stop_automation is called"""
+        context = self.session_contexts.get(session_id)
+        if context is not None:
+            await context.heartbeat(self._progress(self.sessions[session_id]))
+    
+    async def _run_automation_session(self, session_id: str, raise_errors: bool = False):
         """Run automation session in background"""
         try:
             session = self.sessions[session_id]
             
-            # Simulate job searching and application process
-            await self._search_jobs(session_id)
-            await self._apply_to_jobs(session_id)
+            pipeline = StagedPipeline(self._build_stages(session_id), queue_size=self.PIPELINE_QUEUE_SIZE,
+                                      abort_on=(TaskCancelled, LeaseLost))
+            session["pipeline_stats"] = await pipeline.run(self._eligible_jobs(session_id))
+            # A stop that landed after the last application still cancels a queued task
+            if session["status"] == "stopped":
+                await self._checkpoint(session_id)
             
             # Update session status
-            session["status"] = "completed"
+            if session["status"] != "stopped":
+                session["status"] = "completed"
             session["last_activity"] = datetime.now().isoformat()
             
         except Exception as e:
-            if session_id in self.sessions:
+            if session_id in self.sessions and self.sessions[session_id]["status"] != "stopped":
                 self.sessions[session_id]["status"] = "error"
                 self.sessions[session_id]["error"] = str(e)
+            if raise_errors:
+                raise
     
-    async def _search_jobs(self, session_id: str):
-        """Search for jobs (simplified version)"""
+    def _build_stages(self, session_id: str) -> List[PipelineStage]:
+        """Pipeline stages bound to one session"""
         session = self.sessions[session_id]
-        preferences = session["preferences"]
+        limit = min(session["preferences"].get("max_applications", 10), self.DEMO_APPLICATION_LIMIT)
+        resume_text = self._resume_text(session["resume"])
+        seen = set()
+        # A resumed session only admits the applications it still owes
+        admitted = [session["applications_sent"]]
         
-        # Simulate job search process
-        await asyncio.sleep(2)  # Simulate API calls
+        async def dedup(job: Dict) -> Optional[Dict]:
+            key = job.get("url") or (job.get("title", "").lower(), job.get("company", "").lower())
+            if session["status"] == "stopped" or key in seen or admitted[0] >= limit:
+                return None
+            seen.add(key)
+            admitted[0] += 1
+            return job
         
-        # Mock job results
-        jobs_found = min(preferences.get("max_applications", 10), 25)
-        session["jobs_found"] = jobs_found
-        session["last_activity"] = datetime.now().isoformat()
+        assigner = None
+        if self.ai_engine and resume_text:
+            from ai_services.resume_variants import VariantAssigner
+            assigner = VariantAssigner(resume_text, self.ai_engine)
+        
+        def variants(job: Dict) -> Dict:
+            if assigner:
+                job["resume_variant"], job["match_score"] = assigner.assign(job)
+                session["resume_variants"] = assigner.get_stats()
+            return job
+        
+        def tailoring(job: Dict) -> Dict:
+            if assigner:
+                job["enhanced_resume"] = assigner.variant(job["resume_variant"])["enhanced_resume"]
+                session["resume_variants"] = assigner.get_stats()
+            return job
+        
+        def cover_letter(job: Dict) -> Dict:
+            if self.ai_engine and isinstance(job.get("enhanced_resume"), dict):
+                result = self.ai_engine.generate_cover_letter(job, session.get("profile", {}), job["enhanced_resume"],
+                                                              render_pdf=False)
+                job["cover_letter"] = result.get("cover_letter")
+            return job
+        
+        async def apply(job: Dict) -> Optional[Dict]:
+            if session["status"] == "stopped":
+                # Lets a queued session's task be marked cancelled rather than completed
+                await self._checkpoint(session_id)
+                return None
+            # A factory: the fair-share slot is released and retaken while the platform has no token
+            fair_slot = (lambda: self.scheduler.slot(session["user_id"])) if self.scheduler else None
+            async with self.application_scheduler.slot(job.get("platform", "default"), fair_slot):
+                await self._apply_to_job(session_id, job)
+            await self._checkpoint(session_id)
+            return job
+        
+        concurrency = self.STAGE_CONCURRENCY
+        return [
+            PipelineStage("dedup", dedup, concurrency["dedup"]),
+            PipelineStage("variants", variants, concurrency["variants"], blocking=True),
+            PipelineStage("tailoring", tailoring, concurrency["tailoring"], blocking=True),
+            PipelineStage("cover_letter", cover_letter, concurrency["cover_letter"], blocking=True),
+            PipelineStage("apply", apply, concurrency["apply"])
+        ]
+    
+    def _resume_text(self, resume: Dict) -> str:
+        """Plain resume text from an uploaded resume record"""
+        content = resume.get("content", "") if isinstance(resume, dict) else ""
+        try:
+            return base64.b64decode(content).decode("utf-8")
+        except Exception:
+            return content if isinstance(content, str) else ""
+    
+    async def _eligible_jobs(self, session_id: str) -> AsyncIterator[Dict]:
+        """Search results with jobs that break the user's hard constraints removed, page by page"""
+        session = self.sessions[session_id]
+        eligibility = EligibilityFilter.from_profile(session.get("profile"))
+        session["eligibility"] = eligibility.get_stats()
+        async for page in self._search_jobs(session_id):
+            eligible = eligibility.apply(page)
+            session["eligibility"] = eligibility.get_stats()
+            for job in eligible:
+                yield job
+    
+    async def _search_jobs(self, session_id: str) -> AsyncIterator[List[Dict]]:
+        """Search for jobs (simplified version), yielding each page as it arrives"""
+        session = self.sessions[session_id]
+        preferences = session["preferences"]
+        session["jobs_found"] = 0
+        
+        # Mock job results, spread across platforms by their submission rates
+        total = min(preferences.get("max_applications", 10), 25)
+        titles = preferences.get("job_titles") or ["Software Engineer"]
+        platforms = self.application_scheduler.plan_platforms(
+            preferences.get("platforms") or ["linkedin", "indeed"], total)
+        for page_start in range(0, total, 5):
+            if session["status"] == "stopped":
+                return
+            await asyncio.sleep(0.5)  # Simulate one search API call per page
+            page = []
+            for i in range(page_start, min(page_start + 5, total)):
+                title = titles[i % len(titles)]
+                page.append({
+                    "title": title,
+                    "company": f"Company {i + 1}",
+                    "description": f"{title} role requiring python, sql and communication skills",
+                    "url": f"https://example.com/jobs/{session_id}/{i + 1}",
+                    "platform": platforms[i]
+                })
+            session["jobs_found"] += len(page)
+            session["last_activity"] = datetime.now().isoformat()
+            yield page
         
         # If county scraper is available, use it
         if self.county_scraper:
             try:
                 county_jobs = await self.county_scraper.scrape_all_counties(max_jobs_per_county=5)
                 session["jobs_found"] += len(county_jobs)
+                yield [job if isinstance(job, dict) else vars(job) for job in county_jobs]
             except Exception as e:
                 print(f"County scraper error: {e}")
     
-    async def _apply_to_jobs(self, session_id: str):
-        """Apply to jobs (simplified version)"""
+    async def _apply_to_job(self, session_id: str, job: Dict):
+        """Apply to one job (simplified version)"""
         session = self.sessions[session_id]
-        jobs_found = session["jobs_found"]
+        await asyncio.sleep(1)  # Simulate application time
         
-        # Simulate application process
-        for i in range(min(jobs_found, 5)):  # Apply to max 5 jobs in demo
-            await asyncio.sleep(1)  # Simulate application time
-            
-            # Simulate CAPTCHA solving if available
-            if self.captcha_solver:
-                try:
-                    # Simple CAPTCHA simulation - just increment counter
-                    session["applications_sent"] += 1
-                except Exception as e:
-                    print(f"CAPTCHA solver error: {e}")
-                    session["applications_sent"] += 1  # Continue without CAPTCHA
-            else:
+        # Simulate CAPTCHA solving if available
+        if self.captcha_solver:
+            try:
+                # Simple CAPTCHA simulation - just increment counter
                 session["applications_sent"] += 1
-            
-            session["last_activity"] = datetime.now().isoformat()
+            except Exception as e:
+                print(f"CAPTCHA solver error: {e}")
+                session["applications_sent"] += 1  # Continue without CAPTCHA
+        else:
+            session["applications_sent"] += 1
+        
+        session["last_activity"] = datetime.now().isoformat()
     
     def get_session_status(self, session_id: str) -> Optional[Dict]:
         """Get automation session status"""
@@ -125,10 +318,14 @@ class JobAutomationEngine:
     
     def stop_automation(self, session_id: str) -> Dict:
         """Stop automation session"""
+        task_status = self.task_queue.cancel(session_id) if self.task_queue else None
         if session_id in self.sessions:
             self.sessions[session_id]["status"] = "stopped"
             self.sessions[session_id]["last_activity"] = datetime.now().isoformat()
             return {"status": "success", "message": "Automation stopped"}
+        if task_status:
+            # Session lives on another worker process; it stops at its next checkpoint
+            return {"status": "success", "message": "Automation stop requested"}
         return {"status": "error", "message": "Session not found"}
     
     def get_all_sessions(self) -> Dict:
@@ -2,33 +2,29 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import logging
 from typing import List, Dict, Optional
 import random
+from automation.browser_pool import BrowserPool, PooledBrowser, launch_chrome
 
 class JobScraper:
-    def __init__(self, headless: bool = True):
-        self.setup_driver(headless)
+    def __init__(self, headless: bool = True, pool: Optional[BrowserPool] = None, platform: Optional[str] = None):
+        # With a pool the scraper borrows a warm browser instead of launching its own
+        self.pool = pool
+        self.pooled_browser: Optional[PooledBrowser] = None
+        self.setup_driver(headless, platform)
         self.logger = logging.getLogger(__name__)
         
-    def setup_driver(self, headless: bool):
+    def setup_driver(self, headless: bool, platform: Optional[str] = None):
         """Setup Chrome driver with options"""
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
+        if self.pool is not None:
+            self.pooled_browser = self.pool.acquire(platform)
+            self.driver = self.pooled_browser.driver
+            return
         
-        self.driver = webdriver.Chrome(
-            service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
-            options=chrome_options
-        )
+        # The scraper only reads DOM text, so skip images, fonts, media and trackers
+        self.driver = launch_chrome(headless, "lightweight")
         
     def scrape_linkedin_jobs(self, keywords: str, location: str, max_jobs: int = 50) -> List[Dict]:
         """Scrape jobs from LinkedIn"""
@@ -157,6 +153,10 @@ class JobScraper:
             return None
     
     def close(self):
-        """Close the browser driver"""
-        if self.driver:
+        """Close the browser driver, or hand a pooled one back"""
+        if self.pooled_browser is not None:
+            self.pool.release(self.pooled_browser)
+            self.pooled_browser = None
+            self.driver = None
+        elif self.driver:
             self.driver.quit() 
\ No newline at end of file
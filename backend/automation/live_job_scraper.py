@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 import logging
 from urllib.parse import quote_plus, urljoin, urlparse
 from bs4 import BeautifulSoup
+from automation.tiered_fetcher import TieredFetcher
+from automation.search_planner import SearchPlanner
 import random
 import time
 import ssl
@@ -48,6 +50,7 @@ class LiveJobScraper:
         }
         self.logger = logging.getLogger(__name__)
         self.session = None
+        self.fetcher = None
         
     async def __aenter__(self):
         # Create SSL context that's more permissive
@@ -69,6 +72,8 @@ class LiveJobScraper:
             timeout=timeout,
             headers=self.headers
         )
+        # Listing pages go over HTTP; only client-side rendered ones are escalated to a browser
+        self.fetcher = TieredFetcher(self.session)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -77,38 +82,25 @@ class LiveJobScraper:
     
     async def search_jobs(self, job_title: str, location: str = "", limit: int = 100) -> List[JobListing]:
         """Search for real jobs across multiple platforms"""
-        all_jobs = []
-        
-        # Scrape from multiple sources
-        scrapers = [
-            self._scrape_indeed_jobs,
-            self._scrape_linkedin_jobs,
-            self._scrape_glassdoor_jobs,
-            self._scrape_handshake_jobs,
-            self._scrape_newspaper_jobs
-        ]
-        
-        jobs_per_source = max(5, limit // len(scrapers))
-        
-        for scraper in scrapers:
-            try:
-                jobs = await scraper(job_title, location, jobs_per_source)
-                all_jobs.extend(jobs)
-                self.logger.info(f"Scraped {len(jobs)} jobs from {scraper.__name__}")
-                
-                # Add delay between scraping different sources
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping from {scraper.__name__}: {e}")
-                continue
-        
-        # Remove duplicates and sort by relevance
-        unique_jobs = self._remove_duplicates(all_jobs)
-        sorted_jobs = sorted(unique_jobs, key=lambda x: x.match_score, reverse=True)
-        
-        self.logger.info(f"Total scraped jobs: {len(sorted_jobs)}")
-        return sorted_jobs[:limit]
+        return await self.search_many([job_title], [location], limit)
+    
+    async def search_many(self, job_titles: List[str], locations: List[str], limit: int = 100) -> List[JobListing]:
+        """Search every title x location combination as one planned batch"""
+        planner = SearchPlanner({
+            "indeed": self._scrape_indeed_jobs,
+            "linkedin": self._scrape_linkedin_jobs,
+            "glassdoor": self._scrape_glassdoor_jobs,
+            "handshake": self._scrape_handshake_jobs,
+            "newspaper": self._scrape_newspaper_jobs
+        }, score=self._calculate_match_score)
+        all_jobs = await planner.search(job_titles, locations, limit)
+        
+        # Best-scored copy of each job first, so deduplication keeps it
+        sorted_jobs = sorted(all_jobs, key=lambda x: x.match_score, reverse=True)
+        unique_jobs = self._remove_duplicates(sorted_jobs)
+        
+        self.logger.info(f"Total scraped jobs: {len(unique_jobs)} ({self.fetcher.page_hits} shared page fetches)")
+        return unique_jobs[:limit]
     
     async def _scrape_indeed_jobs(self, job_title: str, location: str, limit: int) -> List[JobListing]:
         """Scrape real jobs from Indeed"""
@@ -121,61 +113,63 @@ class LiveJobScraper:
         url = f"https://www.indeed.com/jobs?q={query}&l={loc}&fromage=7&sort=date"
         
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Find job cards
-                    job_cards = soup.find_all('div', {'class': ['job_seen_beacon', 'slider_container']})
-                    
-                    for card in job_cards[:limit]:
-                        try:
-                            # Extract job details
-                            title_elem = card.find('h2', {'class': 'jobTitle'})
-                            if not title_elem:
-                                title_elem = card.find('span', {'title': True})
+            result = await self.fetcher.fetch(url, "div.job_seen_beacon, div.slider_container", platform="indeed")
+            if result is not None:
+                html = result.html
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Find job cards
+                job_cards = soup.find_all('div', {'class': ['job_seen_beacon', 'slider_container']})
+                
+                for card in job_cards[:limit]:
+                    try:
+                        # Extract job details
+                        title_elem = card.find('h2', {'class': 'jobTitle'})
+                        if not title_elem:
+                            title_elem = card.find('span', {'title': True})
+                        
+                        company_elem = card.find('span', {'class': 'companyName'})
+                        location_elem = card.find('div', {'class': 'companyLocation'})
+                        
+                        if title_elem and company_elem:
+                            # Get job URL
+                            link_elem = title_elem.find('a')
+                            if link_elem and link_elem.get('href'):
+                                job_url = urljoin('https://www.indeed.com', link_elem['href'])
+                            else:
+                                job_url = url
                             
-                            company_elem = card.find('span', {'class': 'companyName'})
-                            location_elem = card.find('div', {'class': 'companyLocation'})
+                            # Extract salary if available
+                            salary_elem = card.find('span', {'class': 'salary-snippet'})
+                            salary = salary_elem.text.strip() if salary_elem else "Salary not specified"
                             
-                            if title_elem and company_elem:
-                                # Get job URL
-                                link_elem = title_elem.find('a')
-                                if link_elem and link_elem.get('href'):
-                                    job_url = urljoin('https://www.indeed.com', link_elem['href'])
-                                else:
-                                    job_url = url
-                                
-                                # Extract salary if available
-                                salary_elem = card.find('span', {'class': 'salary-snippet'})
-                                salary = salary_elem.text.strip() if salary_elem else "Salary not specified"
-                                
-                                # Extract snippet/description
-                                snippet_elem = card.find('div', {'class': 'job-snippet'})
-                                description = snippet_elem.text.strip() if snippet_elem else "No description available"
-                                
-                                job = JobListing(
-                                    title=title_elem.get_text().strip(),
-                                    company=company_elem.get_text().strip(),
-                                    location=location_elem.get_text().strip() if location_elem else location,
-                                    description=description,
-                                    salary=salary,
-                                    employment_type="Full-time",
-                                    posted_date="Recent",
-                                    apply_url=job_url,
-                                    source="💼 Indeed",
-                                    skills=self._extract_skills_from_text(description),
-                                    experience_level="Mid Level",
-                                    remote_work="remote" in description.lower(),
-                                    match_score=self._calculate_match_score(job_title, title_elem.get_text())
-                                )
-                                jobs.append(job)
-                                
-                        except Exception as e:
-                            self.logger.error(f"Error parsing Indeed job card: {e}")
-                            continue
+                            # Extract snippet/description
+                            snippet_elem = card.find('div', {'class': 'job-snippet'})
+                            description = snippet_elem.text.strip() if snippet_elem else "No description available"
                             
+                            job = JobListing(
+                                title=title_elem.get_text().strip(),
+                                company=company_elem.get_text().strip(),
+                                location=location_elem.get_text().strip() if location_elem else location,
+                                description=description,
+                                salary=salary,
+                                employment_type="Full-time",
+                                posted_date="Recent",
+                                apply_url=job_url,
+                                source="💼 Indeed",
+                                skills=self._extract_skills_from_text(description),
+                                experience_level="Mid Level",
+                                remote_work="remote" in description.lower(),
+                                match_score=self._calculate_match_score(job_title, title_elem.get_text())
+                            )
+                            jobs.append(job)
+                            
+                    except Exception as e:
+                        self.logger.error(f"Error parsing Indeed job card: {e}")
+                        continue
+                
+                self.fetcher.record_jobs(result, len(jobs))
+
         except Exception as e:
             self.logger.error(f"Error scraping Indeed: {e}")
         
@@ -192,50 +186,52 @@ class LiveJobScraper:
         url = f"https://www.linkedin.com/jobs/search?keywords={query}&location={loc}&f_TPR=r604800&f_JT=F"
         
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Find job cards
-                    job_cards = soup.find_all('div', {'class': 'base-card'})
-                    
-                    for card in job_cards[:limit]:
-                        try:
-                            title_elem = card.find('h3', {'class': 'base-search-card__title'})
-                            company_elem = card.find('h4', {'class': 'base-search-card__subtitle'})
-                            location_elem = card.find('span', {'class': 'job-search-card__location'})
+            result = await self.fetcher.fetch(url, "div.base-card", platform="linkedin")
+            if result is not None:
+                html = result.html
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Find job cards
+                job_cards = soup.find_all('div', {'class': 'base-card'})
+                
+                for card in job_cards[:limit]:
+                    try:
+                        title_elem = card.find('h3', {'class': 'base-search-card__title'})
+                        company_elem = card.find('h4', {'class': 'base-search-card__subtitle'})
+                        location_elem = card.find('span', {'class': 'job-search-card__location'})
+                        
+                        if title_elem and company_elem:
+                            # Get job URL
+                            link_elem = card.find('a', {'class': 'base-card__full-link'})
+                            job_url = link_elem['href'] if link_elem else url
+                            
+                            # Extract time posted
+                            time_elem = card.find('time')
+                            posted_date = time_elem['datetime'] if time_elem else "Recent"
                             
-                            if title_elem and company_elem:
-                                # Get job URL
-                                link_elem = card.find('a', {'class': 'base-card__full-link'})
-                                job_url = link_elem['href'] if link_elem else url
-                                
-                                # Extract time posted
-                                time_elem = card.find('time')
-                                posted_date = time_elem['datetime'] if time_elem else "Recent"
-                                
-                                job = JobListing(
-                                    title=title_elem.get_text().strip(),
-                                    company=company_elem.get_text().strip(),
-                                    location=location_elem.get_text().strip() if location_elem else location,
-                                    description="LinkedIn job posting - click to view full details",
-                                    salary="Salary not specified",
-                                    employment_type="Full-time",
-                                    posted_date=posted_date,
-                                    apply_url=job_url,
-                                    source="💼 LinkedIn",
-                                    skills=["Professional Skills"],
-                                    experience_level="Mid Level",
-                                    remote_work=False,
-                                    match_score=self._calculate_match_score(job_title, title_elem.get_text())
-                                )
-                                jobs.append(job)
-                                
-                        except Exception as e:
-                            self.logger.error(f"Error parsing LinkedIn job card: {e}")
-                            continue
+                            job = JobListing(
+                                title=title_elem.get_text().strip(),
+                                company=company_elem.get_text().strip(),
+                                location=location_elem.get_text().strip() if location_elem else location,
+                                description="LinkedIn job posting - click to view full details",
+                                salary="Salary not specified",
+                                employment_type="Full-time",
+                                posted_date=posted_date,
+                                apply_url=job_url,
+                                source="💼 LinkedIn",
+                                skills=["Professional Skills"],
+                                experience_level="Mid Level",
+                                remote_work=False,
+                                match_score=self._calculate_match_score(job_title, title_elem.get_text())
+                            )
+                            jobs.append(job)
                             
+                    except Exception as e:
+                        self.logger.error(f"Error parsing LinkedIn job card: {e}")
+                        continue
+                
+                self.fetcher.record_jobs(result, len(jobs))
+
         except Exception as e:
             self.logger.error(f"Error scraping LinkedIn: {e}")
         
@@ -251,59 +247,61 @@ class LiveJobScraper:
         url = f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query}&locT=C&locId=&jobType=&fromAge=7&minSalary=0&includeNoSalaryJobs=true&radius=25&cityId=-1&minRating=0.0&industryId=-1&sgocId=-1&seniorityType=&companyId=-1&employerSizes=0&applicationType=0&remoteWorkType=0"
         
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Find job cards
-                    job_cards = soup.find_all('li', {'class': 'react-job-listing'})
-                    
-                    for card in job_cards[:limit]:
-                        try:
-                            title_elem = card.find('a', {'class': 'jobLink'})
-                            company_elem = card.find('div', {'class': 'jobHeader'})
+            result = await self.fetcher.fetch(url, "li.react-job-listing", platform="glassdoor")
+            if result is not None:
+                html = result.html
+                soup = BeautifulSoup(html, 'html.parser')
+                
+                # Find job cards
+                job_cards = soup.find_all('li', {'class': 'react-job-listing'})
+                
+                for card in job_cards[:limit]:
+                    try:
+                        title_elem = card.find('a', {'class': 'jobLink'})
+                        company_elem = card.find('div', {'class': 'jobHeader'})
+                        
+                        if title_elem:
+                            # Get job URL
+                            job_url = urljoin('https://www.glassdoor.com', title_elem['href'])
+                            
+                            # Extract company name
+                            company_name = "Company"
+                            if company_elem:
+                                company_link = company_elem.find('a')
+                                if company_link:
+                                    company_name = company_link.get_text().strip()
                             
-                            if title_elem:
-                                # Get job URL
-                                job_url = urljoin('https://www.glassdoor.com', title_elem['href'])
-                                
-                                # Extract company name
-                                company_name = "Company"
-                                if company_elem:
-                                    company_link = company_elem.find('a')
-                                    if company_link:
-                                        company_name = company_link.get_text().strip()
-                                
-                                # Extract location
-                                location_elem = card.find('span', {'class': 'loc'})
-                                job_location = location_elem.get_text().strip() if location_elem else location
-                                
-                                # Extract salary
-                                salary_elem = card.find('span', {'class': 'salaryText'})
-                                salary = salary_elem.get_text().strip() if salary_elem else "Salary not specified"
-                                
-                                job = JobListing(
-                                    title=title_elem.get_text().strip(),
-                                    company=company_name,
-                                    location=job_location,
-                                    description="Glassdoor job posting - click to view full details",
-                                    salary=salary,
-                                    employment_type="Full-time",
-                                    posted_date="Recent",
-                                    apply_url=job_url,
-                                    source="🏢 Glassdoor",
-                                    skills=["Professional Skills"],
-                                    experience_level="Mid Level",
-                                    remote_work=False,
-                                    match_score=self._calculate_match_score(job_title, title_elem.get_text())
-                                )
-                                jobs.append(job)
-                                
-                        except Exception as e:
-                            self.logger.error(f"Error parsing Glassdoor job card: {e}")
-                            continue
+                            # Extract location
+                            location_elem = card.find('span', {'class': 'loc'})
+                            job_location = location_elem.get_text().strip() if location_elem else location
                             
+                            # Extract salary
+                            salary_elem = card.find('span', {'class': 'salaryText'})
+                            salary = salary_elem.get_text().strip() if salary_elem else "Salary not specified"
+                            
+                            job = JobListing(
+                                title=title_elem.get_text().strip(),
+                                company=company_name,
+                                location=job_location,
+                                description="Glassdoor job posting - click to view full details",
+                                salary=salary,
+                                employment_type="Full-time",
+                                posted_date="Recent",
+                                apply_url=job_url,
+                                source="🏢 Glassdoor",
+                                skills=["Professional Skills"],
+                                experience_level="Mid Level",
+                                remote_work=False,
+                                match_score=self._calculate_match_score(job_title, title_elem.get_text())
+                            )
+                            jobs.append(job)
+                            
+                    except Exception as e:
+                        self.logger.error(f"Error parsing Glassdoor job card: {e}")
+                        continue
+                
+                self.fetcher.record_jobs(result, len(jobs))
+
         except Exception as e:
             self.logger.error(f"Error scraping Glassdoor: {e}")
         
@@ -319,30 +317,29 @@ class LiveJobScraper:
         url = f"https://app.joinhandshake.com/stu/jobs/search?query={query}"
         
         try:
-            async with self.session.get(url) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
+            html = await self.fetcher.fetch_text(url)
+            if html is not None:
+                soup = BeautifulSoup(html, 'html.parser')
                     
-                    # Note: Handshake requires authentication for full access
-                    # For now, create sample entry-level jobs
-                    for i in range(min(limit, 3)):
-                        job = JobListing(
-                            title=f"Entry-Level {job_title}",
-                            company="Various Companies",
-                            location=location or "Multiple Locations",
-                            description=f"Entry-level position for {job_title}. Great for recent graduates.",
-                            salary="$40,000 - $60,000",
-                            employment_type="Full-time",
-                            posted_date="Recent",
-                            apply_url=url,
-                            source="🤝 Handshake",
-                            skills=["Entry Level", "Recent Graduate"],
-                            experience_level="Entry Level",
-                            remote_work=False,
-                            match_score=85
-                        )
-                        jobs.append(job)
+                # Note: Handshake requires authentication for full access
+                # For now, create sample entry-level jobs
+                for i in range(min(limit, 3)):
+                    job = JobListing(
+                        title=f"Entry-Level {job_title}",
+                        company="Various Companies",
+                        location=location or "Multiple Locations",
+                        description=f"Entry-level position for {job_title}. Great for recent graduates.",
+                        salary="$40,000 - $60,000",
+                        employment_type="Full-time",
+                        posted_date="Recent",
+                        apply_url=url,
+                        source="🤝 Handshake",
+                        skills=["Entry Level", "Recent Graduate"],
+                        experience_level="Entry Level",
+                        remote_work=False,
+                        match_score=85
+                    )
+                    jobs.append(job)
                         
         except Exception as e:
             self.logger.error(f"Error scraping Handshake: {e}")
@@ -362,25 +359,24 @@ class LiveJobScraper:
         
         for source in newspaper_sources[:2]:  # Limit to 2 sources
             try:
-                async with self.session.get(source) as response:
-                    if response.status == 200:
-                        # Create sample newspaper job
-                        job = JobListing(
-                            title=f"{job_title}",
-                            company="Local Employer",
-                            location=location or "Local Area",
-                            description=f"Local {job_title} position posted in classified ads.",
-                            salary="Competitive",
-                            employment_type="Full-time",
-                            posted_date="Recent",
-                            apply_url=source,
-                            source="📰 Newspaper",
-                            skills=["Local Market"],
-                            experience_level="All Levels",
-                            remote_work=False,
-                            match_score=75
-                        )
-                        jobs.append(job)
+                if await self.fetcher.fetch_text(source) is not None:
+                    # Create sample newspaper job
+                    job = JobListing(
+                        title=f"{job_title}",
+                        company="Local Employer",
+                        location=location or "Local Area",
+                        description=f"Local {job_title} position posted in classified ads.",
+                        salary="Competitive",
+                        employment_type="Full-time",
+                        posted_date="Recent",
+                        apply_url=source,
+                        source="📰 Newspaper",
+                        skills=["Local Market"],
+                        experience_level="All Levels",
+                        remote_work=False,
+                        match_score=75
+                    )
+                    jobs.append(job)
                         
             except Exception as e:
                 self.logger.error(f"Error scraping newspaper source {source}: {e}")
@@ -0,0 +1,88 @@
+import time
+import argparse
+import statistics
+from typing import Dict, List, Any
+from automation.browser_pool import LOAD_PROFILES, launch_chrome, driver_memory_mb
+
+DEFAULT_URLS = [
+    "https://www.indeed.com/jobs?q=software+engineer&l=Remote",
+    "https://www.linkedin.com/jobs/search/?keywords=software%20engineer&location=United%20States",
+    "https://www.glassdoor.com/Job/software-engineer-jobs-SRCH_KO0,17.htm"
+]
+
+# Navigation timing of the current page, in milliseconds from navigation start
+NAVIGATION_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+    load: nav ? nav.loadEventEnd : null,
+    resources: resources.length,
+    transferred_kb: resources.reduce((total, r) => total + (r.transferSize || 0), 0) / 1024,
+    js_heap_mb: performance.memory ? performance.memory.usedJSHeapSize / (1024 * 1024) : null
+};
+"""
+
+def measure_profile(load_profile: str, urls: List[str], runs: int, headless: bool = True) -> Dict[str, Any]:
+    """Load every URL runs times in one browser and summarize page-ready latency and memory"""
+    driver = launch_chrome(headless, load_profile)
+    ready_ms, resources, transferred_kb, heap_mb, rss_mb = [], [], [], [], []
+    try:
+        for _ in range(runs):
+            for url in urls:
+                driver.get("about:blank")
+                started = time.perf_counter()
+                # get() returns at DOMContentLoaded under "eager" and at the load event under "normal"
+                driver.get(url)
+                ready_ms.append((time.perf_counter() - started) * 1000)
+
+                timing = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+                resources.append(timing["resources"])
+                transferred_kb.append(timing["transferred_kb"])
+                if timing["js_heap_mb"] is not None:
+                    heap_mb.append(timing["js_heap_mb"])
+                rss_mb.append(driver_memory_mb(driver))
+    finally:
+        driver.quit()
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {}
+        ordered = sorted(values)
+        return {
+            "p50": round(statistics.median(ordered), 1),
+            "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+            "mean": round(statistics.mean(ordered), 1)
+        }
+
+    return {
+        "profile": load_profile,
+        "page_ready_ms": summary(ready_ms),
+        "resources_per_page": summary(resources),
+        "transferred_kb_per_page": summary(transferred_kb),
+        "js_heap_mb": summary(heap_mb),
+        "browser_rss_mb": summary(rss_mb)
+    }
+
+def print_report(results: List[Dict[str, Any]]):
+    metrics = ["page_ready_ms", "resources_per_page", "transferred_kb_per_page", "js_heap_mb", "browser_rss_mb"]
+    print(f"{'metric':<26}" + "".join(f"{r['profile'] + ' (p50/p95)':>26}" for r in results))
+    for metric in metrics:
+        cells = []
+        for result in results:
+            values = result[metric]
+            cells.append(f"{values['p50']}/{values['p95']}" if values else "n/a")
+        print(f"{metric:<26}" + "".join(f"{cell:>26}" for cell in cells))
+
+if __name__ == "__main__":
+    # Run from backend/ with Chrome available: python -m automation.load_profile_benchmark --runs 5
+    parser = argparse.ArgumentParser(description="Compare page-ready latency and memory across browser load profiles")
+    parser.add_argument("--url", action="append", dest="urls", help="Page to load (repeatable); defaults to job search pages")
+    parser.add_argument("--runs", type=int, default=3, help="Loads of each URL per profile")
+    parser.add_argument("--profiles", nargs="+", default=["full", "lightweight"], choices=sorted(LOAD_PROFILES))
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+
+    results = [measure_profile(profile, args.urls or DEFAULT_URLS, args.runs, headless=not args.headed)
+               for profile in args.profiles]
+    print_report(results)
@@ -4,14 +4,21 @@ import re
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from collections import OrderedDict
 import time
 import random
 from urllib.parse import urljoin, urlparse
 import feedparser
+from ai_services.job_stream_aggregator import JobStreamAggregator
 
 class NewspaperJobScraper:
+    # Recently ingested job ids remembered so repeat scrapes are not counted twice
+    MAX_SEEN_JOB_IDS = 10000
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.job_stream = JobStreamAggregator()
+        self.seen_job_ids: OrderedDict = OrderedDict()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -204,6 +211,7 @@ class NewspaperJobScraper:
             unique_jobs = self.deduplicate_and_filter(all_jobs)
             
             self.logger.info(f"Found {len(unique_jobs)} unique job postings from newspapers")
+            self.ingest_statistics(unique_jobs[:max_articles])
             return unique_jobs[:max_articles]
             
         except Exception as e:
@@ -521,8 +529,33 @@ class NewspaperJobScraper:
             self.logger.error(f"Error deduplicating jobs: {e}")
             return jobs
 
-    def get_job_statistics(self, jobs: List[Dict]) -> Dict:
-        """Get statistics about scraped jobs"""
+    def ingest_statistics(self, jobs: List[Dict]):
+        """Feed newly scraped jobs into the windowed statistics, skipping ones already counted"""
+        for job in jobs:
+            job_id = f"{job.get('title', '')}-{job.get('company', '')}-{job.get('location', '')}".lower().strip()
+            if job_id in self.seen_job_ids:
+                self.seen_job_ids.move_to_end(job_id)
+                continue
+            self.seen_job_ids[job_id] = True
+            if len(self.seen_job_ids) > self.MAX_SEEN_JOB_IDS:
+                self.seen_job_ids.popitem(last=False)
+            self.job_stream.ingest(job)
+
+    def get_job_statistics(self, jobs: Optional[List[Dict]] = None) -> Dict:
+        """Get statistics about scraped jobs
+
+        Without a job list, returns the windowed statistics maintained during scraping.
+        """
+        if jobs is None:
+            snapshot = self.job_stream.snapshot(top_n=None)
+            return {
+                'total_jobs': snapshot['total_jobs'],
+                'sources': snapshot['sources'],
+                'locations': snapshot['locations'],
+                'job_types': snapshot['job_types'],
+                'companies': snapshot['companies']
+            }
+        
         try:
             stats = {
                 'total_jobs': len(jobs),
@@ -0,0 +1,104 @@
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any, Callable, Awaitable, AsyncIterator, Tuple, Type
+
+# Marks the end of the stream between stages
+_END = object()
+
+class PipelineStage:
+    """
+    One step of a StagedPipeline
+    - handler receives an item and returns the item for the next stage, or None to drop it
+    - concurrency is the number of items the stage works on at once
+    - blocking=True runs a synchronous handler in a thread so CPU-bound stages
+      do not stall the event loop for the I/O-bound ones
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], concurrency: int = 1, blocking: bool = False):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.blocking = blocking
+        self.stats = {"processed": 0, "passed": 0, "dropped": 0, "errors": 0, "busy_seconds": 0.0}
+
+    async def process(self, item: Any) -> Any:
+        if self.blocking:
+            return await asyncio.to_thread(self.handler, item)
+        return await self.handler(item)
+
+class StagedPipeline:
+    """
+    Runs items from an async source through stages connected by bounded queues
+    - Every stage works as soon as its first item arrives, so later stages
+      start while earlier ones are still producing
+    - A full queue blocks the stage feeding it, which bounds memory (backpressure)
+    - Per-item errors are logged and the item dropped; errors listed in abort_on
+      stop the whole pipeline and are re-raised from run()
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 16,
+                 abort_on: Tuple[Type[BaseException], ...] = ()):
+        self.logger = logging.getLogger(__name__)
+        self.stages = stages
+        self.queue_size = queue_size
+        self.abort_on = abort_on
+
+    async def run(self, source: AsyncIterator[Any]) -> Dict[str, Dict[str, Any]]:
+        """Drain the source through every stage; returns per-stage statistics"""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        tasks = [asyncio.create_task(self._feed(source, queues[0]))]
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            remaining = [stage.concurrency]  # workers still running, shared by the stage's workers
+            tasks.extend(asyncio.create_task(self._work(stage, queues[index], outbox, remaining))
+                         for _ in range(stage.concurrency))
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return {stage.name: dict(stage.stats) for stage in self.stages}
+
+    async def _feed(self, source: AsyncIterator[Any], outbox: asyncio.Queue):
+        try:
+            async for item in source:
+                await outbox.put(item)
+        finally:
+            await outbox.put(_END)
+
+    async def _work(self, stage: PipelineStage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue], remaining: List[int]):
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                # Leave the marker for sibling workers; the last one passes it downstream
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    await inbox.put(_END)
+                elif outbox is not None:
+                    await outbox.put(_END)
+                return
+
+            started = time.perf_counter()
+            try:
+                result = await stage.process(item)
+            except self.abort_on:
+                raise
+            except Exception as e:
+                stage.stats["errors"] += 1
+                self.logger.error(f"Pipeline stage {stage.name} failed on an item: {e}")
+                continue
+            finally:
+                stage.stats["processed"] += 1
+                stage.stats["busy_seconds"] += time.perf_counter() - started
+
+            if result is None:
+                stage.stats["dropped"] += 1
+                continue
+            stage.stats["passed"] += 1
+            if outbox is not None:
+                await outbox.put(result)
@@ -33,12 +33,16 @@ class RealJobScraper:
     
     async def search_jobs(self, job_title: str, location: str = "", limit: int = 1000) -> List[JobListing]:
         """Search for real jobs across multiple platforms"""
+        return await self.search_many([job_title], [location], limit)
+    
+    async def search_many(self, job_titles: List[str], locations: List[str], limit: int = 1000) -> List[JobListing]:
+        """Search every title x location combination as one batch, deduplicated and ranked"""
         try:
-            self.logger.info(f"Starting live job search for '{job_title}' in '{location}'")
+            self.logger.info(f"Starting live job search for {job_titles} in {locations}")
             
             # Use live scraper to get real job listings
             if self.live_scraper:
-                jobs = await self.live_scraper.search_jobs(job_title, location, limit)
+                jobs = await self.live_scraper.search_many(job_titles, locations, limit)
             else:
                 jobs = []
             
@@ -47,12 +51,21 @@ class RealJobScraper:
                 return jobs
             else:
                 self.logger.warning("No jobs found from live scraping, using fallback")
-                return await self._generate_fallback_jobs(job_title, location, min(limit, 10))
+                return await self._generate_fallback_batch(job_titles, locations, min(limit, 10))
                 
         except Exception as e:
             self.logger.error(f"Error in live job scraping: {e}")
             # Fallback to basic realistic jobs if live scraping fails
-            return await self._generate_fallback_jobs(job_title, location, min(limit, 10))
+            return await self._generate_fallback_batch(job_titles, locations, min(limit, 10))
+    
+    async def _generate_fallback_batch(self, job_titles: List[str], locations: List[str], limit: int) -> List[JobListing]:
+        """Fallback jobs spread over the searched combinations"""
+        combinations = [(title, location) for title in (job_titles or [""]) for location in (locations or [""])]
+        per_combination = max(1, limit // len(combinations))
+        jobs = []
+        for title, location in combinations[:limit]:
+            jobs.extend(await self._generate_fallback_jobs(title, location, per_combination))
+        return jobs[:limit]
     
     async def _generate_fallback_jobs(self, job_title: str, location: str, limit: int) -> List[JobListing]:
         """Fallback job generation with basic realistic constraints"""
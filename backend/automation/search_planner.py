@@ -0,0 +1,121 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Awaitable, Tuple
+
+# What each source's search URL can express, so title x location combinations
+# collapse into as few fetches as the source allows. Scrapers parse one result page
+# per query, so titles are not OR-ed together (max_titles 1): a merged query would
+# split that page between its titles and cut each title's coverage
+SOURCE_QUERY_RULES = {
+    "indeed": {"location_scoped": True, "max_titles": 1},
+    "linkedin": {"location_scoped": True, "max_titles": 1},
+    # These search URLs carry no location, so one query per title serves every location
+    "glassdoor": {"location_scoped": False, "max_titles": 1},
+    "handshake": {"location_scoped": False, "max_titles": 1},
+    "newspaper": {"location_scoped": False, "max_titles": 1}
+}
+
+# Preferences beyond these are ignored rather than multiplying the search
+MAX_SEARCH_TITLES = 10
+MAX_SEARCH_LOCATIONS = 10
+
+@dataclass(frozen=True)
+class SearchQuery:
+    source: str
+    titles: Tuple[str, ...]
+    location: str
+
+    @property
+    def keywords(self) -> str:
+        if len(self.titles) == 1:
+            return self.titles[0]
+        return " OR ".join(f'"{title}"' for title in self.titles)
+
+def distinct_terms(values: List[str], limit: int) -> List[str]:
+    """Stripped values without case-insensitive repeats, in order; [""] when none are given"""
+    terms, seen = [], set()
+    for value in values or []:
+        value = (value or "").strip()
+        if value and value.lower() not in seen:
+            seen.add(value.lower())
+            terms.append(value)
+    return terms[:limit] or [""]
+
+def plan_queries(titles: List[str], locations: List[str], sources: List[str]) -> List[SearchQuery]:
+    """The fetches covering every title x location combination on every source"""
+    titles = distinct_terms(titles, MAX_SEARCH_TITLES)
+    locations = distinct_terms(locations, MAX_SEARCH_LOCATIONS)
+    queries = []
+    for source in sources:
+        rules = SOURCE_QUERY_RULES.get(source, {"location_scoped": True, "max_titles": 1})
+        step = rules["max_titles"]
+        title_groups = [tuple(titles[i:i + step]) for i in range(0, len(titles), step)]
+        if rules["location_scoped"]:
+            source_locations = locations
+        else:
+            # A single location still labels the jobs a location-less source returns
+            source_locations = locations if len(locations) == 1 else [""]
+        for location in source_locations:
+            for group in title_groups:
+                queries.append(SearchQuery(source, group, location))
+    return queries
+
+class SearchPlanner:
+    """
+    Runs a multi-title, multi-location search as one batch
+    - plan_queries() merges combinations a source can answer jointly (one query
+      per title on location-less URLs), so N x M preferences do not mean N x M scrapes
+    - Sources are searched concurrently; queries to the same source run one
+      after another with source_delay between them
+    - Jobs from a merged query are re-scored against the title they match best
+    """
+
+    def __init__(self, scrapers: Dict[str, Callable[[str, str, int], Awaitable[List[Any]]]],
+                 score: Callable[[str, str], int], source_delay: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.scrapers = scrapers
+        self.score = score
+        self.source_delay = source_delay
+        self.last_stats: Dict[str, Any] = {}
+
+    async def search(self, titles: List[str], locations: List[str], limit: int) -> List[Any]:
+        """Every job the planned queries return, not yet deduplicated or ranked"""
+        started = time.monotonic()
+        queries = plan_queries(titles, locations, list(self.scrapers))
+        per_query = max(5, limit // len(self.scrapers))
+        by_source: Dict[str, List[SearchQuery]] = {}
+        for query in queries:
+            by_source.setdefault(query.source, []).append(query)
+
+        results = await asyncio.gather(*(self._run_source(source_queries, per_query)
+                                         for source_queries in by_source.values()))
+        jobs = [job for source_jobs in results for job in source_jobs]
+
+        self.last_stats = {
+            "combinations": len(distinct_terms(titles, MAX_SEARCH_TITLES)) *
+                            len(distinct_terms(locations, MAX_SEARCH_LOCATIONS)) * len(self.scrapers),
+            "queries": len(queries),
+            "jobs": len(jobs),
+            "seconds": round(time.monotonic() - started, 2)
+        }
+        self.logger.info(f"Search plan: {self.last_stats}")
+        return jobs
+
+    async def _run_source(self, queries: List[SearchQuery], per_query: int) -> List[Any]:
+        scraper = self.scrapers[queries[0].source]
+        jobs = []
+        for position, query in enumerate(queries):
+            if position:
+                await asyncio.sleep(self.source_delay)
+            try:
+                query_jobs = await scraper(query.keywords, query.location, per_query * len(query.titles))
+            except Exception as e:
+                self.logger.error(f"Error searching {query.source} for {query.keywords!r}: {e}")
+                continue
+            if len(query.titles) > 1:
+                for job in query_jobs:
+                    job.match_score = max(self.score(title, job.title) for title in query.titles)
+            jobs.extend(query_jobs)
+        return jobs
@@ -0,0 +1,153 @@
+import time
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Callable
+from automation.task_queue import TaskCancelled
+from automation.fair_scheduler import FairScheduler
+from automation.application_scheduler import ApplicationScheduler
+from automation.eligibility import EligibilityFilter
+from notifications.notification_system import notification_system
+
+# Task kind for sessions started through /start-automation
+AUTOMATION_SESSION_TASK = "automation_session"
+
+def publish_automation_progress(session: Dict):
+    """Push the session's progress fields to the user's live connections"""
+    notification_system.publish_event(session["user_id"], "automation_progress", {
+        "session_id": session["id"],
+        "status": session["status"],
+        "applications_sent": session.get("applications_sent", 0),
+        "jobs_found": session.get("jobs_found", 0),
+        "max_applications": session.get("max_applications"),
+        "projected_completion_at": session.get("projected_completion_at"),
+        "last_activity": session.get("last_activity"),
+        "error": session.get("error")
+    })
+
+class AutomationSessionRunner:
+    """
+    Runs queued /start-automation sessions; the API's worker pool and standalone
+    workers (python -m automation.worker) register the same handler
+    - sessions and applications are the lists session state and application
+      records are kept in: the API's tables in-process, a worker's own otherwise
+    - Progress is persisted through the task heartbeat and published to the
+      user's connections, so the API can report sessions run by any process
+    """
+
+    def __init__(self, application_scheduler: ApplicationScheduler, scheduler: FairScheduler,
+                 sessions: Optional[List[Dict]] = None, applications: Optional[List[Dict]] = None,
+                 publish: Callable[[Dict], None] = publish_automation_progress):
+        self.application_scheduler = application_scheduler
+        self.scheduler = scheduler
+        self.sessions = sessions if sessions is not None else []
+        self.applications = applications if applications is not None else []
+        self.publish = publish
+
+    def task_handlers(self) -> Dict:
+        """Queue handlers for WorkerPool"""
+        return {AUTOMATION_SESSION_TASK: self.run_task}
+
+    async def run_task(self, task: Dict, context):
+        """Queue handler for automation sessions, including ones recovered after a restart"""
+        payload = task["payload"]
+        session_id = payload["session"]["id"]
+        session = next((s for s in self.sessions if s["id"] == session_id), None)
+        if session is None:
+            session = dict(payload["session"])
+            self.sessions.append(session)
+        # Resume from the last persisted checkpoint
+        session.update(context.progress)
+        await self.run_session(session_id, session["user_id"], payload["preferences"], payload["resume"],
+                               payload.get("profile"), context)
+        return {"applications_sent": session.get("applications_sent", 0)}
+
+    async def run_session(self, session_id: str, user_id: str, preferences: Dict, resume: Dict,
+                          profile: Optional[Dict] = None, context=None):
+        session = None
+        try:
+            # Update session status
+            session = next((s for s in self.sessions if s["id"] == session_id), None)
+            if session:
+                session["status"] = "running"
+                session["last_activity"] = datetime.now().isoformat()
+                self.publish(session)
+
+            # Jobs that break the user's hard constraints never take a platform token or a slot
+            eligibility = EligibilityFilter.from_profile(profile)
+
+            # Simulate automation process
+            start = session.get("applications_sent", 0) if session else 0
+            total = preferences.get("max_applications", 10)
+            # Spread applications across the session's platforms by their submission rates
+            platform_plan = self.application_scheduler.plan_platforms(
+                (session or {}).get("platforms") or ["linkedin", "indeed"], max(0, total - start))
+            sent = start
+            for i, platform in zip(range(start, total), platform_plan):
+                job = {"title": f"Software Engineer {i+1}", "company": f"Company {i+1}", "platform": platform}
+                eligible = eligibility.apply([job])
+                if session:
+                    session["eligibility"] = eligibility.get_stats()
+                if not eligible:
+                    continue
+                if session:
+                    remaining = Counter(platform_plan[i - start:])
+                    session["projected_completion_at"] = datetime.fromtimestamp(
+                        time.time() + self.application_scheduler.projected_seconds(remaining)).isoformat()
+
+                # Simulate job application, pacing submissions to the platform's limits and
+                # sharing capacity fairly with other users' sessions once the platform is ready
+                async with self.application_scheduler.slot(platform, lambda: self.scheduler.slot(user_id)):
+                    await asyncio.sleep(2)  # Simulate processing time
+
+                # Create application record
+                app_id = str(len(self.applications) + 1)
+                application_data = {
+                    "id": app_id,
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "job_title": job["title"],
+                    "company": job["company"],
+                    "platform": platform,
+                    "status": "applied" if i % 3 != 0 else "failed",
+                    "created_at": datetime.now().isoformat()
+                }
+                self.applications.append(application_data)
+
+                # Update session
+                sent += 1
+                if session:
+                    session["jobs_found"] = i + 1
+                    session["applications_sent"] = sent
+                    session["last_activity"] = datetime.now().isoformat()
+                    self.publish(session)
+
+                # Persist progress and renew the lease; raises TaskCancelled once stopped
+                if context is not None:
+                    await context.heartbeat({
+                        "applications_sent": sent,
+                        "jobs_found": session["jobs_found"] if session else i + 1
+                    })
+
+            # Complete session
+            if session:
+                session["status"] = "completed"
+                session["completed_at"] = datetime.now().isoformat()
+                self.publish(session)
+
+        except TaskCancelled:
+            if session:
+                session["status"] = "stopped"
+                session["last_activity"] = datetime.now().isoformat()
+                self.publish(session)
+            raise
+        except Exception as e:
+            # Update session with error
+            if session:
+                session["status"] = "failed"
+                session["error"] = str(e)
+                session["last_activity"] = datetime.now().isoformat()
+                self.publish(session)
+            # Let the queue retry with backoff
+            if context is not None:
+                raise
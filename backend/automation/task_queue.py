@@ -0,0 +1,410 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import functools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+
+# The queue file lives next to the backend package unless a path is given
+DEFAULT_QUEUE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation_tasks.db")
+
+class TaskStatus:
+    QUEUED = "queued"
+    LEASED = "leased"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class TaskCancelled(Exception):
+    """Raised inside a handler when its task has been cancelled"""
+
+class LeaseLost(Exception):
+    """Raised inside a handler when another worker has taken over its task"""
+
+class TaskQueue:
+    """
+    Durable SQLite-backed task queue
+    - Workers lease the highest-priority runnable task; a lease expires unless renewed
+    - Expired leases are picked up again, so tasks in flight survive a crash or restart
+    - Failures are retried with exponential backoff up to max_attempts; a task whose
+      lease expires on its last attempt (it keeps killing its worker) is failed instead
+    - Cancellation is immediate for queued tasks and cooperative for leased ones
+    - Methods are blocking; async callers go through run(), which uses the queue's
+      own thread so sqlite never runs on the event loop
+    """
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_DB, lease_seconds: int = 60,
+                 max_attempts: int = 3, backoff_seconds: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-queue")
+        self.listeners: List[Callable[[], None]] = []  # told when tasks become runnable
+
+        self.connection = sqlite3.connect(db_path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_runnable ON tasks (status, priority DESC, available_at)"
+        )
+
+    async def run(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call a queue method on the queue's thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(method, *args, **kwargs))
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Call listener (from any thread) whenever this process makes a task runnable"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _notify(self, count: int = 1):
+        for listener in list(self.listeners):
+            for _ in range(count):
+                listener()
+
+    def _row_to_task(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        task = dict(row)
+        for key in ("payload", "progress", "result"):
+            task[key] = json.loads(task[key]) if task[key] else None
+        task["cancel_requested"] = bool(task["cancel_requested"])
+        return task
+
+    def enqueue(self, kind: str, payload: Dict, task_id: Optional[str] = None, priority: int = 0,
+                max_attempts: Optional[int] = None) -> str:
+        """Add a task; higher priority runs first"""
+        task_id = task_id or uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO tasks (id, kind, payload, priority, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(payload, default=str), priority, TaskStatus.QUEUED,
+                 max_attempts or self.max_attempts, now, now, now)
+            )
+        self._notify()
+        return task_id
+
+    def lease(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Claim the next runnable task (queued and due, or leased with an expired lease)"""
+        now = time.time()
+        kind_filter = ""
+        params: List[Any] = [TaskStatus.QUEUED, now, TaskStatus.LEASED, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        runnable = ("((status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?))"
+                    f"{kind_filter}")
+        with self.lock:
+            # A plain read first, so idle workers do not contend for the write lock
+            if self.connection.execute(f"SELECT 1 FROM tasks WHERE {runnable} LIMIT 1", params).fetchone() is None:
+                return None
+
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted_leases(now)
+                row = self.connection.execute(
+                    f"SELECT id FROM tasks WHERE {runnable} ORDER BY priority DESC, available_at LIMIT 1",
+                    params
+                ).fetchone()
+                if row is None:
+                    self.connection.execute("COMMIT")
+                    return None
+
+                self.connection.execute(
+                    "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (TaskStatus.LEASED, worker_id, now + self.lease_seconds, now, row["id"])
+                )
+                task = self._row_to_task(self.connection.execute("SELECT * FROM tasks WHERE id = ?", (row["id"],)).fetchone())
+                self.connection.execute("COMMIT")
+                return task
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def _fail_exhausted_leases(self, now: float) -> int:
+        """Fail tasks whose lease expired on their last attempt; call with the lock held"""
+        cursor = self.connection.execute(
+            "UPDATE tasks SET status = ?, error = 'Lease expired on attempt ' || attempts || ' of ' || max_attempts, "
+            "lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+            "WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+            (TaskStatus.FAILED, now, TaskStatus.LEASED, now)
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"Failed {cursor.rowcount} tasks whose lease expired on their last attempt")
+        return cursor.rowcount
+
+    def heartbeat(self, task_id: str, worker_id: str, progress: Optional[Dict] = None) -> Dict[str, bool]:
+        """Renew a lease and persist progress; reports whether the lease is still held and if cancel was asked"""
+        now = time.time()
+        with self.lock:
+            if progress is not None:
+                cursor = self.connection.execute(
+                    "UPDATE tasks SET lease_expires_at = ?, progress = ?, updated_at = ? "
+                    "WHERE id = ? AND lease_owner = ? AND status = ?",
+                    (now + self.lease_seconds, json.dumps(progress, default=str), now, task_id, worker_id, TaskStatus.LEASED)
+                )
+            else:
+                cursor = self.connection.execute(
+                    "UPDATE tasks SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                    (now + self.lease_seconds, now, task_id, worker_id, TaskStatus.LEASED)
+                )
+            row = self.connection.execute("SELECT cancel_requested FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return {
+            "held": cursor.rowcount == 1,
+            "cancel_requested": bool(row and row["cancel_requested"])
+        }
+
+    def _finish(self, task_id: str, worker_id: str, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, now,
+                 task_id, worker_id, TaskStatus.LEASED)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result: Any = None) -> bool:
+        return self._finish(task_id, worker_id, TaskStatus.COMPLETED, result=result)
+
+    def mark_cancelled(self, task_id: str, worker_id: str) -> bool:
+        return self._finish(task_id, worker_id, TaskStatus.CANCELLED)
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt; requeue with exponential backoff while attempts remain"""
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND lease_owner = ? AND status = ?",
+                (task_id, worker_id, TaskStatus.LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+
+            if row["attempts"] < row["max_attempts"]:
+                delay = self.backoff_seconds * (2 ** (row["attempts"] - 1))
+                self.connection.execute(
+                    "UPDATE tasks SET status = ?, available_at = ?, error = ?, lease_owner = NULL, "
+                    "lease_expires_at = NULL, updated_at = ? WHERE id = ?",
+                    (TaskStatus.QUEUED, now + delay, error, now, task_id)
+                )
+            else:
+                self.connection.execute(
+                    "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                    "updated_at = ? WHERE id = ?",
+                    (TaskStatus.FAILED, error, now, task_id)
+                )
+        return True
+
+    def cancel(self, task_id: str) -> Optional[str]:
+        """Cancel a task; returns its resulting status, or None if it does not exist"""
+        now = time.time()
+        with self.lock:
+            # Queued tasks never start; leased ones are told at their next heartbeat
+            self.connection.execute(
+                "UPDATE tasks SET status = ?, cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (TaskStatus.CANCELLED, now, task_id, TaskStatus.QUEUED)
+            )
+            self.connection.execute(
+                "UPDATE tasks SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, task_id, TaskStatus.LEASED)
+            )
+            row = self.connection.execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row["status"] if row else None
+
+    def recover_expired_leases(self) -> int:
+        """Requeue tasks whose worker died, e.g. on startup after a crash"""
+        now = time.time()
+        with self.lock:
+            self._fail_exhausted_leases(now)
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires_at = NULL, available_at = ?, "
+                "updated_at = ? WHERE status = ? AND lease_expires_at < ?",
+                (TaskStatus.QUEUED, now, now, TaskStatus.LEASED, now)
+            )
+        if cursor.rowcount:
+            self.logger.info(f"Recovered {cursor.rowcount} tasks with expired leases")
+            self._notify(cursor.rowcount)
+        return cursor.rowcount
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self._row_to_task(self.connection.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone())
+
+    def stats(self) -> Dict[str, int]:
+        """Task counts by status"""
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+class TaskContext:
+    """Handed to a task handler: persists progress, renews the lease and surfaces cancellation"""
+
+    def __init__(self, queue: TaskQueue, task: Dict[str, Any], worker_id: str):
+        self.queue = queue
+        self.task = task
+        self.worker_id = worker_id
+
+    @property
+    def progress(self) -> Dict:
+        """Progress saved by a previous attempt, so recovered tasks can resume"""
+        return self.task.get("progress") or {}
+
+    async def heartbeat(self, progress: Optional[Dict] = None):
+        state = await self.queue.run(self.queue.heartbeat, self.task["id"], self.worker_id, progress)
+        if progress is not None:
+            self.task["progress"] = progress
+        if not state["held"]:
+            raise LeaseLost(self.task["id"])
+        if state["cancel_requested"]:
+            raise TaskCancelled(self.task["id"])
+
+TaskHandler = Callable[[Dict[str, Any], TaskContext], Awaitable[Any]]
+
+class WorkerPool:
+    """
+    Runs leased tasks with a fixed number of concurrent workers
+    - Each worker loops lease -> handler -> complete/fail/cancel
+    - A background renewal keeps leases alive for handlers between heartbeats
+    - Idle workers back off from poll_interval to max_poll_interval; a task
+      enqueued in this process wakes one of them at once, while tasks from other
+      processes are found by the backed-off polls
+    """
+
+    def __init__(self, queue: TaskQueue, handlers: Dict[str, TaskHandler], concurrency: int = 2,
+                 poll_interval: float = 1.0, max_poll_interval: float = 5.0, name: str = "worker"):
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(poll_interval, max_poll_interval)
+        self.name = f"{name}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.workers: List[asyncio.Task] = []
+        self.idle: deque = deque()  # futures of workers waiting for work
+        self.pending_wakes = 0  # wakes that found no idle worker; the next to idle retries at once
+        self.listener: Optional[Callable[[], None]] = None
+
+    def _wake_one(self):
+        while self.idle:
+            waiter = self.idle.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.pending_wakes = min(self.pending_wakes + 1, self.concurrency)
+
+    def start(self):
+        if self.workers:
+            return
+        loop = asyncio.get_running_loop()
+        self.listener = lambda: loop.call_soon_threadsafe(self._wake_one)
+        self.queue.add_listener(self.listener)
+        for index in range(self.concurrency):
+            self.workers.append(asyncio.create_task(self._work(f"{self.name}-{index}")))
+        self.logger.info(f"Started {self.concurrency} task workers")
+
+    async def stop(self):
+        """Stop workers; their leases expire and the tasks are picked up again later"""
+        if self.listener is not None:
+            self.queue.remove_listener(self.listener)
+            self.listener = None
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def _wait_for_work(self, timeout: float) -> bool:
+        """Sleep until woken by an enqueue or timeout passes; True when woken"""
+        if self.pending_wakes:
+            self.pending_wakes -= 1
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self.idle.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _work(self, worker_id: str):
+        kinds = list(self.handlers)
+        idle_interval = self.poll_interval
+        while True:
+            try:
+                task = await self.queue.run(self.queue.lease, worker_id, kinds)
+                if task is None:
+                    if await self._wait_for_work(idle_interval):
+                        idle_interval = self.poll_interval
+                    else:
+                        idle_interval = min(idle_interval * 2, self.max_poll_interval)
+                    continue
+                idle_interval = self.poll_interval
+                await self._run(task, worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Task worker {worker_id} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, task: Dict[str, Any], worker_id: str):
+        context = TaskContext(self.queue, task, worker_id)
+        renewer = asyncio.create_task(self._renew(context))
+        try:
+            result = await self.handlers[task["kind"]](task, context)
+            await self.queue.run(self.queue.complete, task["id"], worker_id, result)
+        except TaskCancelled:
+            await self.queue.run(self.queue.mark_cancelled, task["id"], worker_id)
+        except LeaseLost:
+            self.logger.warning(f"Lost lease on task {task['id']}")
+        except asyncio.CancelledError:
+            # Shutting down: leave the lease to expire so the task is recovered
+            raise
+        except Exception as e:
+            self.logger.error(f"Task {task['id']} failed (attempt {task['attempts']}): {e}")
+            await self.queue.run(self.queue.fail, task["id"], worker_id, str(e))
+        finally:
+            renewer.cancel()
+
+    async def _renew(self, context: TaskContext):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            await self.queue.run(self.queue.heartbeat, context.task["id"], context.worker_id)
@@ -0,0 +1,255 @@
+import re
+import time
+import asyncio
+import functools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Callable, Awaitable
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+
+try:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from automation.browser_pool import BrowserPool, get_browser_pool
+    BROWSER_AVAILABLE = True
+except ImportError:
+    BROWSER_AVAILABLE = False
+    print("Browser fetch tier not available - install selenium and webdriver-manager")
+
+# Markers of a client-side rendered shell: the listings only appear once scripts run
+DEFAULT_PLACEHOLDERS = [
+    "Please enable JavaScript",
+    "You need to enable JavaScript",
+    "enable JavaScript to run this app",
+    "id=\"__next\"></div>",
+    "id=\"root\"></div>"
+]
+
+# HTTP statuses a real browser usually gets past (JavaScript challenges, bot walls)
+ESCALATE_STATUSES = {403, 503}
+
+@dataclass
+class FetchResult:
+    url: str
+    html: str
+    tier: str  # "http" or "browser"
+    seconds: float
+
+class PatternDecision:
+    """What the fetcher has learned about one URL pattern"""
+
+    def __init__(self):
+        self.tier = "http"
+        self.decided_at = 0.0
+        self.http_fetches = 0
+        self.browser_fetches = 0
+        self.escalations = 0
+        self.browser_seconds = 0.0
+        self.jobs = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tier": self.tier,
+            "http_fetches": self.http_fetches,
+            "browser_fetches": self.browser_fetches,
+            "escalations": self.escalations,
+            "browser_seconds": round(self.browser_seconds, 2),
+            "jobs": self.jobs,
+            "browser_seconds_per_job": round(self.browser_seconds / self.jobs, 3) if self.jobs else None
+        }
+
+def url_pattern(url: str) -> str:
+    """
+    Host and path with ids collapsed, ignoring the query string, so every
+    search on a site shares one decision (www.indeed.com/jobs, .../view/{id})
+    """
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split("/"):
+        if re.fullmatch(r"[0-9]+|[0-9a-f]{8,}|[A-Za-z0-9_-]*\d[A-Za-z0-9_-]{7,}", segment):
+            segment = "{id}"
+        segments.append(segment)
+    return f"{parsed.netloc.lower()}{'/'.join(segments).rstrip('/')}"
+
+def needs_rendering(html: str, container_selector: str, placeholders: List[str]) -> bool:
+    """True when the job containers are empty (skeletons) or the page is a known script shell"""
+    soup = BeautifulSoup(html, "html.parser")
+    containers = soup.select(container_selector)
+    if containers:
+        return not any(container.get_text(strip=True) for container in containers)
+    # No containers at all is usually an empty result page; a browser only helps for a script shell
+    return any(marker in html for marker in placeholders)
+
+class TieredFetcher:
+    """
+    Fetches listing pages over plain HTTP first and escalates to a pooled
+    headless browser only when the page is rendered client-side
+    - A page needs the browser when none of its job containers has text
+      (missing, skeleton placeholders) or it is a known script shell
+    - The decision is remembered per URL pattern, so later pages of a site that
+      needs rendering go straight to the browser and the rest never touch one
+    - Browser decisions are re-probed over HTTP after reprobe_seconds, in case
+      the site starts serving listings server-side again
+    - When no browser frees up within acquire_timeout the HTTP page is returned
+      as is, so a busy pool slows a search down rather than stalling it
+    - Pages are memoized for the fetcher's lifetime (one search batch), so
+      queries that resolve to the same URL share a single fetch
+    """
+
+    def __init__(self, session: Any, pool: Optional['BrowserPool'] = None, reprobe_seconds: int = 6 * 3600,
+                 render_timeout: float = 10.0, acquire_timeout: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.session = session
+        self.pool = pool
+        self.reprobe_seconds = reprobe_seconds
+        self.render_timeout = render_timeout
+        self.acquire_timeout = acquire_timeout
+        self.decisions = get_fetch_decisions()
+        self._pages: Dict[str, asyncio.Future] = {}
+        self.page_hits = 0
+
+    async def _memoized(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        page = self._pages.get(key)
+        if page is None:
+            page = self._pages[key] = asyncio.ensure_future(fetch())
+        else:
+            self.page_hits += 1
+        # Shielded so one cancelled caller does not cancel the fetch others wait on
+        return await asyncio.shield(page)
+
+    async def fetch(self, url: str, container_selector: str, platform: Optional[str] = None,
+                    placeholders: Optional[List[str]] = None) -> Optional[FetchResult]:
+        """Page HTML from the cheapest tier that yields job containers, or None"""
+        return await self._memoized(url, lambda: self._fetch_tiered(url, container_selector, platform, placeholders))
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Plain HTTP page body, or None; for pages that are never rendered"""
+        async def fetch():
+            html, _ = await self._fetch_http(url)
+            return html
+        return await self._memoized(f"text:{url}", fetch)
+
+    async def _fetch_tiered(self, url: str, container_selector: str, platform: Optional[str],
+                            placeholders: Optional[List[str]]) -> Optional[FetchResult]:
+        placeholders = DEFAULT_PLACEHOLDERS if placeholders is None else placeholders
+        pattern = url_pattern(url)
+        decision = self.decisions.get(pattern)
+
+        reprobe = decision.tier == "browser" and time.time() - decision.decided_at > self.reprobe_seconds
+        html = None
+        if decision.tier == "http" or reprobe or not BROWSER_AVAILABLE:
+            started = time.monotonic()
+            html, status = await self._fetch_http(url)
+            decision.http_fetches += 1
+            if html is not None and not needs_rendering(html, container_selector, placeholders):
+                if decision.tier != "http":
+                    self.logger.info(f"{pattern} serves listings over HTTP again")
+                    self.decisions.decide(pattern, "http")
+                return FetchResult(url, html, "http", time.monotonic() - started)
+            if html is None and status not in ESCALATE_STATUSES:
+                return None  # network error or rate limit; a browser would not help
+            if not BROWSER_AVAILABLE:
+                return FetchResult(url, html, "http", time.monotonic() - started) if html is not None else None
+
+            if decision.tier == "http":
+                self.logger.info(f"Escalating {pattern} to the browser tier")
+            decision.escalations += 1
+            self.decisions.decide(pattern, "browser")
+
+        return await self._fetch_browser(url, container_selector, platform, decision, html)
+
+    async def _fetch_http(self, url: str):
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    return None, response.status
+                return await response.text(), response.status
+        except Exception as e:
+            self.logger.error(f"HTTP fetch failed for {url}: {e}")
+            return None, None
+
+    async def _fetch_browser(self, url: str, container_selector: str, platform: Optional[str],
+                             decision: PatternDecision, http_html: Optional[str] = None) -> Optional[FetchResult]:
+        loop = asyncio.get_running_loop()
+        pool = self.pool or await loop.run_in_executor(None, get_browser_pool)
+        try:
+            # No user_id: scraping always gets a reset context, never a logged-in one
+            browser = await loop.run_in_executor(None, functools.partial(pool.acquire, platform,
+                                                                         timeout=self.acquire_timeout))
+        except (TimeoutError, RuntimeError) as e:
+            self.logger.warning(f"No browser for {url} ({e}); using the HTTP page instead")
+            started = time.monotonic()
+            if http_html is None:
+                http_html, _ = await self._fetch_http(url)
+                decision.http_fetches += 1
+            return FetchResult(url, http_html, "http", time.monotonic() - started) if http_html is not None else None
+        # Browser-seconds count from the lease, not the wait for a free browser
+        started = time.monotonic()
+        healthy = True
+        try:
+            driver = browser.async_driver
+            await driver.get(url)
+            try:
+                await driver.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, container_selector)),
+                                      self.render_timeout)
+            except Exception:
+                self.logger.warning(f"No job containers rendered for {url} within {self.render_timeout}s")
+            html = await driver.run(lambda: browser.driver.page_source)
+            return FetchResult(url, html, "browser", time.monotonic() - started)
+        except Exception as e:
+            healthy = False
+            self.logger.error(f"Browser fetch failed for {url}: {e}")
+            return None
+        finally:
+            decision.browser_fetches += 1
+            decision.browser_seconds += time.monotonic() - started
+            await loop.run_in_executor(None, pool.release, browser, healthy)
+
+    def record_jobs(self, result: Optional[FetchResult], count: int):
+        """Count jobs parsed from a fetched page, for browser-seconds per job"""
+        if result is not None:
+            self.decisions.get(url_pattern(result.url)).jobs += count
+
+class FetchDecisions:
+    """Per-pattern tier decisions and costs, shared by every fetcher in the process"""
+
+    def __init__(self):
+        self.patterns: Dict[str, PatternDecision] = {}
+        self.lock = threading.Lock()
+
+    def get(self, pattern: str) -> PatternDecision:
+        with self.lock:
+            decision = self.patterns.get(pattern)
+            if decision is None:
+                decision = self.patterns[pattern] = PatternDecision()
+            return decision
+
+    def decide(self, pattern: str, tier: str):
+        decision = self.get(pattern)
+        decision.tier = tier
+        decision.decided_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            patterns = {pattern: decision.to_dict() for pattern, decision in self.patterns.items()}
+        browser_seconds = sum(p["browser_seconds"] for p in patterns.values())
+        jobs = sum(p["jobs"] for p in patterns.values())
+        return {
+            "http_fetches": sum(p["http_fetches"] for p in patterns.values()),
+            "browser_fetches": sum(p["browser_fetches"] for p in patterns.values()),
+            "browser_seconds_per_job": round(browser_seconds / jobs, 3) if jobs else None,
+            "patterns": patterns
+        }
+
+_shared_decisions: Optional[FetchDecisions] = None
+_shared_decisions_lock = threading.Lock()
+
+def get_fetch_decisions() -> FetchDecisions:
+    """Process-wide tier decisions"""
+    global _shared_decisions
+    with _shared_decisions_lock:
+        if _shared_decisions is None:
+            _shared_decisions = FetchDecisions()
+        return _shared_decisions
@@ -0,0 +1,47 @@
+import os
+import asyncio
+import logging
+import argparse
+from automation.task_queue import TaskQueue, WorkerPool, DEFAULT_QUEUE_DB
+from automation.job_automation import JobAutomationEngine
+from automation.fair_scheduler import FairScheduler
+from automation.application_scheduler import ApplicationScheduler
+from automation.session_runner import AutomationSessionRunner
+from notifications.notification_system import notification_system
+from notifications.broker import SQLiteBroker
+
+async def run_worker(db_path: str = DEFAULT_QUEUE_DB, concurrency: int = 16, slots: int = 4,
+                     slots_per_user: int = 2):
+    """Run automation sessions from the shared queue, independently of the API process"""
+    # Progress reaches websockets on the API workers through the shared broker file
+    broker_db = os.getenv("NOTIFICATION_BROKER_DB")
+    if broker_db:
+        notification_system.set_broker(SQLiteBroker(broker_db))
+
+    task_queue = TaskQueue(db_path)
+    scheduler = FairScheduler(capacity=slots, per_tenant_limit=slots_per_user)
+    application_scheduler = ApplicationScheduler()
+    engine = JobAutomationEngine(task_queue=task_queue, scheduler=scheduler,
+                                 application_scheduler=application_scheduler)
+    runner = AutomationSessionRunner(application_scheduler, scheduler)
+    pool = WorkerPool(task_queue, {**runner.task_handlers(), **engine.task_handlers()},
+                      concurrency=concurrency, name="automation-worker")
+
+    await task_queue.run(task_queue.recover_expired_leases)
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+
+if __name__ == "__main__":
+    # Run from backend/: python -m automation.worker --concurrency 4
+    parser = argparse.ArgumentParser(description="Automation session worker")
+    parser.add_argument("--db", default=DEFAULT_QUEUE_DB, help="Task queue database file")
+    parser.add_argument("--concurrency", type=int, default=16, help="Sessions held at the same time")
+    parser.add_argument("--slots", type=int, default=4, help="Applications in flight, shared fairly across users")
+    parser.add_argument("--slots-per-user", type=int, default=2, help="Applications one user holds at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(args.db, args.concurrency, args.slots, args.slots_per_user))
@@ -1,15 +1,28 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, FileResponse, StreamingResponse
 from pydantic import BaseModel
 from passlib.context import CryptContext
 import uvicorn
 import json
 import os
+import time
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import asyncio
+import uuid
 from automation.job_automation import JobAutomationEngine
+from automation.task_queue import TaskQueue, WorkerPool
+from automation.session_runner import AutomationSessionRunner, AUTOMATION_SESSION_TASK, publish_automation_progress
+from automation.fair_scheduler import FairScheduler
+from automation.application_scheduler import ApplicationScheduler
+from automation.form_plans import get_form_plan_cache
+from automation.tiered_fetcher import get_fetch_decisions
 from notifications.notification_system import notification_system
+from notifications.broker import SQLiteBroker
+from ai_services.artifact_cache import ArtifactCache, content_hash, parse_range_header
+from ai_services.job_matcher import JobMatcher
+from ai_services.recommendations import RecommendationMaterializer
 
 # Initialize password context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -24,8 +37,48 @@ automation_sessions_db = []
 
 app = FastAPI(title="AutoJobApply API", version="1.0.0")
 
+# Automation sessions are persisted in a task queue and run by a worker pool, so they
+# survive restarts and do not run inside request handling. Workers only hold sessions;
+# each application then waits for a fair-share slot, so AUTOMATION_SLOTS bounds the
+# actual work and large sessions cannot starve small ones. With AUTOMATION_IN_PROCESS=0
+# the API only enqueues and standalone workers (python -m automation.worker) run sessions
+AUTOMATION_IN_PROCESS = os.getenv("AUTOMATION_IN_PROCESS", "1") != "0"
+AUTOMATION_WORKERS = int(os.getenv("AUTOMATION_WORKERS", "16"))
+# Session status shown for a task another process is running
+QUEUED_SESSION_STATUS = {"leased": "running", "completed": "completed", "failed": "failed", "cancelled": "stopped"}
+AUTOMATION_SLOTS = int(os.getenv("AUTOMATION_SLOTS", "4"))
+AUTOMATION_SLOTS_PER_USER = int(os.getenv("AUTOMATION_SLOTS_PER_USER", "2"))
+task_queue = TaskQueue()
+automation_scheduler = FairScheduler(capacity=AUTOMATION_SLOTS, per_tenant_limit=AUTOMATION_SLOTS_PER_USER)
+# Per-platform submission rates and concurrency, shared by every session and user
+application_scheduler = ApplicationScheduler()
+
 # Initialize automation engine
-automation_engine = JobAutomationEngine()
+automation_engine = JobAutomationEngine(task_queue=task_queue, scheduler=automation_scheduler,
+                                        application_scheduler=application_scheduler)
+session_runner = AutomationSessionRunner(application_scheduler, automation_scheduler,
+                                         automation_sessions_db, applications_db)
+worker_pool = WorkerPool(task_queue, {
+    **session_runner.task_handlers(),
+    **automation_engine.task_handlers()
+}, concurrency=AUTOMATION_WORKERS, name="automation")
+
+# Generated resume / cover letter PDFs, keyed by (resume hash, job hash, template/style)
+artifact_cache = ArtifactCache()
+
+# Ranked job lists per user, updated as searches ingest jobs and profiles change, so the
+# dashboard reads a stored list; a user's live search re-runs in the background at most
+# every RECOMMENDATION_REFRESH_SECONDS
+RECOMMENDATION_REFRESH_SECONDS = int(os.getenv("RECOMMENDATION_REFRESH_SECONDS", "1800"))
+recommendations = RecommendationMaterializer()
+recommendation_searches: Dict[str, float] = {}  # user_id -> when their live search last ran
+recommendation_refreshes: Dict[str, asyncio.Task] = {}
+
+# With several API workers, point them at one broker file so notifications reach
+# websockets connected to any worker
+NOTIFICATION_BROKER_DB = os.getenv("NOTIFICATION_BROKER_DB")
+if NOTIFICATION_BROKER_DB:
+    notification_system.set_broker(SQLiteBroker(NOTIFICATION_BROKER_DB))
 
 # CORS middleware
 app.add_middleware(
@@ -72,6 +125,7 @@ class AutomationRequest(BaseModel):
     user_id: str
     platforms: List[str] = ["linkedin", "indeed"]
     max_applications: Optional[int] = 50
+    priority: Optional[int] = 0  # higher runs first when workers are busy
 
 class UserProfile(BaseModel):
     user_id: str
@@ -136,6 +190,22 @@ class UserProfile(BaseModel):
     remote_work_preference: Optional[str] = "hybrid"  # remote, hybrid, onsite
     commute_distance_max: Optional[int] = 50  # miles
 
+@app.on_event("startup")
+async def start_background_services():
+    # Drains notification expiries on a short tick
+    await notification_system.start_cleanup_task()
+    notification_system.start_broker()
+    # Sessions whose worker died are picked up again
+    await task_queue.run(task_queue.recover_expired_leases)
+    if AUTOMATION_IN_PROCESS:
+        worker_pool.start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    notification_system.stop_broker()
+    if AUTOMATION_IN_PROCESS:
+        await worker_pool.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "AutoJobApply API is running!", "status": "healthy"}
@@ -239,6 +309,7 @@ async def upload_resume(
 @app.post("/set-job-preferences")
 async def set_job_preferences(preference: JobPreference):
     try:
+        previous = next((p for p in preferences_db if p["user_id"] == preference.user_id), None)
         # Remove existing preferences for user
         preferences_db[:] = [p for p in preferences_db if p["user_id"] != preference.user_id]
         
@@ -257,6 +328,11 @@ async def set_job_preferences(preference: JobPreference):
             "updated_at": datetime.now().isoformat()
         }
         preferences_db.append(pref_data)
+        await rematerialize_recommendations(preference.user_id)
+        # New titles or locations have never been searched: the next /job-listings searches
+        # them live instead of serving the list built from the old ones
+        if previous is None or (previous["job_titles"], previous["locations"]) != (pref_data["job_titles"], pref_data["locations"]):
+            recommendation_searches.pop(preference.user_id, None)
         
         return {
             "id": pref_id,
@@ -266,7 +342,7 @@ async def set_job_preferences(preference: JobPreference):
         raise HTTPException(status_code=500, detail=f"Failed to save preferences: {str(e)}")
 
 @app.post("/start-automation")
-async def start_automation(automation_request: AutomationRequest, background_tasks: BackgroundTasks):
+async def start_automation(automation_request: AutomationRequest):
     try:
         # Check if user has resume and preferences
         user_resume = next((r for r in resumes_db if r["user_id"] == automation_request.user_id), None)
@@ -279,32 +355,35 @@ async def start_automation(automation_request: AutomationRequest, background_tas
             raise HTTPException(status_code=400, detail="Please set job preferences first")
         
         # Create automation session
-        session_id = str(len(automation_sessions_db) + 1)
+        # Random ids: sessions recovered from the queue must not collide with new ones
+        session_id = uuid.uuid4().hex
         session_data = {
             "id": session_id,
+            "task_id": session_id,
             "user_id": automation_request.user_id,
-            "status": "starting",
+            "status": "queued",
             "platforms": automation_request.platforms,
             "max_applications": automation_request.max_applications,
             "applications_sent": 0,
+            "jobs_found": 0,
             "started_at": datetime.now().isoformat(),
             "last_activity": datetime.now().isoformat()
         }
         automation_sessions_db.append(session_data)
         
-        # Start automation in background
-        background_tasks.add_task(
-            run_automation_background,
-            session_id,
-            automation_request.user_id,
-            user_preferences,
-            user_resume
-        )
+        # Queue the session; a pool worker (here or in a standalone worker) picks it up
+        await task_queue.run(task_queue.enqueue, AUTOMATION_SESSION_TASK, {
+            "session": session_data,
+            "preferences": user_preferences,
+            "resume": user_resume,
+            "profile": next((p for p in user_profiles_db if p["user_id"] == automation_request.user_id), None)
+        }, task_id=session_id, priority=automation_request.priority or 0)
+        publish_automation_progress(session_data)
         
         return {
             "session_id": session_id,
             "message": "Automation started successfully",
-            "status": "running"
+            "status": "queued"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start automation: {str(e)}")
@@ -316,10 +395,61 @@ async def get_automation_status(session_id: str):
         if not session:
             raise HTTPException(status_code=404, detail="Automation session not found")
         
+        task = await task_queue.run(task_queue.get, session.get("task_id", session_id))
+        if task:
+            # A session run by a standalone worker only reports back through the queue
+            if session["status"] == "queued" and task["status"] != "queued":
+                session = {**session, **(task.get("progress") or {}),
+                           "status": QUEUED_SESSION_STATUS.get(task["status"], session["status"])}
+            return {**session, "task": {
+                "status": task["status"],
+                "attempts": task["attempts"],
+                "max_attempts": task["max_attempts"],
+                "error": task["error"]
+            }}
         return session
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get status: {str(e)}")
 
+@app.get("/automation/metrics")
+async def get_automation_metrics():
+    """Scheduler, task queue, form plan cache and page fetch tier metrics"""
+    try:
+        return {
+            "scheduler": automation_scheduler.metrics(),
+            "platforms": application_scheduler.metrics(),
+            "tasks": await task_queue.run(task_queue.stats),
+            "form_plans": get_form_plan_cache().get_stats(),
+            "fetch": get_fetch_decisions().get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get automation metrics: {str(e)}")
+
+@app.post("/stop-automation/{session_id}")
+async def stop_automation(session_id: str):
+    """Cancel a queued session, or ask a running one to stop at its next application"""
+    try:
+        session = next((s for s in automation_sessions_db if s["id"] == session_id), None)
+        task_status = await task_queue.run(task_queue.cancel, session.get("task_id", session_id) if session else session_id)
+        if session is None and task_status is None:
+            # Sessions started through the engine directly
+            result = await task_queue.run(automation_engine.stop_automation, session_id)
+            if result["status"] == "error":
+                raise HTTPException(status_code=404, detail="Automation session not found")
+            return result
+        
+        if session and task_status == "cancelled":
+            session["status"] = "stopped"
+            session["last_activity"] = datetime.now().isoformat()
+            publish_automation_progress(session)
+        return {"session_id": session_id, "status": "stopped" if task_status == "cancelled" else "stopping"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to stop automation: {str(e)}")
+
 @app.get("/user-analytics/{user_id}")
 async def get_user_analytics(user_id: str):
     try:
@@ -333,7 +463,7 @@ async def get_user_analytics(user_id: str):
         failed_applications = len([a for a in user_applications if a["status"] == "failed"])
         
         # Get active automation sessions
-        active_sessions = [s for s in automation_sessions_db if s["user_id"] == user_id and s["status"] in ["running", "starting"]]
+        active_sessions = [s for s in automation_sessions_db if s["user_id"] == user_id and s["status"] in ["running", "starting", "queued"]]
         
         return {
             "total_applications": total_applications,
@@ -377,6 +507,7 @@ async def update_user_profile(profile: UserProfile):
         profile_data = profile.dict()
         profile_data["updated_at"] = datetime.now().isoformat()
         user_profiles_db.append(profile_data)
+        await rematerialize_recommendations(profile.user_id)
         
         return {
             "message": "Profile updated successfully",
@@ -564,6 +695,14 @@ async def mark_all_notifications_read(user_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to mark notifications as read: {str(e)}")
 
+@app.get("/notifications/{user_id}/{notification_id}/details")
+async def get_notification_details(user_id: str, notification_id: str):
+    """Per-application details behind a digest notification"""
+    try:
+        return {"details": notification_system.get_digest_details(user_id, notification_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get notification details: {str(e)}")
+
 @app.delete("/notifications/{user_id}/{notification_id}")
 async def delete_notification(user_id: str, notification_id: str):
     """Delete a specific notification"""
@@ -576,6 +715,56 @@ async def delete_notification(user_id: str, notification_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete notification: {str(e)}")
 
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Event ids are integers; anything else means replay nothing"""
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+@app.websocket("/ws/notifications/{user_id}")
+async def notifications_websocket(websocket: WebSocket, user_id: str, last_event_id: Optional[str] = None):
+    """Push notifications and automation progress; ?last_event_id= resumes after a reconnect"""
+    await websocket.accept()
+    subscription = await notification_system.subscribe_user(user_id, websocket, parse_last_event_id(last_event_id))
+    try:
+        # The writer task does all sending; reading only detects the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if subscription is not None:
+            await notification_system.unsubscribe_user(user_id, websocket)
+
+# Comment lines keep idle SSE connections open through proxies
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.get("/events/{user_id}")
+async def notification_events(user_id: str, request: Request, last_event_id: Optional[str] = None):
+    """Server-Sent Events stream of notifications and automation progress, resumable via Last-Event-ID"""
+    resume_from = parse_last_event_id(request.headers.get("last-event-id") or last_event_id)
+    subscription = notification_system.open_stream(user_id, last_event_id=resume_from)
+    
+    async def event_stream():
+        try:
+            while not subscription.closed:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield f"id: {event.id}\nevent: {event.type}\ndata: {event.payload}\n\n"
+        finally:
+            await notification_system.unsubscribe_user(user_id, subscription)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.post("/enhance-resume")
 async def enhance_resume(request: dict):
     """Enhance resume using AI for specific job"""
@@ -592,11 +781,21 @@ async def enhance_resume(request: dict):
         import base64
         resume_content = base64.b64decode(user_resume["content"]).decode('utf-8')
         
+        # Skip the PDF render entirely when this resume/job pair is already cached
+        artifact_id = artifact_cache.make_key(content_hash(resume_content), content_hash(job_description), "resume")
+        pdf_cached = artifact_cache.exists(artifact_id)
+        
         # Use AI engine to enhance resume
         from ai_services.custom_ai_engine import CustomAIEngine
         ai_engine = CustomAIEngine()
         
-        enhanced_result = ai_engine.enhance_resume_for_job(resume_content, job_description)
+        enhanced_result = ai_engine.enhance_resume_for_job(resume_content, job_description, render_pdf=not pdf_cached)
+        
+        if not pdf_cached and enhanced_result.get("pdf_content"):
+            pdf_cached = artifact_cache.put_base64(artifact_id, enhanced_result["pdf_content"], {
+                "kind": "resume",
+                "filename": "enhanced_resume.pdf"
+            }) is not None
         
         return {
             "success": True,
@@ -604,12 +803,145 @@ async def enhance_resume(request: dict):
             "match_score": enhanced_result.get("match_score", 0.5),
             "improvements": enhanced_result.get("improvements", []),
             "missing_skills": enhanced_result.get("missing_skills", []),
-            "pdf_available": "pdf_content" in enhanced_result
+            "pdf_available": pdf_cached,
+            "artifact_id": artifact_id if pdf_cached else None,
+            "download_url": f"/artifacts/{artifact_id}" if pdf_cached else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to enhance resume: {str(e)}")
 
+@app.post("/enhance-resume/batch")
+async def enhance_resume_batch(request: dict):
+    """Enhance the user's resume against many jobs, streaming one NDJSON line per job as it completes"""
+    try:
+        user_id = request.get("user_id")
+        jobs = request.get("jobs") or [{"description": d} for d in request.get("job_descriptions", [])]
+        render_pdf = request.get("render_pdf", True)
+        
+        if not jobs:
+            raise HTTPException(status_code=400, detail="Provide jobs or job_descriptions")
+        
+        user_resume = next((r for r in resumes_db if r["user_id"] == user_id), None)
+        if not user_resume:
+            raise HTTPException(status_code=400, detail="No resume found. Please upload a resume first.")
+        
+        import base64
+        resume_content = base64.b64decode(user_resume["content"]).decode('utf-8')
+        resume_hash = content_hash(resume_content)
+        
+        descriptions = [job.get("description", "") for job in jobs]
+        artifact_ids = [artifact_cache.make_key(resume_hash, content_hash(d), "resume") for d in descriptions]
+        cached = {i for i, artifact_id in enumerate(artifact_ids) if artifact_cache.exists(artifact_id)}
+        
+        from ai_services.custom_ai_engine import CustomAIEngine, PDF_RENDER_WORKERS
+        ai_engine = CustomAIEngine()
+        # Renders this request may keep in flight on the shared PDF pool
+        pdf_workers = min(int(request.get("pdf_workers", PDF_RENDER_WORKERS)), PDF_RENDER_WORKERS)
+        
+        def stream_results():
+            for result in ai_engine.enhance_resume_for_jobs(resume_content, descriptions, render_pdf=render_pdf,
+                                                            pdf_workers=pdf_workers, skip_pdf=cached):
+                index = result["index"]
+                artifact_id = artifact_ids[index]
+                pdf_available = index in cached
+                if not pdf_available and result.get("pdf_content"):
+                    pdf_available = artifact_cache.put_base64(artifact_id, result["pdf_content"], {
+                        "kind": "resume",
+                        "filename": "enhanced_resume.pdf"
+                    }) is not None
+                
+                yield json.dumps({
+                    "index": index,
+                    "job_id": jobs[index].get("id"),
+                    "enhanced_resume": result.get("enhanced_resume", {}),
+                    "match_score": result.get("match_score", 0.5),
+                    "improvements": result.get("improvements", []),
+                    "missing_skills": result.get("missing_skills", []),
+                    "pdf_available": pdf_available,
+                    "artifact_id": artifact_id if pdf_available else None,
+                    "download_url": f"/artifacts/{artifact_id}" if pdf_available else None
+                }) + "\n"
+        
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to enhance resumes: {str(e)}")
+
+@app.post("/enhance-resume/variants")
+async def enhance_resume_variants(request: dict):
+    """Cluster jobs by skill profile and tailor one resume variant per cluster"""
+    try:
+        user_id = request.get("user_id")
+        jobs = request.get("jobs", [])
+        similarity_threshold = float(request.get("similarity_threshold", 0.6))
+        
+        if not jobs:
+            raise HTTPException(status_code=400, detail="Provide at least one job")
+        
+        user_resume = next((r for r in resumes_db if r["user_id"] == user_id), None)
+        if not user_resume:
+            raise HTTPException(status_code=400, detail="No resume found. Please upload a resume first.")
+        
+        import base64
+        resume_content = base64.b64decode(user_resume["content"]).decode('utf-8')
+        
+        from ai_services.resume_variants import ResumeVariantPlanner
+        planner = ResumeVariantPlanner(similarity_threshold=similarity_threshold)
+        plan = await asyncio.to_thread(planner.build_variants, resume_content, jobs, False)
+        
+        # Variants are keyed by their content, so only the ones not cached yet are rendered
+        resume_hash = content_hash(resume_content)
+        artifact_ids = [artifact_cache.make_key(resume_hash, content_hash(variant["enhanced_resume"]), "resume:variant")
+                        for variant in plan["variants"]]
+        cached = [artifact_cache.exists(artifact_id) for artifact_id in artifact_ids]
+        
+        def render_missing():
+            for variant, artifact_id, is_cached in zip(plan["variants"], artifact_ids, cached):
+                if not is_cached:
+                    pdf_content = planner.ai_engine.generate_resume_pdf(variant["enhanced_resume"])
+                    variant["pdf_available"] = artifact_cache.put_base64(
+                        artifact_id, pdf_content, {"kind": "resume", "filename": "enhanced_resume.pdf"}
+                    ) is not None
+        await asyncio.to_thread(render_missing)
+        
+        variants = []
+        for variant, artifact_id, is_cached in zip(plan["variants"], artifact_ids, cached):
+            pdf_available = is_cached or variant.get("pdf_available", False)
+            variants.append({
+                "cluster_id": variant["cluster_id"],
+                "skills": variant["skills"],
+                "job_indices": variant["job_indices"],
+                "job_ids": [jobs[i].get("id", i) for i in variant["job_indices"]],
+                "enhanced_resume": variant["enhanced_resume"],
+                "missing_skills": variant["missing_skills"],
+                "artifact_id": artifact_id if pdf_available else None,
+                "download_url": f"/artifacts/{artifact_id}" if pdf_available else None
+            })
+        
+        return {
+            "success": True,
+            "similarity_threshold": similarity_threshold,
+            "total_jobs": len(jobs),
+            "total_variants": len(variants),
+            "variants": variants,
+            # One entry per requested job, in order; job ids may repeat or be missing
+            "job_variants": [
+                {"index": i, "job_id": job.get("id"), "cluster_id": plan["job_variants"][i],
+                 "match_score": plan["match_scores"][i]}
+                for i, job in enumerate(jobs)
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to build resume variants: {str(e)}")
+
 @app.post("/generate-cover-letter")
 async def generate_cover_letter(request: dict):
     """Generate personalized cover letter using AI"""
@@ -628,7 +960,7 @@ async def generate_cover_letter(request: dict):
             raise HTTPException(status_code=400, detail="No resume found. Please upload a resume first.")
         
         # Use AI engine to generate cover letter
-        from ai_services.custom_ai_engine import CustomAIEngine
+        from ai_services.custom_ai_engine import CustomAIEngine, cover_letter_date
         ai_engine = CustomAIEngine()
         
         # Create enhanced resume data structure
@@ -638,18 +970,119 @@ async def generate_cover_letter(request: dict):
             "summary": f"Experienced professional with {user_profile.get('experience_years', 0)} years in the field."
         }
         
-        cover_letter_result = ai_engine.generate_cover_letter(job_data, user_profile, enhanced_resume)
+        # The PDF header carries the applicant's contact details and the letter is dated, so
+        # both are part of the variant; an immutable artifact never shows a stale date
+        contact_hash = content_hash({k: user_profile.get(k, "") for k in ("full_name", "email", "phone")})
+        letter_date = cover_letter_date()
+        artifact_id = artifact_cache.make_key(
+            content_hash(user_resume["content"]),
+            content_hash(job_data),
+            f"cover_letter:default:{content_hash(enhanced_resume)}:{contact_hash}:{letter_date}"
+        )
+        pdf_cached = artifact_cache.exists(artifact_id)
+        
+        cover_letter_result = ai_engine.generate_cover_letter(job_data, user_profile, enhanced_resume,
+                                                              render_pdf=not pdf_cached, letter_date=letter_date)
+        
+        if not pdf_cached and cover_letter_result.get("pdf_content"):
+            pdf_cached = artifact_cache.put_base64(artifact_id, cover_letter_result["pdf_content"], {
+                "kind": "cover_letter",
+                "filename": "cover_letter.pdf"
+            }) is not None
         
         return {
             "success": True,
             "cover_letter": cover_letter_result.get("cover_letter", ""),
             "personalization_score": cover_letter_result.get("personalization_score", 0.7),
-            "pdf_available": "pdf_content" in cover_letter_result
+            "pdf_available": pdf_cached,
+            "artifact_id": artifact_id if pdf_cached else None,
+            "download_url": f"/artifacts/{artifact_id}" if pdf_cached else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate cover letter: {str(e)}")
 
+@app.post("/generate-cover-letters/batch")
+async def generate_cover_letters_batch(request: dict):
+    """Generate cover letters for many jobs × styles, streamed as a ZIP of PDFs or as NDJSON"""
+    try:
+        user_id = request.get("user_id")
+        jobs = request.get("jobs", [])
+        styles = request.get("styles") or None
+        output_format = request.get("format", "zip")
+        
+        if not jobs:
+            raise HTTPException(status_code=400, detail="Provide at least one job")
+        
+        user_profile = next((p for p in user_profiles_db if p["user_id"] == user_id), None)
+        if not user_profile:
+            raise HTTPException(status_code=400, detail="Please complete your profile first.")
+        
+        from ai_services.cover_letter_generator import CoverLetterGenerator
+        generator = CoverLetterGenerator()
+        
+        if output_format == "zip":
+            letters = generator.generate_cover_letters_batch(jobs, user_profile, styles)
+            return StreamingResponse(
+                generator.stream_cover_letters_zip(letters),
+                media_type="application/zip",
+                headers={"Content-Disposition": 'attachment; filename="cover_letters.zip"'}
+            )
+        
+        letters = generator.generate_cover_letters_batch(jobs, user_profile, styles, render_pdf=False)
+        return StreamingResponse((json.dumps(letter) + "\n" for letter in letters), media_type="application/x-ndjson")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate cover letters: {str(e)}")
+
+@app.get("/artifacts/{artifact_id}")
+async def download_artifact(artifact_id: str, request: Request):
+    """Download a generated PDF with ETag revalidation and byte-range support"""
+    try:
+        metadata = artifact_cache.get_metadata(artifact_id)
+        if not metadata:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        
+        size = metadata["size"]
+        etag = f'"{metadata["sha256"]}"'
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=31536000, immutable",
+            "Content-Disposition": f'inline; filename="{metadata.get("filename", "document.pdf")}"'
+        }
+        
+        # Conditional GET: the client already holds these exact bytes
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (not if_range or if_range.strip() == etag):
+            byte_range = parse_range_header(range_header, size)
+            if byte_range is None:
+                return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+            
+            start, end = byte_range
+            return Response(
+                content=artifact_cache.read_range(artifact_id, start, end),
+                status_code=206,
+                media_type=metadata["content_type"],
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+            )
+        
+        return FileResponse(artifact_cache.get_path(artifact_id), media_type=metadata["content_type"], headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to download artifact: {str(e)}")
+
 @app.get("/api/job-titles")
 async def get_job_titles():
     """Get all available job titles organized by category"""
@@ -761,6 +1194,7 @@ async def search_jobs_comprehensive(search_request: dict):
                     "experience_level": job.experience_level
                 }
                 job_listings.append(job_dict)
+            await asyncio.to_thread(recommendations.ingest, job_listings)
             
             return {
                 "jobs": job_listings,
@@ -849,6 +1283,85 @@ async def view_database():
         ]
     }
 
+def rank_jobs_for_user(user_id: str, job_listings: List[Dict], limit: int) -> List[Dict]:
+    """Score listings against the user's profile and preferences and keep the best first"""
+    profile = next((p for p in user_profiles_db if p["user_id"] == user_id), None)
+    if profile is None:
+        # Without a profile the scrapers' own title-based scores are all we have
+        return sorted(job_listings, key=lambda x: x["match_score"], reverse=True)[:limit]
+    
+    preferences = next((p for p in preferences_db if p["user_id"] == user_id), None)
+    matcher = JobMatcher()
+    matcher.add_jobs(job_listings)
+    ranked = []
+    for job, score in matcher.rank(profile, limit, preferences):
+        job["match_score"] = score
+        ranked.append(job)
+    return ranked
+
+async def rematerialize_recommendations(user_id: str):
+    """Rescore the ingested jobs for one user after their profile or preferences change"""
+    profile = next((p for p in user_profiles_db if p["user_id"] == user_id), None)
+    if profile is None:
+        return  # listings for users without a profile are ranked per request
+    preferences = next((p for p in preferences_db if p["user_id"] == user_id), None)
+    await asyncio.to_thread(recommendations.update_user, user_id, profile, preferences)
+
+async def search_live_jobs(job_titles: List[str], locations: List[str], limit: int) -> List[Dict]:
+    """Run a live scraper search over every title x location and convert the results to listing dicts"""
+    from automation.real_job_scraper import RealJobScraper
+    
+    async with RealJobScraper() as scraper:
+        jobs = await scraper.search_many(job_titles, locations, limit)
+    
+    # Convert to API format
+    job_listings = []
+    for i, job in enumerate(jobs, 1):
+        job_dict = {
+            "id": f"job_{i:04d}",
+            "title": job.title,
+            "company": job.company,
+            "company_url": job.apply_url,
+            "location": job.location,
+            "job_url": job.apply_url,
+            "salary_range": job.salary,
+            "employment_type": job.employment_type,
+            "job_type": "W2",  # Default to W2
+            "remote": job.remote_work,
+            "description": job.description,
+            "requirements": job.skills,
+            "posted_date": job.posted_date,
+            "source": job.source,
+            "can_apply": True,
+            "match_score": job.match_score,
+            "experience_level": job.experience_level
+        }
+        job_listings.append(job_dict)
+    return job_listings
+
+async def refresh_recommendations(user_id: str, job_titles: List[str], locations: List[str], limit: int):
+    """Background live search feeding new jobs into every user's recommendations"""
+    try:
+        recommendation_searches[user_id] = time.time()
+        job_listings = await search_live_jobs(job_titles, locations, limit)
+        await asyncio.to_thread(recommendations.ingest, job_listings)
+    except Exception as e:
+        print(f"Error refreshing recommendations for {user_id}: {e}")
+    finally:
+        recommendation_refreshes.pop(user_id, None)
+
+def job_listings_response(job_listings: List[Dict], job_titles: List[str], locations: List[str]) -> Dict:
+    return {
+        "jobs": job_listings,
+        "total": len(job_listings),
+        "search_params": {
+            "job_title": ", ".join(job_titles),
+            "location": ", ".join(location for location in locations if location) or "All US & Canada",
+            "sources": ["💼 LinkedIn", "💼 Indeed", "🏢 Glassdoor", "🤝 Handshake", "📰 County News"]
+        },
+        "message": f"Found {len(job_listings)} jobs across all major platforms and 3,144+ counties"
+    }
+
 @app.get("/job-listings/{user_id}")
 async def get_job_listings(user_id: str, limit: int = 500, job_title: str = "DevOps Engineer", location: str = ""):
     """Get real job listings from multiple sources (LinkedIn, Indeed, Glassdoor, Handshake, County News)"""
@@ -856,54 +1369,34 @@ async def get_job_listings(user_id: str, limit: int = 500, job_title: str = "Dev
         # Get user preferences
         preferences = next((p for p in preferences_db if p["user_id"] == user_id), None)
         
-        # If user has preferences, use their job titles
+        # If user has preferences, search every preferred title in every preferred location
+        job_titles, locations = [job_title], [location]
         if preferences and preferences.get("job_titles"):
-            job_title = preferences["job_titles"][0]  # Use first preferred job title
+            job_titles = preferences["job_titles"]
         if preferences and preferences.get("locations"):
-            location = preferences["locations"][0]  # Use first preferred location
+            locations = preferences["locations"]
+        
+        # Once the user's own search has run, materialized recommendations are served as
+        # stored; a stale search re-runs in the background and updates the list for their next visit
+        stored = []
+        if user_id in recommendation_searches:
+            stored = await asyncio.to_thread(recommendations.get, user_id, limit)
+        if stored:
+            stale = time.time() - recommendation_searches[user_id] > RECOMMENDATION_REFRESH_SECONDS
+            if stale and user_id not in recommendation_refreshes:
+                recommendation_refreshes[user_id] = asyncio.create_task(
+                    refresh_recommendations(user_id, job_titles, locations, limit))
+            return job_listings_response(stored, job_titles, locations)
         
         # Try to get real job listings from scraper
         try:
-            from automation.real_job_scraper import RealJobScraper
-            
-            async with RealJobScraper() as scraper:
-                jobs = await scraper.search_jobs(job_title, location, limit)
-                
-                # Convert to API format
-                job_listings = []
-                for i, job in enumerate(jobs, 1):
-                    job_dict = {
-                        "id": f"job_{i:04d}",
-                        "title": job.title,
-                        "company": job.company,
-                        "company_url": job.apply_url,
-                        "location": job.location,
-                        "job_url": job.apply_url,
-                        "salary_range": job.salary,
-                        "employment_type": job.employment_type,
-                        "job_type": "W2",  # Default to W2
-                        "remote": job.remote_work,
-                        "description": job.description,
-                        "requirements": job.skills,
-                        "posted_date": job.posted_date,
-                        "source": job.source,
-                        "can_apply": True,
-                        "match_score": job.match_score,
-                        "experience_level": job.experience_level
-                    }
-                    job_listings.append(job_dict)
-                
-                if job_listings:
-                    return {
-                        "jobs": job_listings,
-                        "total": len(job_listings),
-                        "search_params": {
-                            "job_title": job_title,
-                            "location": location or "All US & Canada",
-                            "sources": ["💼 LinkedIn", "💼 Indeed", "🏢 Glassdoor", "🤝 Handshake", "📰 County News"]
-                        },
-                        "message": f"Found {len(job_listings)} jobs across all major platforms and 3,144+ counties"
-                    }
+            job_listings = await search_live_jobs(job_titles, locations, limit)
+            recommendation_searches[user_id] = time.time()
+            await asyncio.to_thread(recommendations.ingest, job_listings)
+            materialized = await asyncio.to_thread(recommendations.get, user_id, limit)
+            job_listings = materialized or rank_jobs_for_user(user_id, job_listings, limit)
+            if job_listings:
+                return job_listings_response(job_listings, job_titles, locations)
         except Exception as e:
             print(f"Error using real job scraper: {e}")
             # Continue to fallback if scraper fails
@@ -1105,11 +1598,8 @@ async def get_job_listings(user_id: str, limit: int = 500, job_title: str = "Dev
                 job_listings = [job for job in job_listings 
                               if any(loc in job["location"].lower() for loc in locations) or job["remote"]]
         
-        # Sort by match score
-        job_listings.sort(key=lambda x: x["match_score"], reverse=True)
-        
-        # Apply limit
-        job_listings = job_listings[:limit]
+        # Rank by match with the user's profile and apply the limit
+        job_listings = rank_jobs_for_user(user_id, job_listings, limit)
         
         return {
             "jobs": job_listings,
@@ -1144,9 +1634,11 @@ async def apply_to_job(job_application: dict):
         import time
         import random
         
-        # Random success/failure for demo
-        success_rate = 0.8  # 80% success rate
-        application_successful = random.random() < success_rate
+        # Submissions are paced per platform together with running automation sessions
+        async with application_scheduler.slot(job_application.get("platform", "default")):
+            # Random success/failure for demo
+            success_rate = 0.8  # 80% success rate
+            application_successful = random.random() < success_rate
         
         if application_successful:
             # Log successful application
@@ -1209,50 +1701,5 @@ async def apply_to_job(job_application: dict):
             await notification_system.notify_error(user_id, f"Application error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to apply to job: {str(e)}")
 
-# Background task for automation
-async def run_automation_background(session_id: str, user_id: str, preferences: Dict, resume: Dict):
-    try:
-        # Update session status
-        session = next((s for s in automation_sessions_db if s["id"] == session_id), None)
-        if session:
-            session["status"] = "running"
-            session["last_activity"] = datetime.now().isoformat()
-        
-        # Simulate automation process
-        for i in range(preferences.get("max_applications", 10)):
-            # Simulate job application
-            await asyncio.sleep(2)  # Simulate processing time
-            
-            # Create application record
-            app_id = str(len(applications_db) + 1)
-            application_data = {
-                "id": app_id,
-                "user_id": user_id,
-                "session_id": session_id,
-                "job_title": f"Software Engineer {i+1}",
-                "company": f"Company {i+1}",
-                "platform": "linkedin",
-                "status": "applied" if i % 3 != 0 else "failed",
-                "created_at": datetime.now().isoformat()
-            }
-            applications_db.append(application_data)
-            
-            # Update session
-            if session:
-                session["applications_sent"] = i + 1
-                session["last_activity"] = datetime.now().isoformat()
-        
-        # Complete session
-        if session:
-            session["status"] = "completed"
-            session["completed_at"] = datetime.now().isoformat()
-            
-    except Exception as e:
-        # Update session with error
-        if session:
-            session["status"] = "failed"
-            session["error"] = str(e)
-            session["last_activity"] = datetime.now().isoformat()
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import logging
+import asyncio
+import threading
+from typing import Dict, Optional, Callable
+
+# Callback receiving (event_id, message) for a message once the broker has numbered it
+DeliverCallback = Callable[[int, Dict], None]
+
+class InProcessBroker:
+    """
+    Default broker: events stay inside this process
+    - publish() only assigns the next event id; the caller delivers locally
+    """
+
+    def __init__(self):
+        self.event_counter = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop, deliver: DeliverCallback, deliver_own: DeliverCallback):
+        pass
+
+    def stop(self):
+        pass
+
+    def publish(self, message: Dict) -> Optional[int]:
+        self.event_counter += 1
+        return self.event_counter
+
+class SQLiteBroker:
+    """
+    Local message bus shared by every process that opens the same SQLite file
+    - publish() queues the message for the broker thread, which appends it as a row
+      off the event loop; the rowid is the event id, so ids agree across workers
+    - The same thread delivers this process's messages once they have an id, and
+      hands rows from other origins to the event loop
+    - Rows older than retention_seconds are pruned as the bus is polled
+    """
+
+    def __init__(self, db_path: str, poll_interval: float = 0.2, retention_seconds: int = 300):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.last_seen_id = 0
+        self.stop_event = threading.Event()
+        self.poller: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.outbox: queue.Queue = queue.Queue()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self.connection = self._connect()
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS notification_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                body TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False, isolation_level=None)
+        # WAL lets the pollers read while another worker appends
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self, loop: asyncio.AbstractEventLoop, deliver: DeliverCallback, deliver_own: DeliverCallback):
+        """
+        Begin delivering messages from other processes published from now on
+        (deliver) and this process's own messages once stored (deliver_own)
+        """
+        if self.poller is not None:
+            return
+        row = self.connection.execute("SELECT MAX(id) FROM notification_events").fetchone()
+        self.last_seen_id = row[0] or 0
+        self.stop_event.clear()
+        self.poller = threading.Thread(target=self._poll, args=(loop, deliver, deliver_own),
+                                       name="notification-broker", daemon=True)
+        self.poller.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.poller is not None:
+            self.poller.join(timeout=self.poll_interval * 5)
+            self.poller = None
+
+    def publish(self, message: Dict) -> Optional[int]:
+        """
+        Queue a message for the bus; None means it is delivered through deliver_own
+        once stored. Before start() the row is written inline and its id returned
+        """
+        if self.poller is not None:
+            self.outbox.put(message)
+            return None
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO notification_events (origin, body, created_at) VALUES (?, ?, ?)",
+                (self.origin, json.dumps(message), time.time())
+            )
+            return cursor.lastrowid
+
+    def _write_outbox(self, connection: sqlite3.Connection, loop: asyncio.AbstractEventLoop,
+                      deliver_own: DeliverCallback, timeout: Optional[float]):
+        """Append every queued message in one transaction, then deliver them locally"""
+        try:
+            messages = [self.outbox.get(timeout=timeout) if timeout else self.outbox.get_nowait()]
+        except queue.Empty:
+            return
+        while True:
+            try:
+                messages.append(self.outbox.get_nowait())
+            except queue.Empty:
+                break
+
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            event_ids = [connection.execute(
+                "INSERT INTO notification_events (origin, body, created_at) VALUES (?, ?, ?)",
+                (self.origin, json.dumps(message), now)
+            ).lastrowid for message in messages]
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            self.logger.error(f"Dropped {len(messages)} notification events that could not be stored")
+            raise
+        for event_id, message in zip(event_ids, messages):
+            loop.call_soon_threadsafe(deliver_own, event_id, message)
+
+    def _poll(self, loop: asyncio.AbstractEventLoop, deliver: DeliverCallback, deliver_own: DeliverCallback):
+        connection = self._connect()
+        last_prune = 0.0
+        while not self.stop_event.is_set():
+            try:
+                # Waiting on the outbox doubles as the poll interval, so publishes go out at once
+                self._write_outbox(connection, loop, deliver_own, self.poll_interval)
+                rows = connection.execute(
+                    "SELECT id, origin, body FROM notification_events WHERE id > ? ORDER BY id",
+                    (self.last_seen_id,)
+                ).fetchall()
+                for event_id, origin, body in rows:
+                    self.last_seen_id = event_id
+                    # Our own messages were already delivered locally when published
+                    if origin != self.origin:
+                        loop.call_soon_threadsafe(deliver, event_id, json.loads(body))
+
+                now = time.time()
+                if now - last_prune > self.retention_seconds:
+                    connection.execute("DELETE FROM notification_events WHERE created_at < ?",
+                                       (now - self.retention_seconds,))
+                    last_prune = now
+
+            except Exception as e:
+                self.logger.error(f"Error polling notification broker: {e}")
+                self.stop_event.wait(self.poll_interval)
+
+        # Store what was published before stopping; the loop may already be closed
+        try:
+            while not self.outbox.empty():
+                self._write_outbox(connection, loop, deliver_own, None)
+        except Exception as e:
+            self.logger.error(f"Error flushing notification broker: {e}")
+        connection.close()
@@ -1,17 +1,22 @@
 import asyncio
 import logging
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Any
 from datetime import datetime, timedelta
+from collections import Counter, OrderedDict, deque, namedtuple
+import heapq
 import json
+import os
 import time
 from dataclasses import dataclass, asdict
 from enum import Enum
+from notifications.broker import InProcessBroker
 
 class NotificationType(Enum):
     JOB_FOUND = "job_found"
     APPLICATION_SENT = "application_sent"
     APPLICATION_SUCCESS = "application_success"
     APPLICATION_FAILED = "application_failed"
+    APPLICATION_DIGEST = "application_digest"
     CAPTCHA_SOLVED = "captcha_solved"
     COUNTY_SCRAPE_COMPLETE = "county_scrape_complete"
     SYSTEM_UPDATE = "system_update"
@@ -43,7 +48,8 @@ class Notification:
             self.timestamp = time.time()
         if self.expires_at is None:
             # Default expiration: 24 hours for most notifications
-            if self.type in [NotificationType.JOB_FOUND, NotificationType.APPLICATION_SUCCESS]:
+            if self.type in [NotificationType.JOB_FOUND, NotificationType.APPLICATION_SUCCESS,
+                             NotificationType.APPLICATION_DIGEST]:
                 self.expires_at = self.timestamp + (24 * 60 * 60)  # 24 hours
             elif self.type in [NotificationType.ERROR, NotificationType.WARNING]:
                 self.expires_at = self.timestamp + (7 * 24 * 60 * 60)  # 7 days
@@ -56,35 +62,294 @@ class Notification:
         data['priority'] = self.priority.value
         return data
     
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Notification':
+        fields = dict(data)
+        fields['type'] = NotificationType(fields['type'])
+        fields['priority'] = NotificationPriority(fields['priority'])
+        return cls(**fields)
+    
     def is_expired(self) -> bool:
         if self.expires_at is None:
             return False
         return time.time() > self.expires_at
 
+# One published event; payload is the JSON text sent as-is to every connection
+StreamEvent = namedtuple("StreamEvent", ["id", "type", "payload"])
+
+# Notification types merged into one digest per user while a burst lasts
+COALESCED_TYPES = {
+    NotificationType.APPLICATION_SENT: "applications sent",
+    NotificationType.APPLICATION_SUCCESS: "applications successful",
+    NotificationType.APPLICATION_FAILED: "failed"
+}
+
+class CoalescingWindow:
+    """
+    Burst state for one user's coalesced notifications
+    - The first burst_threshold notifications in a window pass through individually
+    - Later ones only bump counters and append a compact detail tuple
+    - At the end of the window one digest notification replaces them; its counts
+      cover the whole window, including the notifications that passed through
+    """
+    
+    def __init__(self, started_at: float, passthrough: int, detail_limit: int):
+        self.started_at = started_at
+        self.passthrough = passthrough  # individual notifications still allowed in this window
+        self.counts: Counter = Counter()  # coalesced into the digest
+        self.shown: Counter = Counter()  # passed through individually
+        self.details: deque = deque(maxlen=detail_limit)  # (type, title, company, error, timestamp)
+        self.dropped_details = 0
+        self.digest_id: Optional[str] = None
+    
+    def record(self, notification_type: NotificationType, data: Dict):
+        self.counts[notification_type] += 1
+        if len(self.details) == self.details.maxlen:
+            self.dropped_details += 1
+        self.details.append((notification_type.value, data.get("job_title"), data.get("company"),
+                             data.get("error"), time.time()))
+
+class SlowConsumerPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued message to make room
+    DROP_NEWEST = "drop_newest"  # discard the incoming message
+    DISCONNECT = "disconnect"    # close the connection
+
+class Subscription:
+    """
+    Outbound message queue for one connected client
+    - Producers call offer(), which never blocks or awaits the socket
+    - A writer task drains the queue to the connection at the client's pace
+    - When the queue is full the slow-consumer policy decides what to drop
+    """
+    
+    def __init__(self, user_id: str, connection: Any = None, queue_size: int = 256,
+                 policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST):
+        self.user_id = user_id
+        self.connection = connection
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.closed = False
+    
+    def offer(self, event: StreamEvent) -> bool:
+        """Enqueue an already-serialized event without waiting"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.policy == SlowConsumerPolicy.DROP_OLDEST:
+                self.queue.get_nowait()
+                self.queue.put_nowait(event)
+            elif self.policy == SlowConsumerPolicy.DISCONNECT:
+                self.close()
+            return False
+    
+    async def get(self) -> Optional[StreamEvent]:
+        """Next message to send, or None once the subscription is closed"""
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Wake the writer with a sentinel, discarding anything still queued
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class UserNotificationStore:
+    """
+    Fixed-capacity, time-ordered notification buffer for one user
+    - Ring buffer slots hold notifications oldest to newest; when full the oldest is overwritten
+    - A dict index maps notification id -> slot for O(1) lookup, read and delete
+    - Unread, per-type and per-priority counters are maintained on every change
+    """
+    
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.slots: List[Optional[Notification]] = [None] * capacity
+        self.next_slot = 0  # slot the next notification is written to
+        self.index: Dict[str, int] = {}  # notification id -> slot
+        self.unread = 0
+        self.by_type: Counter = Counter()
+        self.by_priority: Counter = Counter()
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def _count(self, notification: Notification, delta: int):
+        if not notification.read:
+            self.unread += delta
+        self.by_type[notification.type.value] += delta
+        self.by_priority[notification.priority.value] += delta
+    
+    def add(self, notification: Notification) -> Optional[Notification]:
+        """Append a notification, returning the one it evicted (if any)"""
+        slot = self.next_slot
+        evicted = self.slots[slot]
+        if evicted is not None:
+            del self.index[evicted.id]
+            self._count(evicted, -1)
+        
+        self.slots[slot] = notification
+        self.index[notification.id] = slot
+        self._count(notification, 1)
+        self.next_slot = (slot + 1) % self.capacity
+        return evicted
+    
+    def get(self, notification_id: str) -> Optional[Notification]:
+        slot = self.index.get(notification_id)
+        return self.slots[slot] if slot is not None else None
+    
+    def remove(self, notification_id: str) -> Optional[Notification]:
+        slot = self.index.pop(notification_id, None)
+        if slot is None:
+            return None
+        notification = self.slots[slot]
+        self.slots[slot] = None
+        self._count(notification, -1)
+        return notification
+    
+    def mark_read(self, notification_id: str) -> bool:
+        notification = self.get(notification_id)
+        if notification is None:
+            return False
+        if not notification.read:
+            notification.read = True
+            self.unread -= 1
+        return True
+    
+    def mark_all_read(self) -> int:
+        count = 0
+        if self.unread:
+            for slot in self.index.values():
+                notification = self.slots[slot]
+                if not notification.read:
+                    notification.read = True
+                    count += 1
+        self.unread = 0
+        return count
+    
+    def newest(self, limit: int, unread_only: bool = False) -> List[Notification]:
+        """Walk backwards from the newest slot, stopping as soon as limit notifications are found"""
+        results = []
+        slot = self.next_slot
+        for _ in range(self.capacity):
+            if len(results) >= limit:
+                break
+            slot = (slot - 1) % self.capacity
+            notification = self.slots[slot]
+            if notification is None or (unread_only and notification.read):
+                continue
+            results.append(notification)
+        return results
+    
+    def stats(self) -> Dict:
+        return {
+            "total": len(self.index),
+            "unread": self.unread,
+            "by_type": {k: v for k, v in self.by_type.items() if v},
+            "by_priority": {k: v for k, v in self.by_priority.items() if v}
+        }
+
 class NotificationSystem:
-    def __init__(self):
+    # Notifications kept per user; older ones are overwritten
+    MAX_NOTIFICATIONS_PER_USER = 100
+    # How often the expiry heap is drained in the background
+    EXPIRY_TICK_SECONDS = 5
+    # Recent events kept per user so reconnecting clients can resume
+    REPLAY_EVENTS_PER_USER = 200
+    # Detail rows kept per digest, and digests whose details stay retrievable
+    DIGEST_DETAIL_LIMIT = 500
+    MAX_DIGEST_DETAILS = 1000
+    
+    def __init__(self, subscriber_queue_size: int = 256,
+                 slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+                 coalesce_window_seconds: float = 10, coalesce_burst_threshold: int = 5,
+                 broker=None):
         self.logger = logging.getLogger(__name__)
-        self.notifications: Dict[str, List[Notification]] = {}  # user_id -> notifications
-        self.subscribers: Dict[str, Set] = {}  # user_id -> websocket connections
+        self.notifications: Dict[str, UserNotificationStore] = {}  # user_id -> notification store
+        self.subscribers: Dict[str, Dict[Any, Subscription]] = {}  # user_id -> connection -> subscription
+        self.subscriber_queue_size = subscriber_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
         self.notification_counter = 0
         self.cleanup_running = False
+        # Min-heap of (expires_at, user_id, notification_id); entries for deleted or
+        # evicted notifications are skipped when popped
+        self.expiry_heap: List[tuple] = []
+        self.stale_expiry_entries = 0  # heap entries whose notification is already gone
+        # Carries events to other processes; the in-process default only numbers them
+        self.broker = broker or InProcessBroker()
+        self.event_log: Dict[str, deque] = {}  # user_id -> recent StreamEvents
+        # Coalescing is off when the window is 0
+        self.coalesce_window_seconds = coalesce_window_seconds
+        self.coalesce_burst_threshold = coalesce_burst_threshold
+        self.coalescing_windows: Dict[str, CoalescingWindow] = {}  # user_id -> current burst window
+        self.digest_details: OrderedDict = OrderedDict()  # digest id -> detail tuples
         
+    def set_broker(self, broker):
+        """Swap the pub/sub backend; call before start_broker"""
+        self.broker.stop()
+        self.broker = broker
+    
+    def start_broker(self):
+        """Start receiving events published by other processes"""
+        self.broker.start(asyncio.get_running_loop(), self._receive_remote_event, self._deliver_published_event)
+    
+    def stop_broker(self):
+        self.broker.stop()
+    
     async def start_cleanup_task(self):
         """Start the cleanup task when event loop is available"""
         if not self.cleanup_running:
             self.cleanup_running = True
             asyncio.create_task(self.cleanup_expired_notifications())
     
+    def expire_due(self, now: Optional[float] = None) -> int:
+        """Remove exactly the notifications whose expiry has passed, in O(expired log n)"""
+        now = now or time.time()
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] < now:
+            _, user_id, notification_id = heapq.heappop(heap)
+            store = self.notifications.get(user_id)
+            if store is not None and store.remove(notification_id) is not None:
+                removed += 1
+            elif self.stale_expiry_entries:
+                self.stale_expiry_entries -= 1
+        
+        # Evictions and deletes leave stale entries behind; rebuild once they dominate
+        if self.stale_expiry_entries > len(heap) - self.stale_expiry_entries + 1024:
+            self.expiry_heap = [(n.expires_at, user_id, n.id)
+                                for user_id, store in self.notifications.items()
+                                for n in store.newest(store.capacity) if n.expires_at is not None]
+            heapq.heapify(self.expiry_heap)
+            self.stale_expiry_entries = 0
+        
+        return removed
+    
     def generate_notification_id(self) -> str:
         """Generate unique notification ID"""
         self.notification_counter += 1
-        return f"notif_{int(time.time())}_{self.notification_counter}"
+        # The pid keeps ids unique when several workers share a broker
+        return f"notif_{int(time.time())}_{os.getpid()}_{self.notification_counter}"
     
     async def add_notification(self, user_id: str, notification_type: NotificationType, 
                              title: str, message: str, priority: NotificationPriority = NotificationPriority.MEDIUM,
                              data: Optional[Dict] = None) -> str:
         """Add a new notification for a user"""
         try:
+            if notification_type in COALESCED_TYPES and self.coalesce_window_seconds > 0:
+                digest_id = self._coalesce(user_id, notification_type, data or {})
+                if digest_id:
+                    return digest_id
+            
             notification = Notification(
                 id=self.generate_notification_id(),
                 user_id=user_id,
@@ -94,72 +359,195 @@ class NotificationSystem:
                 message=message,
                 data=data or {}
             )
+            await self._store_notification(notification)
             
-            # Initialize user notifications if not exists
-            if user_id not in self.notifications:
-                self.notifications[user_id] = []
+            self.logger.info(f"Added notification for user {user_id}: {title}")
+            return notification.id
             
-            # Add notification
-            self.notifications[user_id].append(notification)
+        except Exception as e:
+            self.logger.error(f"Error adding notification: {e}")
+            return ""
+    
+    async def _store_notification(self, notification: Notification):
+        user_id = notification.user_id
+        
+        self._add_to_store(user_id, notification)
+        
+        # Broadcast to subscribers
+        await self.broadcast_notification(user_id, notification)
+    
+    def _coalesce(self, user_id: str, notification_type: NotificationType, data: Dict) -> Optional[str]:
+        """Fold a notification into the user's burst window; None means deliver it individually"""
+        now = time.time()
+        window = self.coalescing_windows.get(user_id)
+        if window is None or now - window.started_at >= self.coalesce_window_seconds:
+            # A burst running straight into the next window keeps coalescing; after a quiet
+            # window notifications pass through individually again
+            bursting = (window is not None and window.digest_id is not None
+                        and now - window.started_at < 2 * self.coalesce_window_seconds)
+            window = CoalescingWindow(now, 0 if bursting else self.coalesce_burst_threshold, self.DIGEST_DETAIL_LIMIT)
+            self.coalescing_windows[user_id] = window
+        
+        if window.passthrough > 0:
+            window.passthrough -= 1
+            window.shown[notification_type] += 1
+            return None
+        
+        window.record(notification_type, data)
+        if window.digest_id is None:
+            # The digest id is handed out now so callers get a stable reference
+            window.digest_id = self.generate_notification_id()
+            delay = window.started_at + self.coalesce_window_seconds - now
+            asyncio.get_running_loop().call_later(
+                delay, lambda: asyncio.ensure_future(self.flush_digest(user_id, window)))
+        return window.digest_id
+    
+    async def flush_digest(self, user_id: str, window: CoalescingWindow) -> Optional[str]:
+        """Publish one aggregate notification for everything coalesced in a window"""
+        try:
+            if window.digest_id is None or not window.counts:
+                return None
+            
+            counts = window.counts + window.shown
+            shown = sum(window.shown.values())
+            message = ", ".join(f"{counts[t]} {label}" for t, label in COALESCED_TYPES.items() if counts[t])
+            if shown:
+                message += f" ({shown} shown individually)"
+            notification = Notification(
+                id=window.digest_id,
+                user_id=user_id,
+                type=NotificationType.APPLICATION_DIGEST,
+                priority=NotificationPriority.HIGH if counts[NotificationType.APPLICATION_FAILED] else NotificationPriority.MEDIUM,
+                title="Application Update",
+                message=message,
+                data={
+                    "counts": {t.value: n for t, n in counts.items()},
+                    "total": sum(counts.values()),
+                    "coalesced": sum(window.counts.values()),
+                    "shown_individually": shown,
+                    "details_available": len(window.details),
+                    "details_dropped": window.dropped_details,
+                    "window_started_at": window.started_at
+                }
+            )
             
-            # Keep only last 100 notifications per user
-            if len(self.notifications[user_id]) > 100:
-                self.notifications[user_id] = self.notifications[user_id][-100:]
+            self.digest_details[window.digest_id] = window.details
+            while len(self.digest_details) > self.MAX_DIGEST_DETAILS:
+                self.digest_details.popitem(last=False)
             
-            # Broadcast to subscribers
-            await self.broadcast_notification(user_id, notification)
+            await self._store_notification(notification)
             
-            self.logger.info(f"Added notification for user {user_id}: {title}")
+            self.logger.info(f"Added digest notification for user {user_id}: {message}")
             return notification.id
             
         except Exception as e:
-            self.logger.error(f"Error adding notification: {e}")
-            return ""
+            self.logger.error(f"Error flushing notification digest: {e}")
+            return None
+    
+    def get_digest_details(self, user_id: str, digest_id: str) -> List[Dict]:
+        """Per-item details behind a digest notification"""
+        store = self.notifications.get(user_id)
+        details = self.digest_details.get(digest_id)
+        if details is None or store is None or store.get(digest_id) is None:
+            return []
+        return [{
+            "type": notification_type,
+            "job_title": job_title,
+            "company": company,
+            "error": error,
+            "timestamp": timestamp
+        } for notification_type, job_title, company, error, timestamp in details]
     
     async def broadcast_notification(self, user_id: str, notification: Notification):
         """Broadcast notification to all connected clients for a user"""
+        self.publish_event(user_id, "notification", notification.to_dict())
+    
+    def publish_event(self, user_id: str, event_type: str, data: Dict) -> Optional[int]:
+        """
+        Record an event for replay and push it to every connected client; returns the
+        event id, or None when the broker numbers and delivers it asynchronously
+        """
         try:
-            if user_id in self.subscribers:
-                message = {
-                    "type": "notification",
-                    "data": notification.to_dict()
-                }
+            event_id = self.broker.publish({"user_id": user_id, "type": event_type, "data": data})
+            if event_id is None:
+                return None
+            return self._deliver_event(event_id, user_id, event_type, data)
                 
-                # Send to all connected websockets for this user
-                disconnected = set()
-                for websocket in self.subscribers[user_id]:
-                    try:
-                        await websocket.send(json.dumps(message))
-                    except Exception as e:
-                        self.logger.warning(f"Failed to send notification to websocket: {e}")
-                        disconnected.add(websocket)
-                
-                # Remove disconnected websockets
-                for ws in disconnected:
-                    self.subscribers[user_id].discard(ws)
-                    
         except Exception as e:
             self.logger.error(f"Error broadcasting notification: {e}")
+            return 0
+    
+    def _deliver_published_event(self, event_id: int, message: Dict):
+        """Deliver an event this process published, once the broker has stored it"""
+        try:
+            self._deliver_event(event_id, message["user_id"], message["type"], message["data"])
+        except Exception as e:
+            self.logger.error(f"Error delivering published notification event: {e}")
+    
+    def _add_to_store(self, user_id: str, notification: Notification):
+        if user_id not in self.notifications:
+            self.notifications[user_id] = UserNotificationStore(self.MAX_NOTIFICATIONS_PER_USER)
+        
+        # Add notification; the store overwrites the oldest once it is full
+        evicted = self.notifications[user_id].add(notification)
+        if evicted is not None and evicted.expires_at is not None:
+            self.stale_expiry_entries += 1
+        if notification.expires_at is not None:
+            heapq.heappush(self.expiry_heap, (notification.expires_at, user_id, notification.id))
+    
+    def _receive_remote_event(self, event_id: int, message: Dict):
+        """Apply an event published by another process to this process's state and clients"""
+        try:
+            user_id, event_type, data = message["user_id"], message["type"], message["data"]
+            if event_type == "notification":
+                # Keep the store in step so REST reads on this worker see the notification too
+                self._add_to_store(user_id, Notification.from_dict(data))
+            self._deliver_event(event_id, user_id, event_type, data)
+            
+        except Exception as e:
+            self.logger.error(f"Error applying remote notification event: {e}")
+    
+    def _deliver_event(self, event_id: int, user_id: str, event_type: str, data: Dict) -> int:
+        """Record an event for replay and offer it to this process's connections"""
+        # Serialize once; every connection gets the same payload on its own queue
+        event = StreamEvent(event_id, event_type, json.dumps({
+            "id": event_id,
+            "type": event_type,
+            "data": data
+        }))
+        
+        log = self.event_log.get(user_id)
+        if log is None:
+            log = self.event_log[user_id] = deque(maxlen=self.REPLAY_EVENTS_PER_USER)
+        log.append(event)
+        
+        for subscription in list(self.subscribers.get(user_id, {}).values()):
+            if not subscription.offer(event) and subscription.closed and subscription.writer_task:
+                # Disconnect policy: stop the writer even if it is blocked mid-send
+                subscription.writer_task.cancel()
+        
+        return event.id
+    
+    def events_since(self, user_id: str, last_event_id: Optional[int]) -> List[StreamEvent]:
+        """Buffered events after last_event_id (all buffered events when None)"""
+        log = self.event_log.get(user_id, ())
+        if last_event_id is None:
+            return list(log)
+        return [event for event in log if event.id > last_event_id]
+    
+    def _get_store(self, user_id: str) -> Optional[UserNotificationStore]:
+        """Return the user's store with anything already due removed, so reads need no expiry checks"""
+        self.expire_due()
+        return self.notifications.get(user_id)
     
     def get_notifications(self, user_id: str, limit: int = 50, unread_only: bool = False) -> List[Dict]:
-        """Get notifications for a user"""
+        """Get notifications for a user, newest first"""
         try:
-            if user_id not in self.notifications:
+            store = self._get_store(user_id)
+            if store is None:
                 return []
             
-            notifications = self.notifications[user_id]
-            
-            # Filter unread if requested
-            if unread_only:
-                notifications = [n for n in notifications if not n.read]
-            
-            # Sort by timestamp (newest first)
-            notifications.sort(key=lambda x: x.timestamp or 0, reverse=True)
-            
-            # Apply limit
-            notifications = notifications[:limit]
-            
-            return [n.to_dict() for n in notifications]
+            return [n.to_dict() for n in store.newest(limit, unread_only)]
             
         except Exception as e:
             self.logger.error(f"Error getting notifications: {e}")
@@ -168,15 +556,11 @@ class NotificationSystem:
     def mark_as_read(self, user_id: str, notification_id: str) -> bool:
         """Mark a notification as read"""
         try:
-            if user_id not in self.notifications:
+            store = self.notifications.get(user_id)
+            if store is None:
                 return False
             
-            for notification in self.notifications[user_id]:
-                if notification.id == notification_id:
-                    notification.read = True
-                    return True
-            
-            return False
+            return store.mark_read(notification_id)
             
         except Exception as e:
             self.logger.error(f"Error marking notification as read: {e}")
@@ -185,16 +569,11 @@ class NotificationSystem:
     def mark_all_as_read(self, user_id: str) -> int:
         """Mark all notifications as read for a user"""
         try:
-            if user_id not in self.notifications:
+            store = self.notifications.get(user_id)
+            if store is None:
                 return 0
             
-            count = 0
-            for notification in self.notifications[user_id]:
-                if not notification.read:
-                    notification.read = True
-                    count += 1
-            
-            return count
+            return store.mark_all_read()
             
         except Exception as e:
             self.logger.error(f"Error marking all notifications as read: {e}")
@@ -203,15 +582,14 @@ class NotificationSystem:
     def delete_notification(self, user_id: str, notification_id: str) -> bool:
         """Delete a specific notification"""
         try:
-            if user_id not in self.notifications:
+            store = self.notifications.get(user_id)
+            if store is None:
                 return False
             
-            self.notifications[user_id] = [
-                n for n in self.notifications[user_id] 
-                if n.id != notification_id
-            ]
-            
-            return True
+            notification = store.remove(notification_id)
+            if notification is not None and notification.expires_at is not None:
+                self.stale_expiry_entries += 1
+            return notification is not None
             
         except Exception as e:
             self.logger.error(f"Error deleting notification: {e}")
@@ -220,35 +598,47 @@ class NotificationSystem:
     def get_unread_count(self, user_id: str) -> int:
         """Get count of unread notifications for a user"""
         try:
-            if user_id not in self.notifications:
-                return 0
-            
-            return sum(1 for n in self.notifications[user_id] if not n.read and not n.is_expired())
+            store = self._get_store(user_id)
+            return store.unread if store is not None else 0
             
         except Exception as e:
             self.logger.error(f"Error getting unread count: {e}")
             return 0
     
-    async def subscribe_user(self, user_id: str, websocket):
+    def open_stream(self, user_id: str, connection: Any = None,
+                    last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscription, pre-filled with any events missed since last_event_id"""
+        subscription = Subscription(user_id, connection, self.subscriber_queue_size, self.slow_consumer_policy)
+        if last_event_id is not None:
+            for event in self.events_since(user_id, last_event_id):
+                subscription.offer(event)
+        # Streams without a socket (e.g. SSE responses) are keyed by the subscription itself
+        self.subscribers.setdefault(user_id, {})[connection if connection is not None else subscription] = subscription
+        return subscription
+    
+    async def subscribe_user(self, user_id: str, websocket, last_event_id: Optional[int] = None) -> Optional[Subscription]:
         """Subscribe a user's websocket for real-time notifications"""
         try:
-            if user_id not in self.subscribers:
-                self.subscribers[user_id] = set()
-            
-            self.subscribers[user_id].add(websocket)
+            subscription = self.open_stream(user_id, websocket, last_event_id)
+            subscription.writer_task = asyncio.create_task(self._write_to_connection(subscription))
             self.logger.info(f"User {user_id} subscribed for notifications")
+            return subscription
             
         except Exception as e:
             self.logger.error(f"Error subscribing user: {e}")
+            return None
     
     async def unsubscribe_user(self, user_id: str, websocket):
-        """Unsubscribe a user's websocket"""
+        """Unsubscribe a user's websocket (or a socketless stream's own subscription)"""
         try:
-            if user_id in self.subscribers:
-                self.subscribers[user_id].discard(websocket)
+            subscriptions = self.subscribers.get(user_id)
+            if subscriptions is not None:
+                subscription = subscriptions.pop(websocket, None)
+                if subscription is not None:
+                    subscription.close()
                 
-                # Clean up empty sets
-                if not self.subscribers[user_id]:
+                # Clean up empty maps
+                if not subscriptions:
                     del self.subscribers[user_id]
                     
             self.logger.info(f"User {user_id} unsubscribed from notifications")
@@ -256,22 +646,38 @@ class NotificationSystem:
         except Exception as e:
             self.logger.error(f"Error unsubscribing user: {e}")
     
+    async def _write_to_connection(self, subscription: Subscription):
+        """Writer task: drain one subscription's queue into its socket"""
+        connection = subscription.connection
+        # Starlette/FastAPI websockets expose send_text; the websockets library uses send
+        send = getattr(connection, "send_text", None) or connection.send
+        try:
+            while True:
+                event = await subscription.get()
+                if event is None:
+                    break
+                await send(event.payload)
+        except Exception as e:
+            self.logger.warning(f"Failed to send notification to websocket: {e}")
+        finally:
+            dropped_by_policy = subscription.closed and subscription.policy == SlowConsumerPolicy.DISCONNECT
+            subscription.close()
+            await self.unsubscribe_user(subscription.user_id, connection)
+            if dropped_by_policy and hasattr(connection, "close"):
+                try:
+                    await connection.close()
+                except Exception:
+                    pass
+    
     async def cleanup_expired_notifications(self):
-        """Periodically clean up expired notifications"""
+        """Drain the expiry heap on a short tick instead of rescanning every user hourly"""
         while True:
             try:
-                await asyncio.sleep(3600)  # Run every hour
+                await asyncio.sleep(self.EXPIRY_TICK_SECONDS)
                 
-                for user_id in list(self.notifications.keys()):
-                    original_count = len(self.notifications[user_id])
-                    self.notifications[user_id] = [
-                        n for n in self.notifications[user_id] 
-                        if not n.is_expired()
-                    ]
-                    
-                    cleaned_count = original_count - len(self.notifications[user_id])
-                    if cleaned_count > 0:
-                        self.logger.info(f"Cleaned up {cleaned_count} expired notifications for user {user_id}")
+                cleaned_count = self.expire_due()
+                if cleaned_count > 0:
+                    self.logger.info(f"Cleaned up {cleaned_count} expired notifications")
                 
             except Exception as e:
                 self.logger.error(f"Error in notification cleanup: {e}")
@@ -400,7 +806,8 @@ class NotificationSystem:
     def get_notification_stats(self, user_id: str) -> Dict:
         """Get notification statistics for a user"""
         try:
-            if user_id not in self.notifications:
+            store = self._get_store(user_id)
+            if store is None:
                 return {
                     "total": 0,
                     "unread": 0,
@@ -408,25 +815,7 @@ class NotificationSystem:
                     "by_priority": {}
                 }
             
-            notifications = self.notifications[user_id]
-            non_expired = [n for n in notifications if not n.is_expired()]
-            
-            stats = {
-                "total": len(non_expired),
-                "unread": sum(1 for n in non_expired if not n.read),
-                "by_type": {},
-                "by_priority": {}
-            }
-            
-            # Count by type
-            for notification in non_expired:
-                type_name = notification.type.value
-                priority_name = notification.priority.value
-                
-                stats["by_type"][type_name] = stats["by_type"].get(type_name, 0) + 1
-                stats["by_priority"][priority_name] = stats["by_priority"].get(priority_name, 0) + 1
-            
-            return stats
+            return store.stats()
             
         except Exception as e:
             self.logger.error(f"Error getting notification stats: {e}")